@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Command line of the homelab deployment automation
+
+Run through deployment-automation.py. The post-commit hook's most common
+case, a commit without ingress changes, is answered from the detection rules
+saved by the last run, before the configuration or DeploymentAutomator (and
+everything it imports) is loaded.
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# Detection rules of the last full run, so the hook's fast path can match
+# changed files without loading the YAML configuration
+DETECTION_SNAPSHOT = ".cache/detection-rules.json"
+
+def read_path_list(source: str) -> List[str]:
+    """Read a newline-separated list of paths from a file or stdin ("-")"""
+    stream = sys.stdin if source == "-" else open(source, 'r')
+    try:
+        return [line.strip() for line in stream if line.strip()]
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+def changed_ingress_manifests(paths: List[str], config_path: Path) -> Optional[bool]:
+    """Whether any listed path is an ingress manifest, judged by the saved detection rules
+    
+    Returns None when the rules saved by the last run are missing or the
+    configuration has changed since, so the caller has to load it.
+    """
+    from manifest_patterns import DetectionRules
+    
+    base_dir = Path(__file__).parent.parent
+    rules = DetectionRules.load_snapshot(base_dir / DETECTION_SNAPSHOT, config_path)
+    if rules is None:
+        return None
+    k8s_config_dir = base_dir.parent / "k8s-cluster-config"
+    for path in paths:
+        path = Path(path)
+        if path.is_absolute():
+            try:
+                path = path.relative_to(k8s_config_dir)
+            except ValueError:
+                continue
+        if rules.matches(path.as_posix()):
+            return True
+    return False
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Homelab Deployment Automation")
+    parser.add_argument("--action", choices=["add", "update", "remove", "scan", "reconcile", "drain", "daemon", "probe",
+                                             "migrate-catalog", "check-links", "query"],
+                       required=True,
+                       help="Action to perform")
+    parser.add_argument("--name", help="Service name")
+    parser.add_argument("--url", help="Service URL")
+    parser.add_argument("--description", help="Service description")
+    parser.add_argument("--why-selected", help="Why this service was selected")
+    parser.add_argument("--maintainer", help="Service maintainer")
+    parser.add_argument("--namespace", help="With --action query, only services in this namespace")
+    parser.add_argument("--host", help="With --action query, only services served on this host")
+    parser.add_argument("--environment", help="With --action query, only services in this environment "
+                                              "(production, staging or local)")
+    parser.add_argument("--config", help="Path to configuration file")
+    parser.add_argument("--since", metavar="REV",
+                       help="Scan only manifests changed since REV (or in a REV..REV range)")
+    parser.add_argument("--files-from", metavar="FILE",
+                       help="Scan only the manifests listed in FILE, one per line ('-' for stdin)")
+    parser.add_argument("--jobs", type=int, metavar="N",
+                       help="Parse manifests in N worker processes (0 = one per CPU core)")
+    parser.add_argument("--dry-run", action="store_true",
+                       help="With --action reconcile, print the monitor changes without applying them")
+    parser.add_argument("--workers", type=int, metavar="N",
+                       help="With --action reconcile, apply at most N monitor changes concurrently")
+    parser.add_argument("--concurrent", action="store_true",
+                       help="Run git, Discord and Uptime Kuma side effects concurrently")
+    parser.add_argument("--batch-size", type=int, metavar="N",
+                       help="With --action drain, replay at most N outbox jobs per batch")
+    parser.add_argument("--json", action="store_true",
+                       help="With --action probe, check-links or query, print the results as JSON")
+    parser.add_argument("--offline", action="store_true",
+                       help="With --action check-links, only resolve internal links and anchors")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Re-parse every manifest instead of using the manifest cache")
+    parser.add_argument("--metrics-json", metavar="FILE",
+                       help="Write per-phase timings and counters of this run to FILE as JSON")
+    parser.add_argument("--metrics-textfile", metavar="FILE",
+                       help="Write them to FILE in the Prometheus textfile-collector format")
+    
+    args = parser.parse_args()
+    
+    config_file = args.config or Path(__file__).parent / "automation-config.yaml"
+    changed_paths = None
+    if args.action == "scan" and args.files_from and not args.since:
+        changed_paths = read_path_list(args.files_from)
+        if changed_ingress_manifests(changed_paths, config_file) is False:
+            # Fast exit before any configuration, yaml or network code is loaded
+            print("No ingress manifests changed, nothing to do")
+            return
+    
+    from deployment_automation import DeploymentAutomator
+    
+    automator = DeploymentAutomator(config_file)
+    automator.detection.save_snapshot(automator.base_dir / DETECTION_SNAPSHOT, config_file)
+    if args.concurrent:
+        automator.config.setdefault("execution", {})["mode"] = "concurrent"
+    if args.metrics_json:
+        automator.config["metrics"]["json_path"] = os.path.abspath(args.metrics_json)
+    if args.metrics_textfile:
+        automator.config["metrics"]["textfile_path"] = os.path.abspath(args.metrics_textfile)
+    
+    if args.action == "scan":
+        # Scan for new services and process them
+        if args.since or args.files_from:
+            if args.since:
+                import subprocess
+                try:
+                    changed_files, old_rev = automator.changed_manifests_since(args.since)
+                except subprocess.CalledProcessError as e:
+                    print(f"Could not list changes since {args.since}: {e.stderr.strip()}")
+                    sys.exit(1)
+            else:
+                changed_files, old_rev = automator.changed_files_from_lines(changed_paths), None
+            automator.process_changed_files(changed_files, old_rev=old_rev,
+                                            use_cache=not args.no_cache, jobs=args.jobs)
+        else:
+            changes = automator.detect_service_changes(use_cache=not args.no_cache, jobs=args.jobs)
+            # Auto-process detected services as one batch
+            automator.process_batch(automator.changeset_from_scan(changes))
+    elif args.action == "daemon":
+        if not automator.run_daemon(jobs=args.jobs):
+            automator.close()
+            sys.exit(1)
+    elif args.action == "drain":
+        outbox = automator.outbox()
+        if outbox is None:
+            print("Outbox is disabled; set outbox.enabled in the configuration")
+            sys.exit(1)
+        automator.drain_outbox(batch_size=args.batch_size)
+        counts = outbox.counts()
+        print(f"📬 Outbox: {counts['pending']} pending, {counts['dead']} given up, {counts['done']} delivered in total")
+    elif args.action == "migrate-catalog":
+        if not automator.migrate_catalog():
+            automator.close()
+            sys.exit(1)
+    elif args.action == "probe":
+        if not automator.probe_services(as_json=args.json):
+            automator.close()
+            sys.exit(1)
+    elif args.action == "query":
+        if not automator.query_catalog(as_json=args.json, name=args.name, namespace=args.namespace,
+                                       host=args.host, environment=args.environment):
+            automator.close()
+            sys.exit(1)
+    elif args.action == "check-links":
+        if not automator.check_links(as_json=args.json, offline=args.offline):
+            automator.close()
+            sys.exit(1)
+    elif args.action == "reconcile":
+        if not automator.reconcile_monitors(dry_run=args.dry_run, workers=args.workers,
+                                            use_cache=not args.no_cache, jobs=args.jobs):
+            automator.close()
+            sys.exit(1)
+    else:
+        if not args.name:
+            print("--name is required for add/update/remove actions")
+            sys.exit(1)
+            
+        automator.process_service(
+            args.action,
+            args.name,
+            url=args.url,
+            description=args.description,
+            why_selected=getattr(args, 'why_selected'),
+            maintainer=args.maintainer
+        )
+    
+    automator.close()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the deployment automation
+
+Generates a synthetic k8s-cluster-config tree and a large services.md in a
+temporary workspace, then times manifest scans (cold, warm, incremental),
+catalog edits (single and bulk) and end-to-end service processing against
+local stand-ins for Discord and Uptime Kuma and a local git remote. Results are
+written as JSON so runs from different commits can be compared.
+
+Usage:
+    python3 benchmark-automation.py --output bench.json
+    python3 benchmark-automation.py --apps 2000 --docs-per-file 30 --output new.json --compare bench.json
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+
+SCRIPTS_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from fake_services import FakeDiscordWebhook, FakeUptimeKuma
+from synthetic_repo import LAYOUTS, app_name, app_url, generate_catalog, generate_cluster_config
+
+def load_automation():
+    """Import the module behind deployment-automation.py"""
+    return importlib.import_module("deployment_automation")
+
+def git(*args: str, cwd: Path):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+@contextlib.contextmanager
+def silenced(quiet: bool):
+    """Discard output, including that of git subprocesses, while quiet"""
+    if not quiet:
+        yield
+        return
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = [os.dup(1), os.dup(2)]
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    try:
+        os.dup2(devnull, 1)
+        os.dup2(devnull, 2)
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(saved[0], 1)
+        os.dup2(saved[1], 2)
+        for fd in saved + [devnull]:
+            os.close(fd)
+
+def measure(func: Callable, repeat: int, setup: Callable = None, quiet: bool = True) -> Dict:
+    """Run func `repeat` times and summarise the wall-clock timings"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        with silenced(quiet):
+            started = time.perf_counter()
+            result = func()
+            timings.append(time.perf_counter() - started)
+    return {
+        "seconds": statistics.median(timings),
+        "min": min(timings),
+        "max": max(timings),
+        "runs": len(timings),
+        "result": result,
+    }
+
+class Workspace:
+    """Temporary homelab-docs and k8s-cluster-config checkouts with fake endpoints"""
+
+    def __init__(self, root: Path, args: argparse.Namespace):
+        self.root = root
+        self.args = args
+        self.k8s_dir = root / "k8s-cluster-config"
+        self.docs_repo = root / "homelab-docs"
+        self.remote = root / "homelab-docs.git"
+        self.catalog_path = self.docs_repo / "docs" / "applications" / "services.md"
+        self.config_path = root / "automation-config.yaml"
+        self.discord = FakeDiscordWebhook()
+        self.kuma = FakeUptimeKuma(username="bench", password="bench")
+
+    def create(self):
+        started = time.perf_counter()
+        self.expected = generate_cluster_config(self.k8s_dir, self.args.apps, self.args.docs_per_file,
+                                                self.args.layout)
+        self.catalog_names = generate_catalog(self.catalog_path, self.args.catalog_services)
+
+        git("init", "-q", "--bare", str(self.remote), cwd=self.root)
+        git("init", "-q", cwd=self.docs_repo)
+        git("config", "user.name", "Benchmark", cwd=self.docs_repo)
+        git("config", "user.email", "benchmark@localhost", cwd=self.docs_repo)
+        (self.docs_repo / ".gitignore").write_text(".cache/\n")
+        git("add", ".", cwd=self.docs_repo)
+        git("commit", "-q", "-m", "Synthetic catalog", cwd=self.docs_repo)
+        git("remote", "add", "origin", str(self.remote), cwd=self.docs_repo)
+        git("push", "-q", "-u", "origin", "HEAD", cwd=self.docs_repo)
+
+        self.discord.start()
+        self.kuma.start()
+        config = {
+            "discord": {"webhook_url": self.discord.webhook_url, "max_retries": 2},
+            "uptime_kuma": {"url": self.kuma.url, "username": "bench", "password": "bench",
+                            "timeout": 10, "monitor_defaults": {"interval": 60}},
+            "documentation": {"auto_commit": True,
+                              "commit_message_template": "docs: Update service catalog for {service_name}"},
+            "scan": {"jobs": self.args.jobs},
+            "cache": {"enabled": True, "manifest_cache": ".cache/manifest-cache.json"},
+            "execution": {"mode": "concurrent" if self.args.concurrent else "sequential",
+                          "timeouts": {"git": 120, "discord": 30, "uptime_kuma": 60}},
+            "outbox": {"enabled": False},
+        }
+        # JSON is valid YAML, so the automation reads this like its own config
+        self.config_path.write_text(json.dumps(config, indent=2))
+        return time.perf_counter() - started
+
+    def automator(self, module):
+        """A DeploymentAutomator pointed at the workspace instead of the real repositories"""
+        automator = module.DeploymentAutomator(self.config_path)
+        automator.base_dir = self.docs_repo
+        automator.docs_dir = self.docs_repo / "docs"
+        # The catalog pages, content hashes and JSON export follow the catalog path
+        automator.service_catalog_path = self.catalog_path
+        automator.k8s_config_dir = self.k8s_dir
+        return automator
+
+    def close(self):
+        self.discord.stop()
+        self.kuma.stop()
+
+def run_suite(args: argparse.Namespace, workspace: Workspace) -> Dict[str, Dict]:
+    module = load_automation()
+    quiet = not args.verbose
+    results = {}
+    automator = workspace.automator(module)
+    cache_file = workspace.docs_repo / ".cache" / "manifest-cache.json"
+
+    def fresh_process(remove_cache: bool):
+        # A new run starts without in-memory state; the on-disk cache decides cold or warm
+        def setup():
+            automator._manifest_cache = None
+            if remove_cache and cache_file.exists():
+                cache_file.unlink()
+        return setup
+
+    def scan():
+        return len(automator.detect_service_changes(jobs=args.jobs))
+
+    results["scan_cold"] = measure(scan, args.repeat, fresh_process(True), quiet)
+    results["scan_warm"] = measure(scan, args.repeat, fresh_process(False), quiet)
+    for case in ("scan_cold", "scan_warm"):
+        if results[case]["result"] != len(workspace.expected):
+            raise RuntimeError(f"{case} found {results[case]['result']} services, "
+                               f"expected {len(workspace.expected)}")
+
+    touched = [
+        str(path.relative_to(workspace.k8s_dir))
+        for path in sorted(workspace.k8s_dir.glob("apps/*/**/ingressroute.yaml"))[:args.touch]
+    ]
+    def touch():
+        fresh_process(False)()
+        for rel_path in touched:
+            path = workspace.k8s_dir / rel_path
+            path.write_bytes(path.read_bytes() + b"\n")
+
+    results["scan_incremental"] = measure(
+        lambda: len(automator.detect_incremental_changes({path: "M" for path in touched}, jobs=args.jobs)[0]),
+        args.repeat, touch, quiet)
+    results["scan_incremental"]["manifests"] = len(touched)
+
+    edits = {"count": 0}
+    def service_info(index: int) -> Dict:
+        edits["count"] += 1
+        return {"url": app_url(app_name(index), staging=False),
+                "description": f"Edited description {edits['count']}",
+                "why_selected": "Benchmark", "maintainer": "Homelab Team"}
+
+    middle = len(workspace.catalog_names) // 2
+    results["catalog_single_edit"] = measure(
+        lambda: automator.update_service_catalog(app_name(middle), service_info(middle), "update"),
+        args.repeat, None, quiet)
+
+    bulk = min(args.bulk, len(workspace.catalog_names))
+    def bulk_edit():
+        catalog = automator.load_service_catalog()
+        for index in range(bulk):
+            automator.apply_catalog_change(catalog, app_name(index), service_info(index), "update")
+        automator.write_service_catalog(catalog)
+        return bulk
+    results["catalog_bulk_edit"] = measure(bulk_edit, args.repeat, None, quiet)
+    results["catalog_bulk_edit"]["services"] = bulk
+
+    # Commit what the catalog benchmarks changed, so the end-to-end runs start clean
+    git("commit", "-q", "-am", "Benchmark catalog edits", cwd=workspace.docs_repo)
+
+    added = {"count": 0}
+    def new_service() -> str:
+        added["count"] += 1
+        return f"bench-new-{added['count']:05d}"
+
+    def process_one():
+        name = new_service()
+        report = automator.process_service("add", name, url=f"https://{name}.hallonen.se",
+                                           description="Benchmark service", why_selected="", maintainer="")
+        automator.flush_notifications()
+        return [entry["status"] for entry in report]
+    results["process_service_e2e"] = measure(process_one, args.repeat, None, quiet)
+
+    def process_unchanged():
+        name = f"bench-new-{added['count']:05d}"
+        report = automator.process_service("update", name, url=f"https://{name}.hallonen.se",
+                                           description="Benchmark service", why_selected="", maintainer="")
+        return [entry["status"] for entry in report]
+    results["process_service_noop"] = measure(process_unchanged, args.repeat, None, quiet)
+
+    def process_many():
+        changeset = []
+        for _ in range(bulk):
+            name = new_service()
+            changeset.append({"action": "add", "name": name,
+                              "service_info": {"url": f"https://{name}.hallonen.se",
+                                               "description": "Benchmark service"}})
+        applied = automator.process_batch(changeset)
+        automator.flush_notifications()
+        return len(applied)
+    results["process_batch_e2e"] = measure(process_many, args.repeat, None, quiet)
+    results["process_batch_e2e"]["services"] = bulk
+
+    automator.close()
+    results["process_batch_e2e"]["discord_posts"] = len(workspace.discord.payloads)
+    results["process_batch_e2e"]["monitors_created"] = len(workspace.kuma.monitors)
+    return results
+
+def git_revision() -> str:
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPTS_DIR,
+                            capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else "unknown"
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    """Print a comparison table and return the cases that regressed"""
+    regressions = []
+    print(f"\n{'case':<22} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for case, result in current["results"].items():
+        old = baseline.get("results", {}).get(case)
+        if not old:
+            print(f"{case:<22} {'-':>10} {result['seconds']:>9.3f}s {'new':>7}")
+            continue
+        ratio = result["seconds"] / old["seconds"] if old["seconds"] else float("inf")
+        marker = " ❌" if ratio > threshold else ""
+        print(f"{case:<22} {old['seconds']:>9.3f}s {result['seconds']:>9.3f}s {ratio:>6.2f}x{marker}")
+        if ratio > threshold:
+            regressions.append(case)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scans and catalog operations on synthetic repositories")
+    parser.add_argument("--apps", type=int, default=500, help="Number of apps in the synthetic k8s-cluster-config")
+    parser.add_argument("--docs-per-file", type=int, default=20, help="YAML documents per ingress manifest")
+    parser.add_argument("--layout", choices=LAYOUTS, default="mixed",
+                       help="Production (apps/<name>/), staging (apps/<name>/staging/) or mixed layout")
+    parser.add_argument("--catalog-services", type=int, default=1000, help="Entries in the synthetic services.md")
+    parser.add_argument("--bulk", type=int, default=50, help="Services per bulk catalog edit and batch")
+    parser.add_argument("--touch", type=int, default=10, help="Manifests changed for the incremental scan")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case")
+    parser.add_argument("--jobs", type=int, default=1, help="Parser processes for scans (0 = one per CPU core)")
+    parser.add_argument("--concurrent", action="store_true", help="Run side effects concurrently")
+    parser.add_argument("--output", help="Write results as JSON to this file ('-' for stdout)")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare against an earlier JSON result")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                       help="Ratio over the baseline that counts as a regression")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary workspace")
+    parser.add_argument("--verbose", action="store_true", help="Show the automation's own output")
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="homelab-bench-"))
+    workspace = Workspace(root, args)
+    try:
+        print(f"🏗️  Generating {args.apps} apps x {args.docs_per_file} documents "
+              f"and a {args.catalog_services}-service catalog in {root}")
+        generate_seconds = workspace.create()
+        results = run_suite(args, workspace)
+    finally:
+        workspace.close()
+        if args.keep:
+            print(f"Workspace kept at {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+    report = {
+        "commit": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "cpus": os.cpu_count()},
+        "parameters": {key: value for key, value in vars(args).items()
+                       if key not in ("output", "compare", "keep", "verbose")},
+        "generate_seconds": round(generate_seconds, 3),
+        "results": results,
+    }
+
+    for case, result in results.items():
+        print(f"⏱️  {case:<22} {result['seconds']:8.3f}s  (min {result['min']:.3f}s, max {result['max']:.3f}s)")
+
+    if args.output == "-":
+        print(json.dumps(report, indent=2))
+    elif args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        if regressions:
+            print(f"❌ Regressions over {args.threshold}x: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
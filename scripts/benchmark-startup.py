@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Startup latency benchmark for deployment-automation.py
+
+Times the post-commit hook's most common case, a commit without ingress
+changes, against a bare interpreter and breaks the difference down with
+`python -X importtime`. Fails when the overhead exceeds the budget or when a
+heavy dependency is imported on that path.
+
+Usage:
+    python3 benchmark-startup.py
+    python3 benchmark-startup.py --runs 20 --budget-ms 40 --json
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+AUTOMATION_SCRIPT = Path(__file__).parent / "deployment-automation.py"
+
+# The hook feeds the changed files of the commit on stdin
+NOOP_COMMAND = [sys.executable, str(AUTOMATION_SCRIPT), "--action", "scan", "--files-from", "-"]
+NOOP_INPUT = "README.md\ndocs/index.md\n"
+BASELINE_COMMAND = [sys.executable, "-c", "pass"]
+
+# Modules that must not be loaded when there is nothing to do
+HEAVY_MODULES = ["requests", "urllib3", "yaml", "sqlite3", "concurrent.futures", "socketserver", "ctypes"]
+
+def time_command(command: List[str], stdin: str, runs: int) -> List[float]:
+    """Wall-clock milliseconds for each of `runs` executions"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, input=stdin, capture_output=True, text=True, check=True)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+def import_times(command: List[str], stdin: str) -> Dict[str, int]:
+    """Cumulative import time in microseconds of every top-level import"""
+    result = subprocess.run([command[0], "-X", "importtime", *command[1:]], input=stdin,
+                            capture_output=True, text=True, check=True)
+    imports = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):
+            # Top-level imports have a single space before the name
+            imports[name.strip()] = int(cumulative)
+    return imports
+
+def all_imported(command: List[str], stdin: str) -> List[str]:
+    result = subprocess.run([command[0], "-X", "importtime", *command[1:]], input=stdin,
+                            capture_output=True, text=True, check=True)
+    return [line.rsplit("|", 1)[1].strip() for line in result.stderr.splitlines()
+            if line.startswith("import time:") and "imported package" not in line]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark deployment-automation.py startup")
+    parser.add_argument("--runs", type=int, default=10, help="Timed runs per command")
+    parser.add_argument("--budget-ms", type=float, default=60.0,
+                       help="Allowed median overhead over a bare interpreter, in milliseconds")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to report")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    # Warm the OS page cache and bytecode caches before timing; the first run
+    # also saves the detection rules the fast path needs if they are missing
+    time_command(NOOP_COMMAND, NOOP_INPUT, 1)
+
+    baseline = statistics.median(time_command(BASELINE_COMMAND, "", args.runs))
+    noop = statistics.median(time_command(NOOP_COMMAND, NOOP_INPUT, args.runs))
+    overhead = noop - baseline
+
+    baseline_imports = import_times(BASELINE_COMMAND, "")
+    script_imports = {name: us for name, us in import_times(NOOP_COMMAND, NOOP_INPUT).items()
+                      if name not in baseline_imports}
+    imported = set(all_imported(NOOP_COMMAND, NOOP_INPUT))
+    heavy = [name for name in HEAVY_MODULES if name in imported]
+
+    results = {
+        "runs": args.runs,
+        "budget_ms": args.budget_ms,
+        "baseline_ms": round(baseline, 2),
+        "noop_ms": round(noop, 2),
+        "overhead_ms": round(overhead, 2),
+        "import_ms": round(sum(script_imports.values()) / 1000, 2),
+        "top_imports": [
+            {"module": name, "ms": round(us / 1000, 2)}
+            for name, us in sorted(script_imports.items(), key=lambda item: -item[1])[:args.top]
+        ],
+        "heavy_imports": heavy,
+        "ok": overhead <= args.budget_ms and not heavy,
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"⏱️  Bare interpreter:  {results['baseline_ms']:.1f} ms")
+        print(f"⏱️  No-op hook run:    {results['noop_ms']:.1f} ms")
+        print(f"📊 Overhead:          {results['overhead_ms']:.1f} ms (budget {args.budget_ms:.0f} ms)")
+        print(f"📦 Script imports:    {results['import_ms']:.1f} ms")
+        for entry in results["top_imports"]:
+            print(f"   {entry['ms']:7.2f} ms  {entry['module']}")
+        if heavy:
+            print(f"❌ Heavy modules imported on the no-op path: {', '.join(heavy)}")
+        print("✅ Within budget" if results["ok"] else "❌ Over budget")
+
+    sys.exit(0 if results["ok"] else 1)
+
+if __name__ == "__main__":
+    main()
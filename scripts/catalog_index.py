@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Machine-readable index of the service catalog
+
+A SQLite table of every catalogued service (.cache/catalog-index.sqlite3),
+indexed on name, namespace, host and environment, so health checks, monitor
+reconciliation and dashboards look services up with an indexed query instead
+of parsing the markdown. Every catalog write updates the rows of the services
+it changed and exports the table to docs/applications/services.json, which
+is committed with the catalog and published with the site.
+
+The index stores a fingerprint (names, sizes and modification times) of the
+catalog files it was built from. When the markdown was changed by other
+means, such as a hand edit or a pull, the fingerprint no longer matches and
+the caller rebuilds the index from the catalog once. The JSON export has one
+service per line, so its diffs show which services changed.
+"""
+
+import json
+import re
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from service_catalog import section_fields
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS services (
+    name TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    host TEXT NOT NULL,
+    environment TEXT NOT NULL,
+    namespace TEXT NOT NULL,
+    description TEXT NOT NULL,
+    why_selected TEXT NOT NULL,
+    maintainer TEXT NOT NULL,
+    page TEXT NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS services_namespace ON services (namespace);
+CREATE INDEX IF NOT EXISTS services_host ON services (host);
+CREATE INDEX IF NOT EXISTS services_environment ON services (environment);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+FIELDS = ("name", "url", "host", "environment", "namespace", "description", "why_selected", "maintainer", "page")
+# Fields query() filters on, each backed by an index
+QUERY_FIELDS = ("name", "namespace", "host", "environment")
+
+# The description changeset_from_scan() gives detected services
+DETECTED_RE = re.compile(r'^Kubernetes service in (\S+) namespace$')
+
+# Host labels that mark a non-production environment
+ENVIRONMENT_LABELS = ("staging", "local")
+
+
+def environment_of(host: str) -> str:
+    """The environment a host serves: staging or local by its labels, else production"""
+    if not host:
+        return ""
+    labels = host.split(".")
+    for environment in ENVIRONMENT_LABELS:
+        if environment in labels:
+            return environment
+    return "production"
+
+
+def service_record(service_name: str, text: str, page: str, namespace: str = "") -> Dict[str, str]:
+    """Index record of a catalog entry's markdown"""
+    fields = section_fields(text)
+    url = fields["url"] if fields["url"] != "#" else ""
+    try:
+        host = (urlsplit(url).hostname or "") if url else ""
+    except ValueError:
+        host = ""
+    if not namespace:
+        match = DETECTED_RE.match(fields["description"])
+        namespace = match.group(1) if match else ""
+    return {
+        "name": service_name,
+        "url": url,
+        "host": host,
+        "environment": environment_of(host),
+        "namespace": namespace,
+        "description": fields["description"],
+        "why_selected": fields["why_selected"],
+        "maintainer": fields["maintainer"],
+        "page": page
+    }
+
+
+class CatalogIndex:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def fingerprint(self) -> Optional[str]:
+        """Fingerprint of the catalog files the index was last brought up to date with"""
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+        return row[0] if row else None
+
+    def names(self) -> List[str]:
+        return [row[0] for row in self._conn.execute("SELECT name FROM services")]
+
+    def _rows(self, query: str, params: Iterable = ()) -> List[Dict[str, str]]:
+        return [dict(zip(FIELDS, row)) for row in self._conn.execute(query, list(params))]
+
+    def get(self, service_name: str) -> Optional[Dict[str, str]]:
+        rows = self._rows(f"SELECT {', '.join(FIELDS)} FROM services WHERE name = ?", [service_name])
+        return rows[0] if rows else None
+
+    def apply(self, records: List[Dict[str, str]], removed: Iterable[str], fingerprint: str) -> int:
+        """Upsert the records and delete the removed services in one transaction
+
+        A record without a namespace keeps the one the index already has.
+        Returns the number of rows that changed.
+        """
+        changed = 0
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            for name in removed:
+                changed += self._conn.execute("DELETE FROM services WHERE name = ?", [name]).rowcount
+            for record in records:
+                existing = self.get(record["name"])
+                if existing is not None and not record["namespace"]:
+                    record = dict(record, namespace=existing["namespace"])
+                if record == existing:
+                    continue
+                # The row's line of the JSON export, so exporting needs no encoding
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO services ({', '.join(FIELDS)}, record) "
+                    f"VALUES ({', '.join('?' * (len(FIELDS) + 1))})",
+                    [record[field] for field in FIELDS] + [json.dumps(record, ensure_ascii=False)])
+                changed += 1
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('fingerprint', ?)", [fingerprint])
+            if changed:
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('export_pending', '1')")
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return changed
+
+    def query(self, **filters: Optional[str]) -> List[Dict[str, str]]:
+        """Records matching every given field exactly (None: any value), by name"""
+        unknown = set(filters) - set(QUERY_FIELDS)
+        if unknown:
+            raise ValueError(f"Cannot query by {', '.join(sorted(unknown))}")
+        conditions = [(field, value) for field, value in filters.items() if value is not None]
+        query = f"SELECT {', '.join(FIELDS)} FROM services"
+        if conditions:
+            query += " WHERE " + " AND ".join(f"{field} = ?" for field, _ in conditions)
+        return self._rows(query + " ORDER BY name", [value for _, value in conditions])
+
+    def service_urls(self) -> Dict[str, str]:
+        """{service name: URL} of every service that has one"""
+        return dict(self._conn.execute("SELECT name, url FROM services WHERE url != '' ORDER BY name"))
+
+    def export_pending(self) -> bool:
+        """Whether rows changed since the last export was written"""
+        return self._conn.execute("SELECT 1 FROM meta WHERE key = 'export_pending'").fetchone() is not None
+
+    def export_json(self) -> str:
+        """The index as the JSON document published next to the catalog"""
+        lines = [row[0] for row in self._conn.execute("SELECT record FROM services ORDER BY name")]
+        return '{"services": [\n' + ",\n".join(lines) + "\n]}\n"
+
+    def mark_exported(self):
+        self._conn.execute("DELETE FROM meta WHERE key = 'export_pending'")
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+One page per service: the sharded layout of the service catalog
+
+docs/applications/services/<slug>.md holds a single service and index.md
+lists them all between generated markers, keeping the header and footer of
+the original services.md around the list. An edit rewrites only the pages of
+the services it changed (and the index when the list itself changes), so
+MkDocs re-renders one small page instead of the whole catalog. A .pages file
+orders the pages for the awesome-pages plugin.
+
+Pages are loaded into a ServiceCatalog model, with each page as a section, so
+callers edit both layouts the same way.
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from file_lock import write_atomically
+from service_catalog import SECTION_PREFIX, CatalogSection, ServiceCatalog
+
+INDEX_NAME = "index.md"
+PAGES_NAME = ".pages"
+INDEX_START = "<!-- service-pages:start -->"
+INDEX_END = "<!-- service-pages:end -->"
+
+INDEX_ENTRY_RE = re.compile(r'^- \[(?P<name>[^\]]+)\]\((?P<page>[^)]+)\)')
+
+
+def service_slug(service_name: str) -> str:
+    """File name stem of a service's page"""
+    slug = re.sub(r'[^a-z0-9]+', '-', service_name.lower()).strip('-')
+    return slug or "service"
+
+
+def render_page(section: CatalogSection) -> str:
+    """A catalog section as a standalone page, headed by the service name"""
+    body = section.text.lstrip("\n")
+    if body.startswith(SECTION_PREFIX):
+        body = body.partition("\n")[2]
+    return f"# {section.name}\n\n{body.strip()}\n"
+
+
+def page_section(service_name: str, page: str) -> CatalogSection:
+    """The catalog section of a page, in the form ServiceCatalog.add() renders"""
+    body = page.partition("\n")[2].strip()
+    return CatalogSection(service_name, f"\n{SECTION_PREFIX}{service_name}\n{body}\n\n")
+
+
+class PagedCatalog(ServiceCatalog):
+    """A catalog loaded from service pages, remembering what it was loaded from"""
+
+    def __init__(self, header: str = "", sections: List[CatalogSection] = None, footer: str = ""):
+        super().__init__(header, sections, footer)
+        # {service name: (page file name, page text)} as loaded, the base of merges
+        self.loaded: Dict[str, Tuple[str, str]] = {}
+        self.loaded_header = header
+        self.loaded_footer = footer
+
+
+class CatalogPages:
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.index_path = self.directory / INDEX_NAME
+
+    def exists(self) -> bool:
+        return self.index_path.exists()
+
+    def _read_index(self) -> Tuple[str, Dict[str, str], str]:
+        """Header, {service name: index line} in listed order, and footer of index.md"""
+        text = self.index_path.read_text() if self.index_path.exists() else f"{INDEX_START}\n{INDEX_END}\n"
+        header, _, rest = text.partition(INDEX_START + "\n")
+        listing, _, footer = rest.partition(INDEX_END + "\n")
+        entries = {}
+        for line in listing.splitlines():
+            match = INDEX_ENTRY_RE.match(line)
+            if match:
+                entries[match.group("name")] = line
+        return header, entries, footer
+
+    def _page_name(self, service_name: str, entries: Dict[str, str]) -> str:
+        """The page a listed service is on, or a free file name for a new one"""
+        line = entries.get(service_name)
+        match = INDEX_ENTRY_RE.match(line) if line else None
+        if match:
+            return match.group("page")
+        taken = {INDEX_ENTRY_RE.match(line).group("page") for line in entries.values()}
+        slug = service_slug(service_name)
+        page_name = f"{slug}.md"
+        suffix = 2
+        while page_name in taken or page_name == INDEX_NAME:
+            page_name = f"{slug}-{suffix}.md"
+            suffix += 1
+        return page_name
+
+    def load(self) -> PagedCatalog:
+        """Read the index and every page it lists into a catalog model"""
+        header, entries, footer = self._read_index()
+        loaded = {}
+        sections = []
+        for name in entries:
+            page_name = self._page_name(name, entries)
+            try:
+                page = (self.directory / page_name).read_text()
+            except FileNotFoundError:
+                continue
+            loaded[name] = (page_name, page)
+            sections.append(page_section(name, page))
+        catalog = PagedCatalog(header, sections, footer)
+        catalog.loaded = loaded
+        return catalog
+
+    def index_line(self, service_name: str, page_name: str, url: Optional[str]) -> str:
+        line = f"- [{service_name}]({page_name})"
+        return f"{line}: <{url}>" if url and url != "#" else line
+
+    def save(self, catalog: ServiceCatalog) -> Tuple[List[Path], List[str]]:
+        """Write the pages that changed since the catalog was loaded and refresh the index
+
+        A plain ServiceCatalog (e.g. parsed from services.md) is written out
+        in full. Call with the catalog lock held. Pages and index entries other runs
+        changed in the meantime are kept unless this catalog changed the same
+        service, in which case this catalog's version wins. Returns the paths
+        written or removed and the names of such conflicting services.
+        """
+        if not isinstance(catalog, PagedCatalog):
+            paged = PagedCatalog(catalog.header, list(catalog), catalog.footer)
+            paged.loaded_header = paged.loaded_footer = None
+            catalog = paged
+        self.directory.mkdir(parents=True, exist_ok=True)
+        header, entries, footer = self._read_index()
+        changed: List[Path] = []
+        conflicts: List[str] = []
+
+        for name in catalog.names():
+            page = render_page(catalog.get(name))
+            page_name, loaded = catalog.loaded.get(name, (self._page_name(name, entries), None))
+            if page == loaded:
+                continue
+            path = self.directory / page_name
+            current = path.read_text() if path.exists() else None
+            if current == page:
+                continue
+            if current != loaded:
+                conflicts.append(name)
+            write_atomically(path, page)
+            changed.append(path)
+            entries[name] = self.index_line(name, page_name, catalog.service_url(name))
+
+        for name, (page_name, loaded) in catalog.loaded.items():
+            if name in catalog:
+                continue
+            path = self.directory / page_name
+            if path.exists():
+                if path.read_text() != loaded:
+                    conflicts.append(name)
+                path.unlink()
+                changed.append(path)
+            entries.pop(name, None)
+
+        # The header and footer are only replaced when this catalog changed them
+        if catalog.header != catalog.loaded_header:
+            header = catalog.header
+        if catalog.footer != catalog.loaded_footer:
+            footer = catalog.footer
+
+        if footer and not footer.startswith("\n"):
+            footer = "\n" + footer
+        index = header + INDEX_START + "\n" + "".join(f"{line}\n" for line in entries.values()) + INDEX_END + "\n" + footer
+        if not self.index_path.exists() or self.index_path.read_text() != index:
+            write_atomically(self.index_path, index)
+            changed.append(self.index_path)
+        pages = "nav:\n  - index.md\n" + "".join(
+            f"  - {self._page_name(name, entries)}\n" for name in entries)
+        pages_path = self.directory / PAGES_NAME
+        if not pages_path.exists() or pages_path.read_text() != pages:
+            write_atomically(pages_path, pages)
+            changed.append(pages_path)
+
+        catalog.loaded = {name: (self._page_name(name, entries), render_page(catalog.get(name)))
+                          for name in catalog.names() if name in entries}
+        catalog.loaded_header, catalog.loaded_footer = header, footer
+        return changed, conflicts
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Content hashes of catalog entries and Uptime Kuma monitor specs
+
+The hashes live next to the catalog in docs/applications/.services-hashes.json.
+A run records the canonical hash of every entry it writes and of every monitor
+spec Uptime Kuma has a monitor for, so re-applying the same content is
+recognised as a no-op and the monitor call is skipped. The file is a cache and
+is not committed: losing it only costs one more round of the skipped work.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from file_lock import write_atomically
+
+
+def canonical_hash(value) -> str:
+    """Hash of a JSON-serializable value that does not depend on key order"""
+    data = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(data.encode()).hexdigest()[:16]
+
+
+class ContentHashes:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        stored = self._read()
+        self.entries: Dict[str, str] = stored.get("entries", {})
+        self.monitors: Dict[str, str] = stored.get("monitors", {})
+        # (kind, service name) -> hash, None once forgotten; replayed onto the file by save()
+        self._changes: Dict[Tuple[str, str], Optional[str]] = {}
+
+    def _read(self) -> Dict:
+        try:
+            stored = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+        return stored if isinstance(stored, dict) else {}
+
+    @property
+    def changed(self) -> bool:
+        return bool(self._changes)
+
+    def entry(self, service_name: str) -> Optional[str]:
+        return self.entries.get(service_name)
+
+    def monitor(self, service_name: str) -> Optional[str]:
+        return self.monitors.get(service_name)
+
+    def set_entry(self, service_name: str, digest: str):
+        self.entries[service_name] = digest
+        self._changes[("entries", service_name)] = digest
+
+    def set_monitor(self, service_name: str, digest: str):
+        self.monitors[service_name] = digest
+        self._changes[("monitors", service_name)] = digest
+
+    def forget(self, service_name: str):
+        """Drop both hashes of a removed service"""
+        for kind in ("entries", "monitors"):
+            getattr(self, kind).pop(service_name, None)
+            self._changes[(kind, service_name)] = None
+
+    def save(self):
+        """Apply this run's changes to the file as other runs left it
+
+        Call with the hashes lock held.
+        """
+        stored = self._read()
+        for (kind, service_name), digest in self._changes.items():
+            hashes = stored.setdefault(kind, {})
+            if digest is None:
+                hashes.pop(service_name, None)
+            else:
+                hashes[service_name] = digest
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomically(self.path, json.dumps(stored, indent=2, sort_keys=True) + "\n")
+        self.entries = stored.get("entries", {})
+        self.monitors = stored.get("monitors", {})
+        self._changes = {}
@@ -8,6 +8,8 @@ import json
 import os
 import sys
 
+from uptime_kuma_client import UptimeKumaClient, UptimeKumaError, build_http_monitor
+
 def create_monitor():
     """Create a monitor for docs.hallonen.se in Uptime Kuma"""
     
@@ -22,80 +24,36 @@ def create_monitor():
     
     print("🔍 Creating Uptime Kuma monitor for docs.hallonen.se...")
     
-    # Note: Uptime Kuma typically uses WebSocket for real-time API communication
-    # For now, we'll try the HTTP API endpoints and fall back to manual setup
-    
-    session = requests.Session()
+    client = UptimeKumaClient(base_url, username, password)
     
     try:
-        # Try different possible API endpoints
-        api_endpoints = [
-            f"{base_url}/api/login",
-            f"{base_url}/login", 
-            f"{base_url}/api/auth/login"
-        ]
+        # Uptime Kuma's API is socket.io; log in once and reuse the connection
+        client.login()
+        print("🔑 Successfully logged in to Uptime Kuma")
         
-        login_success = False
-        for endpoint in api_endpoints:
-            try:
-                login_payload = {"username": username, "password": password}
-                login_response = session.post(endpoint, json=login_payload)
-                if login_response.status_code == 200:
-                    print(f"🔑 Successfully logged in to Uptime Kuma via {endpoint}")
-                    login_success = True
-                    break
-            except:
-                continue
-        
-        if not login_success:
-            print("⚠️ Could not authenticate via HTTP API - Uptime Kuma typically uses WebSocket")
-            print("📋 Will provide manual setup instructions instead")
-            return False
+        if client.find_monitor(name="docs.hallonen.se", url="https://docs.hallonen.se"):
+            print("⚠️ Monitor for docs.hallonen.se already exists, skipping creation")
+            return True
         
-        # If login was successful, try to create monitor
-        monitor_payload = {
-            "name": "docs.hallonen.se",
-            "url": "https://docs.hallonen.se",
-            "type": "http",
-            "interval": 60,
-            "maxretries": 3,
-            "timeout": 30,
-            "retryInterval": 60,
-            "httpBodyEncoding": "json",
-            "expectedStatus": "200-299",
-            "followRedirect": True,
-            "ignoreTls": False,
-            "acceptedStatusCodes": ["200-299"],
-            "httpMethod": "GET",
-            "description": "Homelab documentation site via Cloudflare tunnel",
-            "tags": ["production", "documentation", "cloudflare-tunnel"]
-        }
+        monitor_payload = build_http_monitor(
+            "docs.hallonen.se",
+            "https://docs.hallonen.se",
+            description="Homelab documentation site via Cloudflare tunnel"
+        )
         
-        monitor_endpoints = [
-            f"{base_url}/api/monitor",
-            f"{base_url}/api/monitors"
-        ]
-        
-        for endpoint in monitor_endpoints:
-            try:
-                create_response = session.post(endpoint, json=monitor_payload)
-                if create_response.status_code in [200, 201]:
-                    print("✅ Successfully created Uptime Kuma monitor via API")
-                    return True
-            except:
-                continue
-        
-        print("⚠️ Could not create monitor via API - falling back to manual setup")
-        return False
+        monitor_id = client.add_monitor(monitor_payload)
+        print(f"✅ Successfully created Uptime Kuma monitor via API (id {monitor_id})")
+        return True
 
-    except Exception as e:
+    except UptimeKumaError as e:
         print(f"❌ API communication failed: {e}")
-        print("📋 Will provide manual setup instructions")
+        print_manual_setup()
         return False
     finally:
-        session.close()
-    
-    # For now, just validate that the service is accessible
+        client.close()
+
+def check_service_accessibility():
+    """Validate that docs.hallonen.se is reachable and serves documentation"""
     print("\n🌐 Testing service accessibility...")
     try:
         response = requests.get("https://docs.hallonen.se", timeout=10)
@@ -117,7 +75,11 @@ def create_monitor():
         print(f"❌ Service is not accessible: {e}")
         return False
     
-    print("\n📋 Manual Setup Instructions (if API creation failed):")
+    return True
+
+def print_manual_setup():
+    """Fallback: manual monitor setup instructions"""
+    print("\n📋 Manual Setup Instructions:")
     print("=" * 50)
     print("1. Access Uptime Kuma at: https://uptime.staging.hallonen.se")
     print("2. Login with your credentials")
@@ -131,8 +93,6 @@ def create_monitor():
     print(f"   - HTTP Method: GET")
     print(f"   - Accepted Status Codes: 200-299")
     print("5. Click 'Save'")
-    
-    return True
 
 def send_notification():
     """Send Discord notification about monitor setup"""
@@ -163,7 +123,10 @@ def main():
     print("🤖 Uptime Kuma Monitor Setup for docs.hallonen.se")
     print("=" * 60)
     
-    if create_monitor():
+    created = create_monitor()
+    accessible = check_service_accessibility()
+    
+    if created and accessible:
         send_notification()
         print("\n✅ Monitor setup completed successfully!")
         return 0
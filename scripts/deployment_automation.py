@@ -0,0 +1,1635 @@
+#!/usr/bin/env python3
+"""
+Homelab Deployment Automation
+
+The DeploymentAutomator behind deployment-automation.py, which automates:
+1. Documentation updates in the service catalog
+2. Discord notifications to #homelab-general
+3. Uptime Kuma monitor creation for external services
+
+The command line is in automation_cli.py.
+"""
+
+import json
+import time
+import os
+import re
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Any, Tuple
+
+from manifest_cache import ManifestCache
+from manifest_patterns import DetectionRules
+from phase_metrics import Metrics, timed
+from service_catalog import ServiceCatalog
+
+# yaml, requests and the integration modules are imported where they are used,
+# so that each action only loads what it needs
+if TYPE_CHECKING:
+    import queue
+    import socketserver
+    from catalog_index import CatalogIndex
+    from content_hashes import ContentHashes
+    from discord_notifier import DiscordNotifier
+    from manifest_watcher import Debouncer
+    from outbox import Job, Outbox
+    from uptime_kuma_client import UptimeKumaClient
+
+class DeploymentAutomator:
+    def __init__(self, config_path: str = None):
+        self.base_dir = Path(__file__).parent.parent
+        self.k8s_config_dir = self.base_dir.parent / "k8s-cluster-config"
+        self.docs_dir = self.base_dir / "docs"
+        # The pages, hashes and JSON export live next to it (see the properties below)
+        self.service_catalog_path = self.docs_dir / "applications" / "services.md"
+        
+        # Load configuration
+        config_file = config_path or self.base_dir / "scripts" / "automation-config.yaml"
+        self.config = self.load_config(config_file)
+        # Which manifests are scanned, and which directories and namespaces are skipped
+        self.detection = DetectionRules.from_config(self.config["detection"])
+        
+        # Uptime Kuma connections, shared by every monitor operation in this run
+        self._kuma_clients: Dict[Tuple[str, str], Optional["UptimeKumaClient"]] = {}
+        # Discord notifications are buffered per webhook and flushed by close()
+        self._notifiers: Dict[str, "DiscordNotifier"] = {}
+        # Whether the missing webhook URL was already reported
+        self._webhook_missing_reported = False
+        # Durable record of external side effects, opened on first use
+        self._outbox: Optional["Outbox"] = None
+        self._queued_kinds = set()
+        # Content hash of the last catalog written in this run
+        self.catalog_revision: Optional[str] = None
+        # Parsed-manifest state, loaded once and kept for the lifetime of the process
+        self._manifest_cache: Optional[ManifestCache] = None
+        # Per-phase timings and counters, exported by export_metrics()
+        self.metrics = Metrics()
+        # Git backend used for documentation commits, opened on first use
+        self._git = None
+        # Documentation files written by this run, committed by commit_and_push_docs()
+        self._written_paths: Dict[Path, None] = {}
+        # Entry and monitor hashes, loaded on first use and saved by close()
+        self._hashes: Optional["ContentHashes"] = None
+        # SQLite index of the catalog, opened on first use
+        self._catalog_index: Optional["CatalogIndex"] = None
+        # Namespaces of the services detected by this run, recorded in the catalog index
+        self._scanned_namespaces: Dict[str, str] = {}
+        
+    @property
+    def service_pages_dir(self) -> Path:
+        """One page per service, used with the "pages" catalog layout"""
+        return self.service_catalog_path.with_name("services")
+
+    @property
+    def content_hashes_path(self) -> Path:
+        """Hashes of the entries and monitor specs last applied, to skip no-op changes"""
+        return self.service_catalog_path.with_name(".services-hashes.json")
+
+    @property
+    def catalog_index_json_path(self) -> Path:
+        """The catalog as JSON, exported from the catalog index on every catalog write"""
+        return self.service_catalog_path.with_suffix(".json")
+
+    def load_config(self, config_path: Path) -> Dict:
+        """Load automation configuration"""
+        default_config = {
+            "discord": {
+                "webhook_url": os.getenv("DISCORD_HOMELAB_WEBHOOK"),
+                "channel": "#homelab-general"
+            },
+            "uptime_kuma": {
+                "url": "https://uptime.staging.hallonen.se",
+                "username": os.getenv("UPTIME_KUMA_USERNAME"),
+                "password": os.getenv("UPTIME_KUMA_PASSWORD")
+            },
+            "documentation": {
+                "auto_commit": True,
+                "commit_message_template": "docs: Update service catalog for {service_name}",
+                "lock_timeout": 60,
+                "git_backend": "auto",
+                "catalog_layout": "auto",
+                "catalog_index": ".cache/catalog-index.sqlite3"
+            },
+            "cache": {
+                "enabled": True,
+                "manifest_cache": ".cache/manifest-cache.json"
+            },
+            "execution": {
+                "mode": "sequential",
+                "timeouts": {"git": 120, "discord": 30, "uptime_kuma": 60}
+            },
+            "detection": {
+                "ingress_patterns": ["**/ingressroute.yaml", "**/ingress.yaml", "**/httproute.yaml"],
+                "excluded_dirs": [],
+                "monitored_namespaces": None,
+                "excluded_namespaces": [],
+                "namespace_dirs": ["{namespace}", "apps/{namespace}"]
+            },
+            "probe": {
+                "concurrency": 50,
+                "per_host": 4,
+                "timeout": 10,
+                "connect_timeout": 5,
+                "max_redirects": 5,
+                "verify_tls": True
+            },
+            "link_check": {
+                "concurrency": 20,
+                "per_host": 2,
+                "host_interval": 0.2,
+                "timeout": 15,
+                "connect_timeout": 5,
+                "max_redirects": 5,
+                "verify_tls": True,
+                "ttl_hours": 24,
+                "cache_path": ".cache/link-check.json",
+                "exclude": []
+            },
+            "metrics": {
+                "json_path": None,
+                "textfile_path": None
+            },
+            "outbox": {
+                "enabled": False,
+                "path": ".cache/outbox.sqlite3",
+                "delivery": "inline",
+                "max_attempts": 10,
+                "backoff_base": 30,
+                "backoff_max": 3600,
+                "batch_size": 50
+            }
+        }
+        
+        config_path = Path(config_path)
+        if config_path.exists():
+            import yaml
+            with open(config_path, 'r') as f:
+                user_config = yaml.safe_load(f) or {}
+            # Merge with defaults section by section; null values keep the
+            # default, so credentials can still come from the environment
+            for section, values in user_config.items():
+                if isinstance(values, dict) and isinstance(default_config.get(section), dict):
+                    default_config[section].update(
+                        {key: value for key, value in values.items() if value is not None})
+                elif values is not None:
+                    default_config[section] = values
+        
+        return default_config
+
+    @timed()
+    def detect_service_changes(self, use_cache: bool = True, jobs: int = None) -> List[Dict]:
+        """Detect new or changed services in k8s-cluster-config"""
+        cache = self.open_manifest_cache() if use_cache else None
+        if cache:
+            cache.seen.clear()
+        
+        # One walk finds every manifest matching detection.ingress_patterns,
+        # skipping excluded directories and namespaces without listing them
+        with self.metrics.span("glob_manifests") as span:
+            manifests = self.detection.walk(self.k8s_config_dir)
+            span.add("files", len(manifests))
+        changes = self.scan_manifests(manifests, cache, jobs)
+        
+        if cache:
+            with self.metrics.span("save_manifest_cache"):
+                cache.prune()
+                cache.save()
+            print(f"📦 Manifest cache: {cache.summary()}")
+        
+        self.metrics.add("services", len(changes))
+        return changes
+
+    def scan_manifests(self, manifests: List[Tuple[str, Path]], cache: Optional[ManifestCache],
+                       jobs: int = None) -> List[Dict]:
+        """Parse manifests (cache misses only), recording files and bytes parsed
+        
+        Services outside the monitored namespaces are dropped here rather than
+        when parsing, so cached results stay valid when the namespaces change.
+        """
+        import manifest_scanner
+        with self.metrics.span("parse_manifests", files=len(manifests)) as span:
+            services = manifest_scanner.scan_manifests(manifests, cache, self.scan_jobs(jobs),
+                                                       stats=span.counters)
+            changes = self.in_monitored_namespaces(services)
+            span.add("namespace_skipped", len(services) - len(changes))
+            return changes
+
+    def in_monitored_namespaces(self, services: List[Dict]) -> List[Dict]:
+        return [service for service in services
+                if self.detection.namespace_allowed(service.get("namespace"))]
+
+    def scan_jobs(self, jobs: int = None) -> int:
+        """Number of parser processes; 0 means one per CPU core"""
+        import manifest_scanner
+        if jobs is None:
+            jobs = self.config.get("scan", {}).get("jobs", 1)
+        return jobs if jobs > 0 else manifest_scanner.default_jobs()
+
+    @timed()
+    def detect_incremental_changes(self, changed_files: Dict[str, str], old_rev: str = None,
+                                   use_cache: bool = True,
+                                   jobs: int = None) -> Tuple[List[Dict], List[Dict]]:
+        """Parse only the given manifests and report services from deleted ones as removals
+        
+        changed_files maps paths relative to k8s-cluster-config to a git status letter
+        ("A", "M" or "D"). Services in deleted manifests are looked up in the manifest
+        cache, or recovered from old_rev when the cache has never seen the file.
+        """
+        manifests = []
+        removals = []
+        cache = self.open_manifest_cache() if use_cache else None
+        
+        for rel_path, status in sorted(changed_files.items()):
+            if not self.detection.matches(rel_path):
+                continue
+            manifest = self.k8s_config_dir / rel_path
+            if status != "D" and manifest.exists():
+                manifests.append((rel_path, manifest))
+                continue
+            try:
+                removals.extend(self.services_in_deleted_manifest(rel_path, cache, old_rev))
+            except Exception as e:
+                print(f"Error processing {manifest}: {e}")
+            if cache:
+                cache.forget(rel_path)
+        
+        changes = self.scan_manifests(manifests, cache, jobs)
+        removals = self.in_monitored_namespaces(removals)
+        
+        # A service whose manifest moved or still has another ingress is not removed
+        still_present = {change["name"] for change in changes}
+        removals = [removal for removal in removals if removal["name"] not in still_present]
+        
+        if cache:
+            with self.metrics.span("save_manifest_cache"):
+                cache.save()
+            print(f"📦 Manifest cache: {cache.summary()}")
+        
+        self.metrics.add("services", len(changes))
+        self.metrics.add("removals", len(removals))
+        return changes, removals
+
+    def services_in_deleted_manifest(self, rel_path: str, cache: Optional[ManifestCache],
+                                     old_rev: str = None) -> List[Dict]:
+        """Recover the services a deleted manifest used to declare"""
+        services = cache.lookup(rel_path) if cache else None
+        if services is not None:
+            return services
+        if not old_rev:
+            print(f"⚠️ No cached or historical content for deleted manifest {rel_path}")
+            return []
+        result = subprocess.run(["git", "show", f"{old_rev}:{rel_path}"],
+                                cwd=self.k8s_config_dir, capture_output=True, check=True)
+        return self.parse_manifest(self.k8s_config_dir / rel_path, result.stdout)
+
+    def changed_manifests_since(self, revision: str) -> Tuple[Dict[str, str], str]:
+        """List files changed in k8s-cluster-config for a revision or revision range
+        
+        Returns the {path: status} mapping and the old revision deleted files can be read from.
+        """
+        if ".." in revision:
+            old_rev, new_rev = revision.split("..", 1)
+            diff_args = [old_rev, new_rev or "HEAD"]
+        else:
+            old_rev = revision
+            diff_args = [revision, "HEAD"]
+            
+        result = subprocess.run(["git", "diff", "--name-status", "--no-renames", *diff_args],
+                                cwd=self.k8s_config_dir, capture_output=True, text=True, check=True)
+        changed_files = {}
+        for line in result.stdout.splitlines():
+            status, _, rel_path = line.partition("\t")
+            if rel_path:
+                changed_files[rel_path] = status[:1]
+        return changed_files, old_rev
+
+    def changed_files_from_lines(self, lines: List[str]) -> Dict[str, str]:
+        """Map listed paths (absolute or relative to k8s-cluster-config) to M or D status"""
+        changed_files = {}
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            path = Path(line)
+            if path.is_absolute():
+                try:
+                    path = path.relative_to(self.k8s_config_dir)
+                except ValueError:
+                    print(f"Ignoring {line}: not inside {self.k8s_config_dir}")
+                    continue
+            changed_files[str(path)] = "M" if (self.k8s_config_dir / path).exists() else "D"
+        return changed_files
+
+    def open_manifest_cache(self) -> Optional[ManifestCache]:
+        """Open the persistent manifest parse cache, if enabled"""
+        cache_config = self.config.get("cache", {})
+        if not cache_config.get("enabled", True):
+            return None
+        if self._manifest_cache is None:
+            import manifest_scanner
+            cache_path = self.base_dir / cache_config.get("manifest_cache", ".cache/manifest-cache.json")
+            self._manifest_cache = ManifestCache(
+                cache_path, fingerprint=f"extractor-{manifest_scanner.EXTRACTOR_VERSION}")
+        return self._manifest_cache
+
+    def parse_manifest(self, file_path: Path, data: bytes) -> List[Dict]:
+        """Parse a manifest and extract service information from its IngressRoutes"""
+        import manifest_scanner
+        return manifest_scanner.parse_manifest(file_path, data)
+
+    def extract_service_info(self, ingress_doc: Dict, file_path: Path) -> Optional[Dict]:
+        """Extract service information from ingress route"""
+        import manifest_scanner
+        return manifest_scanner.extract_service_info(ingress_doc, file_path)
+
+    @timed()
+    def update_service_catalog(self, service_name: str, service_info: Dict, action: str = "add"):
+        """Update the service catalog documentation
+        
+        Returns True if the catalog was written, None if the entry already had
+        this content (nothing is written) and False if the change was skipped.
+        """
+        catalog = self.load_service_catalog()
+        if catalog is None:
+            return False
+        
+        catalog.dirty = False
+        if not self.apply_catalog_change(catalog, service_name, service_info, action):
+            return False
+        if not catalog.dirty:
+            return None
+        
+        # Write updated content
+        self.write_service_catalog(catalog)
+            
+        return True
+
+    def uses_service_pages(self) -> bool:
+        """Whether the catalog is kept as one page per service instead of services.md
+        
+        With the "auto" layout, pages are used once services/index.md exists.
+        """
+        layout = self.config["documentation"].get("catalog_layout", "auto")
+        if layout == "auto":
+            return (self.service_pages_dir / "index.md").exists()
+        return layout == "pages"
+
+    @timed()
+    def load_service_catalog(self) -> Optional[ServiceCatalog]:
+        """Parse the service catalog into its indexed in-memory model"""
+        if self.uses_service_pages():
+            from catalog_pages import CatalogPages
+            pages = CatalogPages(self.service_pages_dir)
+            if not pages.exists():
+                print(f"Service pages not found at {self.service_pages_dir}; "
+                      f"run --action migrate-catalog to create them from services.md")
+                return None
+            catalog = pages.load()
+            self.metrics.add("files_read", len(catalog) + 1)
+            return catalog
+        if not self.service_catalog_path.exists():
+            print(f"Service catalog not found at {self.service_catalog_path}")
+            return None
+        catalog = ServiceCatalog.load(self.service_catalog_path)
+        self.metrics.add("bytes_read", self.service_catalog_path.stat().st_size)
+        for name in catalog.duplicates:
+            print(f"⚠️ Duplicate catalog entry for {name}; only the first one is managed")
+        return catalog
+
+    @timed()
+    def write_service_catalog(self, catalog: ServiceCatalog):
+        """Serialize the catalog model back to services.md
+        
+        Runs may edit the catalog concurrently: under the catalog lock, changes
+        another run wrote since this catalog was loaded are merged in first, and
+        the file is replaced atomically.
+        """
+        import hashlib
+        from file_lock import locked, write_atomically
+        
+        if self.uses_service_pages():
+            self.write_service_pages(catalog)
+            return
+        with locked(self.lock_path("catalog"), self.config["documentation"].get("lock_timeout", 60)):
+            # Only the services this catalog changed are re-indexed, so the index
+            # has to match the catalog as other runs left it
+            self.catalog_index()
+            if self.service_catalog_path.exists():
+                current = self.service_catalog_path.read_text()
+                if catalog.source is not None and current != catalog.source:
+                    conflicts = catalog.rebase(current)
+                    self.metrics.add("merges")
+                    print("🔀 Merged catalog changes made by another run")
+                    for name in conflicts:
+                        print(f"⚠️ {name} was also changed by another run; keeping this run's version")
+            content = catalog.render()
+            write_atomically(self.service_catalog_path, content)
+            self.update_catalog_index(catalog, catalog.changed)
+        catalog.source = content
+        self._written_paths[self.service_catalog_path] = None
+        self.metrics.add("bytes_written", len(content.encode()))
+        self.catalog_revision = hashlib.sha256(content.encode()).hexdigest()[:16]
+
+    def write_service_pages(self, catalog: ServiceCatalog):
+        """Write the pages of services that changed, plus the index when the list changed
+        
+        Pages other runs changed since the catalog was loaded are kept unless
+        this run changed the same service.
+        """
+        import hashlib
+        from catalog_pages import CatalogPages
+        from file_lock import locked
+        
+        with locked(self.lock_path("catalog"), self.config["documentation"].get("lock_timeout", 60)):
+            self.catalog_index()
+            changed, conflicts = CatalogPages(self.service_pages_dir).save(catalog)
+            self.update_catalog_index(catalog, catalog.changed)
+        for name in conflicts:
+            print(f"⚠️ {name} was also changed by another run; keeping this run's version")
+        for path in changed:
+            self._written_paths[path] = None
+        self.metrics.add("files_written", len(changed))
+        self.metrics.add("bytes_written", sum(path.stat().st_size for path in changed if path.exists()))
+        self.catalog_revision = hashlib.sha256(catalog.render().encode()).hexdigest()[:16]
+
+    @timed()
+    def migrate_catalog(self) -> bool:
+        """Split services.md into one page per service under docs/applications/services/"""
+        from catalog_pages import CatalogPages
+        from file_lock import locked
+        
+        pages = CatalogPages(self.service_pages_dir)
+        if pages.exists():
+            print(f"Service pages already exist at {self.service_pages_dir}")
+            return False
+        if not self.service_catalog_path.exists():
+            print(f"Service catalog not found at {self.service_catalog_path}")
+            return False
+        
+        with locked(self.lock_path("catalog"), self.config["documentation"].get("lock_timeout", 60)):
+            catalog = ServiceCatalog.load(self.service_catalog_path)
+            for name in catalog.duplicates:
+                print(f"⚠️ Duplicate catalog entry for {name}; only the first one is migrated")
+            changed, _ = pages.save(catalog)
+            self.service_catalog_path.unlink()
+        for path in changed + [self.service_catalog_path]:
+            self._written_paths[path] = None
+        print(f"📄 Wrote {len(catalog)} service pages and an index to {self.service_pages_dir}")
+        print("Point the MkDocs nav at applications/services/index.md, and set documentation.catalog_layout "
+              "to \"pages\" or \"auto\" if the automation configuration sets it to \"single\"")
+        
+        if self.config["documentation"]["auto_commit"]:
+            return self.commit_and_push_docs(
+                "", commit_message="docs: Split the service catalog into one page per service")
+        return True
+
+    def catalog_fingerprint(self) -> str:
+        """Names, sizes and modification times of the catalog's markdown files"""
+        import hashlib
+        
+        if self.uses_service_pages():
+            files = []
+            if self.service_pages_dir.is_dir():
+                with os.scandir(self.service_pages_dir) as entries:
+                    files = [entry for entry in entries if entry.name.endswith(".md")]
+            stats = sorted((entry.name, entry.stat().st_mtime_ns, entry.stat().st_size) for entry in files)
+        elif self.service_catalog_path.exists():
+            stat = self.service_catalog_path.stat()
+            stats = [(self.service_catalog_path.name, stat.st_mtime_ns, stat.st_size)]
+        else:
+            stats = []
+        return hashlib.sha256(json.dumps(stats).encode()).hexdigest()[:16]
+
+    def catalog_page(self, catalog: ServiceCatalog, service_name: str) -> str:
+        """Docs-relative link to a service's catalog entry"""
+        if self.uses_service_pages():
+            from catalog_pages import service_slug
+            loaded = getattr(catalog, "loaded", {})
+            page_name = loaded[service_name][0] if service_name in loaded else f"{service_slug(service_name)}.md"
+            return f"applications/services/{page_name}"
+        from link_checker import slugify
+        return f"{self.service_catalog_path.relative_to(self.docs_dir).as_posix()}#{slugify(service_name)}"
+
+    def open_catalog_index(self) -> "CatalogIndex":
+        if self._catalog_index is None:
+            from catalog_index import CatalogIndex
+            self._catalog_index = CatalogIndex(
+                self.base_dir / self.config["documentation"].get("catalog_index", ".cache/catalog-index.sqlite3"))
+        return self._catalog_index
+
+    def catalog_index(self) -> Optional["CatalogIndex"]:
+        """The catalog index, rebuilt from the catalog first if that changed since it was indexed"""
+        import sqlite3
+        
+        try:
+            index = self.open_catalog_index()
+            fingerprint = self.catalog_fingerprint()
+            if index.fingerprint() == fingerprint:
+                return index
+            catalog = self.load_service_catalog()
+            if catalog is None:
+                return None
+            print("🗂️ The catalog changed since it was indexed; rebuilding the catalog index")
+            self.sync_catalog_index(catalog, fingerprint=fingerprint)
+            return index
+        except (sqlite3.Error, OSError) as e:
+            print(f"⚠️ Could not open the catalog index: {e}")
+            return None
+
+    @timed()
+    def sync_catalog_index(self, catalog: ServiceCatalog, names: List[str] = None, fingerprint: str = None) -> int:
+        """Bring the index in line with the catalog, for every service or only the named ones
+        
+        Returns the number of rows that changed.
+        """
+        from catalog_index import service_record
+        
+        index = self.open_catalog_index()
+        if names is None:
+            names = set(catalog.names()) | set(index.names())
+        records, removed = [], []
+        for name in names:
+            section = catalog.get(name)
+            if section is None:
+                removed.append(name)
+                continue
+            records.append(service_record(name, section.text, self.catalog_page(catalog, name),
+                                          self._scanned_namespaces.get(name, "")))
+        changed = index.apply(records, removed, fingerprint or self.catalog_fingerprint())
+        self.metrics.add("index_rows_written", changed)
+        return changed
+
+    def update_catalog_index(self, catalog: ServiceCatalog, names: List[str]):
+        """Re-index the named services of the catalog just written and export the index to services.json
+        
+        Call with the catalog lock held. A failure is reported but does not fail
+        the catalog write; the next reader rebuilds the index.
+        """
+        import sqlite3
+        from file_lock import write_atomically
+        
+        try:
+            self.sync_catalog_index(catalog, names)
+            index = self.open_catalog_index()
+            path = self.catalog_index_json_path
+            if index.export_pending() or not path.exists():
+                content = index.export_json()
+                write_atomically(path, content)
+                index.mark_exported()
+                self._written_paths[path] = None
+                self.metrics.add("bytes_written", len(content.encode()))
+        except (sqlite3.Error, OSError) as e:
+            print(f"⚠️ Could not update the catalog index: {e}")
+        catalog.changed.clear()
+
+    def query_catalog(self, as_json: bool = False, **filters: Optional[str]) -> bool:
+        """Print the catalogued services matching the filters
+        
+        Returns False if none match or the index could not be read.
+        """
+        index = self.catalog_index()
+        if index is None:
+            return False
+        records = index.query(**filters)
+        if as_json:
+            print(json.dumps(records, indent=2, ensure_ascii=False))
+            return bool(records)
+        if not records:
+            print("No catalogued service matches")
+            return False
+        columns = ("name", "environment", "namespace", "url")
+        widths = {column: max(len(column), *(len(record[column]) for record in records)) for column in columns}
+        print("  ".join(column.upper().ljust(widths[column]) for column in columns).rstrip())
+        for record in records:
+            print("  ".join((record[column] or "-").ljust(widths[column]) for column in columns).rstrip())
+        print(f"🗂️ {len(records)} services")
+        return True
+
+    def lock_path(self, name: str) -> Path:
+        """Lock file shared by every run working on this checkout"""
+        return self.base_dir / ".cache" / f"{name}.lock"
+
+    def documentation_paths(self) -> List[Path]:
+        """Files the automation writes and commits"""
+        if self._written_paths:
+            return list(self._written_paths)
+        return [self.service_catalog_path]
+
+    def apply_catalog_change(self, catalog: ServiceCatalog, service_name: str, service_info: Dict,
+                             action: str) -> bool:
+        """Apply one add/update/remove to the catalog model; returns False if it was skipped
+        
+        An update to content the entry already has leaves catalog.dirty unset.
+        """
+        hashes = self.content_hashes()
+        if action == "add" or action == "update":
+            # Check if service already exists
+            if service_name in catalog:
+                if action == "add":
+                    print(f"Service {service_name} already exists in catalog. Use --action update to modify.")
+                    return False
+                # Update existing service
+                before = catalog.entry_hash(service_name)
+                catalog.update(service_name, service_info)
+                after = catalog.entry_hash(service_name)
+                if after != before and hashes.entry(service_name) not in (None, before):
+                    print(f"⚠️ {service_name} was edited by hand since the automation last wrote it; "
+                          f"replacing the entry")
+                hashes.set_entry(service_name, after)
+                return True
+            # Add new service
+            catalog.add(service_name, service_info)
+            hashes.set_entry(service_name, catalog.entry_hash(service_name))
+            return True
+                
+        elif action == "remove":
+            if not catalog.remove(service_name):
+                print(f"Service {service_name} not found in catalog")
+                return False
+            hashes.forget(service_name)
+            return True
+        
+        return False
+
+    def discord_notifier(self, webhook_url: str = None) -> Optional["DiscordNotifier"]:
+        """Return the buffering notifier for a webhook, creating it on first use"""
+        webhook_url = webhook_url or self.config["discord"]["webhook_url"]
+        
+        if not webhook_url:
+            if not self._webhook_missing_reported:
+                print("Discord webhook URL not configured")
+                self._webhook_missing_reported = True
+            return None
+            
+        if webhook_url not in self._notifiers:
+            from discord_notifier import DiscordNotifier
+            discord_config = self.config["discord"]
+            notifier = DiscordNotifier(
+                webhook_url,
+                username="Homelab Bot",
+                avatar_url="https://cdn.discordapp.com/attachments/123456789/bot-avatar.png",
+                timeout=discord_config.get("timeout", 10),
+                max_retries=discord_config.get("max_retries", 5)
+            )
+            self.metrics.instrument_session(notifier.session, "discord")
+            self._notifiers[webhook_url] = notifier
+        return self._notifiers[webhook_url]
+
+    @timed()
+    def send_discord_notification(self, message: str, webhook_url: str = None):
+        """Queue a plain-text notification for Discord; it is sent by close()"""
+        notifier = self.discord_notifier(webhook_url)
+        if notifier is None:
+            return False
+        if self.outbox() is not None:
+            return self.queue_discord_job({"content": message}, notifier.webhook_url)
+        notifier.add_message(message)
+        return True
+
+    def notify_service_event(self, action: str, service_name: str, service_info: Dict = None):
+        """Queue a Discord embed describing a catalog change"""
+        notifier = self.discord_notifier()
+        if notifier is None:
+            return False
+        service_info = service_info or {}
+        
+        if action == "add":
+            title = "🚀 New Service Deployed!"
+            description = f"""**Service**: {service_name}
+**URL**: {service_info.get('url', '')}
+**Description**: {service_info.get('description', '')}
+
+Service catalog has been updated automatically! 📖"""
+        elif action == "update":
+            title = "🔄 Service Updated!"
+            description = f"""**Service**: {service_name}
+**Description**: {service_info.get('description', '')}
+
+Documentation has been updated! 📖"""
+        else:
+            title = "🗑️ Service Removed"
+            description = f"""**Service**: {service_name}
+
+Service has been removed from the catalog."""
+            
+        url = service_info.get("url") or ""
+        url = url if url.startswith("http") else None
+        if self.outbox() is not None:
+            return self.queue_discord_job(
+                {"title": title, "description": description, "kind": action, "url": url},
+                notifier.webhook_url
+            )
+        notifier.add_event(title, description, kind=action, url=url)
+        return True
+
+    def queue_discord_job(self, message: Dict, webhook_url: str) -> bool:
+        """Record a Discord message in the outbox"""
+        payload = dict(message, webhook_url=webhook_url)
+        key = self.outbox_key("discord", payload)
+        payload["timestamp"] = datetime.now(timezone.utc).isoformat()
+        self.outbox().enqueue("discord", key, payload)
+        self._queued_kinds.add("discord")
+        return True
+
+    @timed()
+    def flush_notifications(self) -> bool:
+        """Send all buffered Discord notifications as coalesced messages
+        
+        Returns False if any message had to be dropped.
+        """
+        if self.outbox() is not None:
+            return self.deliver_inline("discord")
+        delivered = True
+        for notifier in self._notifiers.values():
+            if not notifier.pending_embeds and not notifier.pending_content:
+                continue
+            dropped_before = notifier.stats["dropped_messages"]
+            stats = notifier.flush()
+            status = "⚠️" if stats["dropped_messages"] else "📢"
+            print(f"{status} Discord: {notifier.summary()}")
+            delivered = delivered and stats["dropped_messages"] == dropped_before
+        return delivered
+
+    def uptime_kuma_client(self, uptime_kuma_config: Dict = None) -> Optional["UptimeKumaClient"]:
+        """Return a logged-in Uptime Kuma client, connecting once per run (or daemon batch)"""
+        from uptime_kuma_client import UptimeKumaClient, UptimeKumaError
+        
+        config = uptime_kuma_config or self.config["uptime_kuma"]
+
+        if not self.uptime_kuma_configured(config):
+            print("Uptime Kuma configuration incomplete")
+            return None
+
+        key = (config["url"], config["username"])
+        if key in self._kuma_clients:
+            client = self._kuma_clients[key]
+            if client is None or client.logged_in:
+                return client
+            # The connection dropped since the last use; log in again
+            print("🔌 Lost the Uptime Kuma connection, reconnecting")
+            client.close()
+
+        client = UptimeKumaClient(config["url"], config["username"], config["password"],
+                                  timeout=config.get("timeout", 30),
+                                  max_retries=config.get("max_retries", 3))
+        self.metrics.instrument_session(client.session, "uptime_kuma")
+        try:
+            with self.metrics.span("uptime_kuma_login"):
+                client.login()
+            print(f"✅ Successfully authenticated with Uptime Kuma")
+        except UptimeKumaError as e:
+            print(f"❌ Could not connect to Uptime Kuma: {e}")
+            client.close()
+            client = None
+        # Remember failures too, so a run does not retry the login for every service;
+        # end_batch() forgets them so the daemon's next batch tries again
+        self._kuma_clients[key] = client
+        return client
+
+    def uptime_kuma_configured(self, uptime_kuma_config: Dict = None) -> bool:
+        """Whether the URL and credentials needed to log in to Uptime Kuma are all set"""
+        config = uptime_kuma_config or self.config["uptime_kuma"]
+        return all([config.get("url"), config.get("username"), config.get("password")])
+
+    def monitor_spec(self, service_name: str, url: str) -> Dict:
+        """Uptime Kuma monitor definition for an automated service"""
+        import monitor_reconciler
+        from uptime_kuma_client import build_http_monitor
+        
+        overrides = self.config["uptime_kuma"].get("monitor_defaults") or {}
+        return build_http_monitor(service_name, url,
+                                  description=f"{monitor_reconciler.MANAGED_DESCRIPTION_PREFIX}{service_name}",
+                                  **overrides)
+
+    def content_hashes(self) -> "ContentHashes":
+        """Hashes of the entries and monitor specs last applied, loaded once per run"""
+        if self._hashes is None:
+            from content_hashes import ContentHashes
+            self._hashes = ContentHashes(self.content_hashes_path)
+        return self._hashes
+
+    def monitor_hash(self, service_name: str, url: str) -> str:
+        from content_hashes import canonical_hash
+        return canonical_hash(self.monitor_spec(service_name, url))
+
+    def monitor_outdated(self, service_name: str, url: str) -> bool:
+        """Whether Uptime Kuma has not yet been given a monitor with this spec for the service"""
+        return self.content_hashes().monitor(service_name) != self.monitor_hash(service_name, url)
+
+    def create_uptime_monitor(self, service_name: str, url: str, uptime_kuma_config: Dict = None):
+        """Create an Uptime Kuma monitor for the service"""
+        return self.create_uptime_monitors([(service_name, url)], uptime_kuma_config)
+
+    @timed()
+    def create_uptime_monitors(self, services: List[Tuple[str, str]], uptime_kuma_config: Dict = None):
+        """Create Uptime Kuma monitors for several (name, url) pairs over one connection"""
+        if not services:
+            return True
+        outbox = self.outbox()
+        # A job without credentials could never be delivered, so none is queued
+        if outbox is not None and uptime_kuma_config is None and self.uptime_kuma_configured():
+            for service_name, url in services:
+                payload = {"name": service_name, "url": url}
+                outbox.enqueue("uptime_kuma", self.outbox_key("uptime_kuma", payload), payload)
+            self._queued_kinds.add("uptime_kuma")
+            return self.deliver_inline("uptime_kuma")
+            
+        client = self.uptime_kuma_client(uptime_kuma_config)
+        base_url = (uptime_kuma_config or self.config["uptime_kuma"]).get("url")
+
+        if client is None:
+            self.print_manual_monitor_setup(base_url, services)
+            return False
+
+        failed = self.add_missing_monitors(client, services)
+        if failed:
+            self.print_manual_monitor_setup(base_url, list(failed))
+        return not failed
+
+    def add_missing_monitors(self, client: "UptimeKumaClient",
+                             services: List[Tuple[str, str]]) -> Dict[Tuple[str, str], str]:
+        """Add monitors for services that have none yet; returns {(name, url): error} for failures"""
+        from uptime_kuma_client import UptimeKumaError
+        
+        to_create = []
+        hashes = self.content_hashes()
+        for service_name, url in services:
+            # Check for existing monitor with same name or URL
+            if client.find_monitor(name=service_name, url=url):
+                print(f"⚠️ Monitor for {service_name} already exists, skipping creation")
+                hashes.set_monitor(service_name, self.monitor_hash(service_name, url))
+            else:
+                print(f"Creating Uptime Kuma monitor for {service_name} at {url}")
+                to_create.append((service_name, url))
+
+        if not to_create:
+            return {}
+
+        self.metrics.add("monitors_created", len(to_create))
+        try:
+            results = client.add_monitors([self.monitor_spec(name, url) for name, url in to_create])
+        except UptimeKumaError as e:
+            # Neither the batch nor the lookup of what it created got through;
+            # the next attempt finds any monitor Uptime Kuma did create
+            results = [{"ok": False, "msg": str(e)} for _ in to_create]
+        failed = {}
+        for (service_name, url), result in zip(to_create, results):
+            if result.get("ok"):
+                print(f"✅ Successfully created Uptime Kuma monitor for {service_name}")
+                hashes.set_monitor(service_name, self.monitor_hash(service_name, url))
+            else:
+                print(f"❌ Failed to create Uptime Kuma monitor for {service_name}: {result.get('msg')}")
+                failed[(service_name, url)] = result.get("msg") or "monitor was not created"
+        return failed
+
+    def desired_monitors(self, use_cache: bool = True, jobs: int = None) -> Optional[Dict[str, Dict]]:
+        """Monitor definitions for every catalogued or detected service with an HTTP URL
+        
+        Returns None if the manifests or the catalog cannot be read: monitors
+        missing from a partial set would be planned for deletion.
+        """
+        if not self.k8s_config_dir.exists():
+            print(f"k8s-cluster-config not found at {self.k8s_config_dir}")
+            return None
+        urls = {}
+        for change in self.detect_service_changes(use_cache=use_cache, jobs=jobs):
+            urls.setdefault(change["name"], change.get("url"))
+        index = self.catalog_index()
+        if index is None:
+            return None
+        # The catalog is curated, so its URLs win over scan results
+        urls.update(index.service_urls())
+        return {
+            name: self.monitor_spec(name, url)
+            for name, url in urls.items()
+            if url and url.startswith('http')
+        }
+
+    @timed()
+    def reconcile_monitors(self, dry_run: bool = False, workers: int = None,
+                           use_cache: bool = True, jobs: int = None) -> bool:
+        """Bring Uptime Kuma in line with the catalog and scan in a single pass"""
+        import monitor_reconciler
+        
+        desired = self.desired_monitors(use_cache=use_cache, jobs=jobs)
+        if desired is None:
+            print("❌ Not reconciling monitors without the full set of services")
+            return False
+        client = self.uptime_kuma_client()
+        if client is None:
+            return False
+            
+        plan = monitor_reconciler.plan_reconciliation(desired, client.monitors())
+        print(f"🔁 Monitor reconciliation: {len(plan['create'])} to create, "
+              f"{len(plan['update'])} to update, {len(plan['delete'])} to delete, "
+              f"{len(plan['unchanged'])} unchanged")
+        for spec in plan["create"]:
+            print(f"   + {spec['name']} ({spec['url']})")
+        for _, name, changes in plan["update"]:
+            print(f"   ~ {name}: {', '.join(f'{field}={value}' for field, value in changes.items())}")
+        for _, name in plan["delete"]:
+            print(f"   - {name}")
+            
+        if dry_run:
+            print("Dry run, no changes applied")
+            return True
+            
+        if workers is None:
+            workers = self.config["uptime_kuma"].get("reconcile_workers", 4)
+        results = monitor_reconciler.apply_plan(client, plan, workers)
+        failures = [result for result in results if not result[2]]
+        for operation, name, _, message in failures:
+            print(f"❌ Failed to {operation} monitor {name}: {message}")
+        print(f"✅ Applied {len(results) - len(failures)} of {len(results)} monitor changes")
+        return not failures
+
+    @timed()
+    def probe_services(self, as_json: bool = False) -> bool:
+        """Probe every catalogued service URL concurrently and print a report
+        
+        Returns False if any service is down or the catalog could not be read.
+        """
+        from http_probe import Prober, format_report
+        
+        index = self.catalog_index()
+        if index is None:
+            return False
+        services = {name: url for name, url in index.service_urls().items() if url.startswith('http')}
+        probe_config = self.config.get("probe", {})
+        prober = Prober(
+            concurrency=probe_config.get("concurrency", 50),
+            per_host=probe_config.get("per_host", 4),
+            timeout=probe_config.get("timeout", 10),
+            connect_timeout=probe_config.get("connect_timeout", 5),
+            max_redirects=probe_config.get("max_redirects", 5),
+            verify_tls=probe_config.get("verify_tls", True)
+        )
+        
+        started = time.monotonic()
+        results = prober.run(services)
+        elapsed = time.monotonic() - started
+        for result in results:
+            if result["status"] is not None:
+                self.metrics.observe_http("probe", "GET", result["status"], result["total_ms"] / 1000)
+        up = sum(1 for result in results if result["ok"])
+        self.metrics.add("services", len(results))
+        self.metrics.add("services_down", len(results) - up)
+        
+        if as_json:
+            print(json.dumps({"seconds": round(elapsed, 3), "up": up, "down": len(results) - up,
+                              "results": results}, indent=2))
+        else:
+            print(f"🩺 Probed {len(results)} services in {elapsed:.2f}s")
+            if results:
+                print(format_report(results))
+            print(f"{'✅' if up == len(results) else '⚠️'} {up} of {len(results)} services up")
+        return up == len(results)
+
+    @timed()
+    def check_links(self, as_json: bool = False, offline: bool = False) -> bool:
+        """Check every link in the docs: internal ones offline, external ones over HTTP
+        
+        Returns False if any link is broken.
+        """
+        import re
+        from http_probe import Prober
+        from link_checker import LinkCache, LinkChecker, extract_links, format_report, resolve_internal
+        
+        link_config = self.config.get("link_check", {})
+        started = time.monotonic()
+        with self.metrics.span("link_extract"):
+            external, internal = extract_links(self.docs_dir)
+        
+        problems = []
+        anchors = {}
+        with self.metrics.span("link_internal"):
+            for (page, target), places in internal.items():
+                reason = resolve_internal(self.docs_dir, page, target, anchors)
+                if reason:
+                    problems.append({"link": target, "places": places, "status": None, "error": reason})
+        
+        patterns = [re.compile(pattern) for pattern in link_config.get("exclude") or []]
+        urls = [url for url in external if not any(pattern.search(url) for pattern in patterns)]
+        results, cached = [], 0
+        if not offline:
+            cache = LinkCache(self.base_dir / link_config.get("cache_path", ".cache/link-check.json"),
+                              link_config.get("ttl_hours", 24) * 3600)
+            prober = Prober(
+                concurrency=link_config.get("concurrency", 20),
+                per_host=link_config.get("per_host", 2),
+                timeout=link_config.get("timeout", 15),
+                connect_timeout=link_config.get("connect_timeout", 5),
+                max_redirects=link_config.get("max_redirects", 5),
+                verify_tls=link_config.get("verify_tls", True),
+                host_interval=link_config.get("host_interval", 0.2)
+            )
+            with self.metrics.span("link_external"):
+                results, cached = LinkChecker(prober, cache).run(urls)
+            try:
+                cache.save()
+            except OSError as e:
+                print(f"⚠️ Could not save the link cache to {cache.path}: {e}")
+        for result in results:
+            if result["status"] is not None:
+                self.metrics.observe_http("links", result["method"], result["status"], result["total_ms"] / 1000)
+            if not result["ok"]:
+                problems.append({"link": result["url"], "places": external[result["url"]], "status": result["status"],
+                                 "error": result["error"], "rate_limited": result["rate_limited"]})
+        elapsed = time.monotonic() - started
+        
+        broken = [problem for problem in problems if not problem.get("rate_limited")]
+        revalidated = sum(1 for result in results if result["revalidated"])
+        self.metrics.add("links", len(external) + len(internal))
+        self.metrics.add("links_broken", len(broken))
+        if as_json:
+            print(json.dumps({"seconds": round(elapsed, 3), "internal": len(internal), "external": len(external),
+                              "excluded": len(external) - len(urls), "checked": len(results), "cached": cached,
+                              "revalidated": revalidated, "problems": problems}, indent=2))
+        else:
+            print(f"🔗 Found {len(internal)} internal and {len(external)} external links")
+            if offline:
+                print("🌐 External links not checked (--offline)")
+            else:
+                print(f"🌐 Requested {len(results)} external links in {elapsed:.2f}s: {cached} still fresh in the cache, "
+                      f"{revalidated} unchanged since the last check, {len(external) - len(urls)} excluded")
+            if problems:
+                print(format_report(problems))
+            print(f"{'✅' if not broken else '❌'} {len(broken)} broken links")
+        return not broken
+
+    def print_manual_monitor_setup(self, base_url: str, services: List[Tuple[str, str]]):
+        """Fallback: provide manual instructions"""
+        print(f"📋 Manual setup required:")
+        print(f"   1. Go to {base_url}")
+        for service_name, url in services:
+            print(f"   2. Create monitor for {service_name} at {url}")
+
+    def outbox(self) -> Optional["Outbox"]:
+        """Return the side-effect outbox, or None when it is disabled"""
+        outbox_config = self.config.get("outbox", {})
+        if not outbox_config.get("enabled"):
+            return None
+        if self._outbox is None:
+            from outbox import Outbox
+            self._outbox = Outbox(
+                self.base_dir / outbox_config.get("path", ".cache/outbox.sqlite3"),
+                max_attempts=outbox_config.get("max_attempts", 10),
+                backoff_base=outbox_config.get("backoff_base", 30),
+                backoff_max=outbox_config.get("backoff_max", 3600)
+            )
+        return self._outbox
+
+    def outbox_key(self, kind: str, payload: Dict) -> str:
+        """Idempotency key: the same side effect for the same catalog revision is recorded once"""
+        import hashlib
+        digest = hashlib.sha256(
+            json.dumps([payload, self.catalog_revision], sort_keys=True).encode()
+        ).hexdigest()
+        return f"{kind}:{digest[:24]}"
+
+    def deliver_inline(self, kind: str) -> bool:
+        """Attempt the jobs of one kind queued by this run, unless delivery is deferred"""
+        if kind not in self._queued_kinds:
+            return True
+        self._queued_kinds.discard(kind)
+        if self.config["outbox"].get("delivery", "inline") != "inline":
+            print(f"📥 Queued {kind} jobs; run --action drain to deliver them")
+            return True
+        stats = self.drain_outbox(kinds=[kind])
+        return not stats["retrying"] and not stats["dead"]
+
+    @timed()
+    def drain_outbox(self, kinds: List[str] = None, batch_size: int = None) -> Dict[str, int]:
+        """Replay due outbox jobs in batches; returns delivered/retrying/dead counts"""
+        outbox = self.outbox()
+        if outbox is None:
+            return {"delivered": 0, "retrying": 0, "dead": 0}
+        handlers = {
+            "discord": self.deliver_discord_jobs,
+            "uptime_kuma": self.deliver_monitor_jobs,
+            "git_push": self.deliver_push_jobs,
+        }
+        stats = outbox.drain(handlers, batch_size=batch_size or self.config["outbox"].get("batch_size", 50),
+                             kinds=kinds)
+        if any(stats.values()):
+            status = "⚠️" if stats["retrying"] or stats["dead"] else "📤"
+            print(f"{status} Outbox: {stats['delivered']} delivered, {stats['retrying']} will be retried, "
+                  f"{stats['dead']} given up")
+        return stats
+
+    @timed()
+    def deliver_discord_jobs(self, jobs: List["Job"]) -> Dict[int, Optional[str]]:
+        """Outbox handler: send queued Discord messages, coalesced per webhook"""
+        notifiers = {}
+        for job in jobs:
+            payload = job.payload
+            notifier = self.discord_notifier(payload["webhook_url"])
+            if "content" in payload:
+                notifier.add_message(payload["content"], ref=job.id)
+            else:
+                notifier.add_event(payload["title"], payload["description"], kind=payload.get("kind", "info"),
+                                   url=payload.get("url"), ref=job.id, timestamp=payload.get("timestamp"))
+            notifiers[payload["webhook_url"]] = notifier
+            
+        errors = {}
+        for notifier in notifiers.values():
+            notifier.dropped_refs.clear()
+            notifier.flush()
+            print(f"{'⚠️' if notifier.dropped_refs else '📢'} Discord: {notifier.summary()}")
+            errors.update({ref: "Discord did not accept the message" for ref in notifier.dropped_refs})
+        return errors
+
+    @timed()
+    def deliver_monitor_jobs(self, jobs: List["Job"]) -> Dict[int, Optional[str]]:
+        """Outbox handler: create queued Uptime Kuma monitors over one connection"""
+        from outbox import PermanentFailure
+        if not self.uptime_kuma_configured():
+            raise PermanentFailure("Uptime Kuma configuration incomplete")
+        client = self.uptime_kuma_client()
+        if client is None:
+            return {job.id: "Uptime Kuma is not reachable" for job in jobs}
+        failed = self.add_missing_monitors(
+            client, [(job.payload["name"], job.payload["url"]) for job in jobs])
+        return {job.id: failed.get((job.payload["name"], job.payload["url"])) for job in jobs}
+
+    @timed()
+    def deliver_push_jobs(self, jobs: List["Job"]) -> Dict[int, Optional[str]]:
+        """Outbox handler: one git push delivers every queued docs commit"""
+        self.metrics.add("commits", len(jobs))
+        try:
+            subprocess.run(["git", "push"], cwd=self.base_dir, check=True, capture_output=True,
+                           text=True, timeout=self.step_timeout("git"))
+        except subprocess.CalledProcessError as e:
+            error = (e.stderr or str(e)).strip()
+            print(f"Git push failed: {error}")
+            return {job.id: error for job in jobs}
+        except subprocess.TimeoutExpired as e:
+            print(f"Git push timed out: {e}")
+            return {job.id: str(e) for job in jobs}
+        print("Documentation changes pushed")
+        return {}
+
+    def close(self):
+        """Flush buffered notifications, save content hashes, export metrics and close connections"""
+        self.flush_notifications()
+        self.save_content_hashes()
+        self.export_metrics()
+        for client in self._kuma_clients.values():
+            if client:
+                client.close()
+        self._kuma_clients.clear()
+        if self._outbox is not None:
+            self._outbox.close()
+            self._outbox = None
+        if self._catalog_index is not None:
+            self._catalog_index.close()
+            self._catalog_index = None
+        if self._git is not None:
+            self._git.close()
+            self._git = None
+
+    def save_content_hashes(self):
+        """Write the entry and monitor hashes recorded by this run"""
+        from file_lock import locked
+        if self._hashes is None or not self._hashes.changed:
+            return
+        try:
+            with locked(self.lock_path("hashes"), self.config["documentation"].get("lock_timeout", 60)):
+                self._hashes.save()
+        except (OSError, TimeoutError) as e:
+            print(f"⚠️ Could not save content hashes to {self.content_hashes_path}: {e}")
+
+    def export_metrics(self):
+        """Write the run's phase metrics to the configured JSON and Prometheus textfile paths"""
+        metrics_config = self.config.get("metrics", {})
+        exports = [
+            (metrics_config.get("json_path"), self.metrics.write_json),
+            (metrics_config.get("textfile_path"), self.metrics.write_prometheus),
+        ]
+        for path, write in exports:
+            if not path:
+                continue
+            try:
+                write(self.base_dir / path)
+            except OSError as e:
+                print(f"⚠️ Could not write metrics to {path}: {e}")
+
+    @timed()
+    def commit_and_push_docs(self, service_name: str, commit_message: str = None):
+        """Commit and push documentation changes"""
+        if not self.config["documentation"]["auto_commit"]:
+            print("Auto-commit disabled")
+            return False
+            
+        from file_lock import locked
+        from git_backend import GitBackendError
+        
+        commit_message = commit_message or self.config["documentation"]["commit_message_template"].format(
+            service_name=service_name
+        )
+        try:
+            # Concurrent runs would otherwise race for the git index
+            with locked(self.lock_path("git"), self.config["documentation"].get("lock_timeout", 60)):
+                # Stage and commit only the files the automation writes, so unrelated
+                # work in the checkout is never swept into an automated commit. They
+                # are read under the lock, so a catalog another run merged into
+                # since this run wrote it is committed as it is on disk.
+                with self.metrics.span("git_add") as span:
+                    files = {
+                        path.relative_to(self.base_dir).as_posix(): path.read_bytes() if path.exists() else None
+                        for path in self.documentation_paths()
+                    }
+                    span.add("files", len(files))
+                with self.metrics.span("git_commit"):
+                    revision = self.git_backend().commit_files(files, commit_message)
+                self._written_paths.clear()
+            if revision is None:
+                print("No changes to commit")
+                return True
+            
+            # Push changes, through the outbox when it is enabled
+            outbox = self.outbox()
+            if outbox is not None:
+                outbox.enqueue("git_push", f"git_push:{revision}", {"revision": revision})
+                self._queued_kinds.add("git_push")
+                print("Documentation changes committed")
+                return self.deliver_inline("git_push")
+            with self.metrics.span("git_push"):
+                subprocess.run(["git", "push"], cwd=self.base_dir, check=True,
+                               timeout=self.step_timeout("git"))
+            
+            print("Documentation changes committed and pushed")
+            return True
+            
+        except (subprocess.CalledProcessError, GitBackendError, OSError) as e:
+            print(f"Git operation failed: {e}")
+            return False
+        except (subprocess.TimeoutExpired, TimeoutError) as e:
+            print(f"Git operation timed out: {e}")
+            return False
+
+    def git_backend(self):
+        """The git backend of documentation.git_backend, opened once per run"""
+        if self._git is None:
+            from git_backend import open_backend
+            self._git = open_backend(self.base_dir, self.config["documentation"].get("git_backend", "auto"))
+            print(f"🔧 Git backend: {self._git.name}")
+        return self._git
+
+    @timed()
+    def process_service(self, action: str, service_name: str, **kwargs) -> List[Dict]:
+        """Process a service action (add/update/remove)
+        
+        Returns the per-step status report (empty if the catalog was not changed).
+        """
+        if action in ["add", "update"]:
+            service_info = {
+                "url": kwargs.get("url", ""),
+                "description": kwargs.get("description", ""),
+                "why_selected": kwargs.get("why_selected", ""),
+                "maintainer": kwargs.get("maintainer", "")
+            }
+        elif action == "remove":
+            service_info = {}
+        else:
+            return []
+            
+        # Update documentation
+        started = time.monotonic()
+        updated = self.update_service_catalog(service_name, service_info, action)
+        if updated is False:
+            return []
+        url = service_info.get('url') or ""
+        wants_monitor = action != "remove" and url.startswith('http')
+        if updated is None:
+            # Same content as before: nothing to write, commit or announce
+            self.metrics.add("unchanged")
+            print(f"⏭️ {service_name} is unchanged; skipping the catalog write, commit and notification")
+            report = [{"step": name, "status": "skipped", "seconds": 0.0, "detail": "unchanged"}
+                      for name in ("catalog", "git", "discord")]
+            if wants_monitor and self.monitor_outdated(service_name, url):
+                report += self.run_side_effects(
+                    [("uptime_kuma", lambda: self.create_uptime_monitor(service_name, url))])
+            elif wants_monitor:
+                report.append({"step": "uptime_kuma", "status": "skipped", "seconds": 0.0, "detail": "unchanged"})
+            self.print_step_report(service_name, report, time.monotonic() - started)
+            return report
+        if action == "remove":
+            print(f"Service {service_name} removed from catalog")
+        else:
+            print(f"Service catalog updated for {service_name}")
+        catalog_step = {"step": "catalog", "status": "ok", "seconds": time.monotonic() - started, "detail": ""}
+        
+        def notify():
+            if not self.notify_service_event(action, service_name, service_info):
+                return None
+            return self.flush_notifications()
+        
+        # Commit changes, send Discord notification and create Uptime Kuma
+        # monitor for external services; these do not depend on each other
+        steps = [
+            ("git", lambda: self.commit_and_push_docs(service_name)),
+            ("discord", notify),
+        ]
+        if wants_monitor and self.monitor_outdated(service_name, url):
+            steps.append(("uptime_kuma", lambda: self.create_uptime_monitor(service_name, url)))
+            
+        report = [catalog_step] + self.run_side_effects(steps)
+        self.print_step_report(service_name, report, time.monotonic() - started)
+        return report
+
+    def step_timeout(self, step: str) -> float:
+        """Configured timeout in seconds for a side-effect step"""
+        return self.config.get("execution", {}).get("timeouts", {}).get(step, 60)
+
+    def run_side_effects(self, steps: List[Tuple[str, Callable]], concurrent: bool = None) -> List[Dict]:
+        """Run independent side effects, concurrently when execution.mode is "concurrent"
+        
+        Each step is a (name, callable) pair; returning False marks the step as
+        failed and returning None as skipped. In concurrent mode every step is
+        bounded by its execution.timeouts entry, so end-to-end latency is that of
+        the slowest step rather than the sum.
+        """
+        if concurrent is None:
+            concurrent = self.config.get("execution", {}).get("mode") == "concurrent"
+        
+        def run(name: str, func: Callable) -> Dict:
+            started = time.monotonic()
+            try:
+                result = func()
+                status = {None: "skipped", False: "failed"}.get(result, "ok")
+                detail = ""
+            except Exception as e:
+                status, detail = "error", str(e)
+            return {"step": name, "status": status, "seconds": time.monotonic() - started, "detail": detail}
+        
+        if not concurrent:
+            return [run(name, func) for name, func in steps]
+            
+        from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+        report = []
+        executor = ThreadPoolExecutor(max_workers=len(steps), thread_name_prefix="side-effect")
+        try:
+            started = time.monotonic()
+            futures = [(name, executor.submit(run, name, func)) for name, func in steps]
+            for name, future in futures:
+                remaining = started + self.step_timeout(name) - time.monotonic()
+                try:
+                    report.append(future.result(timeout=max(0, remaining)))
+                except FutureTimeoutError:
+                    report.append({"step": name, "status": "timeout",
+                                   "seconds": time.monotonic() - started,
+                                   "detail": f"no result after {self.step_timeout(name)}s"})
+        finally:
+            # Do not wait for steps that timed out; they finish in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+        return report
+
+    def print_step_report(self, subject: str, report: List[Dict], elapsed: float):
+        """Print an aggregated status report for one processed change"""
+        icons = {"ok": "✅", "skipped": "⏭️", "failed": "❌", "error": "❌", "timeout": "⏱️"}
+        print(f"📋 Status for {subject} ({elapsed:.2f}s):")
+        for entry in report:
+            detail = f"  {entry['detail']}" if entry["detail"] else ""
+            print(f"   {icons.get(entry['status'], '•')} {entry['step']:<12} {entry['status']:<8} "
+                  f"{entry['seconds']:.2f}s{detail}")
+
+    @timed()
+    def process_batch(self, changeset: List[Dict]) -> List[Dict]:
+        """Apply a set of service changes with one catalog write, one commit and one push
+        
+        Each change is a dict with "action" (add/update/remove), "name" and, for
+        add/update, "service_info". Returns the changes that were actually applied.
+        """
+        if not changeset:
+            return []
+        catalog = self.load_service_catalog()
+        if catalog is None:
+            return []
+        
+        applied = []
+        unchanged = 0
+        for change in changeset:
+            catalog.dirty = False
+            if not self.apply_catalog_change(catalog, change["name"],
+                                             change.get("service_info", {}), change["action"]):
+                continue
+            if catalog.dirty:
+                applied.append(change)
+            else:
+                unchanged += 1
+        if unchanged:
+            self.metrics.add("unchanged", unchanged)
+            print(f"⏭️ Skipping {unchanged} unchanged services")
+            
+        if not applied:
+            print("Service catalog already up to date")
+            return []
+            
+        started = time.monotonic()
+        self.write_service_catalog(catalog)
+        print(f"Service catalog updated for {len(applied)} services")
+        for change in applied:
+            self.notify_service_event(change["action"], change["name"], change.get("service_info"))
+        
+        monitors = []
+        for change in applied:
+            url = change.get("service_info", {}).get("url") or ""
+            if (change["action"] in ["add", "update"] and url.startswith('http')
+                    and self.monitor_outdated(change["name"], url)):
+                monitors.append((change["name"], url))
+        
+        steps = [
+            ("git", lambda: self.commit_and_push_docs(
+                ", ".join(change["name"] for change in applied),
+                commit_message=self.batch_commit_message(applied)
+            )),
+            ("discord", lambda: self.flush_notifications() if self._notifiers else None),
+        ]
+        if monitors:
+            steps.append(("uptime_kuma", lambda: self.create_uptime_monitors(monitors)))
+        report = self.run_side_effects(steps)
+        self.print_step_report(f"{len(applied)} services", report, time.monotonic() - started)
+                
+        return applied
+
+    def changeset_from_scan(self, changes: List[Dict], removals: List[Dict] = None) -> List[Dict]:
+        """Turn detected and removed services into a process_batch() changeset"""
+        changeset = []
+        for change in changes:
+            print(f"Detected service: {change}")
+            self._scanned_namespaces[change["name"]] = change["namespace"]
+            changeset.append({
+                "action": "add",
+                "name": change["name"],
+                "service_info": {
+                    "url": change.get("url", ""),
+                    "description": f"Kubernetes service in {change['namespace']} namespace",
+                    "why_selected": "",
+                    "maintainer": ""
+                }
+            })
+        for removal in removals or []:
+            print(f"Detected removed service: {removal}")
+            changeset.append({"action": "remove", "name": removal["name"]})
+        return changeset
+
+    def process_changed_files(self, changed_files: Dict[str, str], old_rev: str = None,
+                              use_cache: bool = True, jobs: int = None) -> List[Dict]:
+        """Rescan the given manifests and apply the resulting catalog changes"""
+        changes, removals = self.detect_incremental_changes(
+            changed_files, old_rev=old_rev, use_cache=use_cache, jobs=jobs)
+        return self.process_batch(self.changeset_from_scan(changes, removals))
+
+    def run_daemon(self, jobs: int = None):
+        """Watch k8s-cluster-config and process changed manifests until stopped
+        
+        Parsed manifests stay in memory between rescans. Changes come from the
+        file watcher and from the trigger socket, and are debounced so a burst
+        of writes (a checkout, a multi-file commit) becomes one batch.
+        """
+        import queue
+        import signal
+        import threading
+        from manifest_watcher import Debouncer, create_watcher
+        
+        daemon_config = self.config.get("daemon", {})
+        host = daemon_config.get("host", "127.0.0.1")
+        port = daemon_config.get("port", 8765)
+        
+        if not self.k8s_config_dir.exists():
+            print(f"k8s-cluster-config not found at {self.k8s_config_dir}")
+            return False
+        
+        # Start watching first, so nothing written during the initial scan is missed
+        watcher = create_watcher(self.k8s_config_dir, self.detection,
+                                 daemon_config.get("watcher", "auto"),
+                                 daemon_config.get("poll_interval", 2.0))
+        if daemon_config.get("initial_scan", True):
+            # Pick up anything that changed while the daemon was not running
+            self.process_batch(self.changeset_from_scan(self.detect_service_changes(jobs=jobs)))
+            self.end_batch()
+        
+        debouncer = Debouncer(daemon_config.get("debounce", 2.0), daemon_config.get("max_delay", 30.0))
+        triggers: "queue.Queue[Dict[str, str]]" = queue.Queue()
+        status = {"watcher": type(watcher).__name__, "batches": 0, "manifests": 0}
+        try:
+            server = self.start_trigger_server(host, port, triggers, debouncer, status)
+        except OSError as e:
+            print(f"❌ Could not listen on {host}:{port}: {e}")
+            watcher.close()
+            return False
+        
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+        print(f"👀 Watching {self.k8s_config_dir} with {status['watcher']}, "
+              f"triggers on {host}:{server.server_address[1]}")
+        
+        try:
+            while not stop.is_set():
+                timeout = debouncer.timeout()
+                debouncer.add(watcher.poll(0.2 if timeout is None else min(0.2, timeout)))
+                while not triggers.empty():
+                    debouncer.add(triggers.get_nowait())
+                    
+                changed_files = debouncer.take()
+                if not changed_files:
+                    continue
+                changed_files = self.expand_removed_directories(changed_files)
+                print(f"🔄 Rescanning {len(changed_files)} changed manifests")
+                try:
+                    self.process_changed_files(changed_files, jobs=jobs)
+                except Exception as e:
+                    print(f"❌ Processing changes failed: {e}")
+                self.end_batch()
+                status["batches"] += 1
+                status["manifests"] += len(changed_files)
+        finally:
+            server.shutdown()
+            server.server_close()
+            watcher.close()
+        print("👋 Daemon stopped")
+        return True
+
+    def end_batch(self):
+        """Get the daemon's long-lived automator ready for the next batch
+        
+        Saves the content hashes the batch recorded, so a crash does not lose
+        them, and exports the batch's metrics as a run of its own. Counters
+        start afresh, and failed or disconnected Uptime Kuma clients are
+        dropped so the next batch logs in again.
+        """
+        self.save_content_hashes()
+        self.export_metrics()
+        self.metrics.reset()
+        if self._manifest_cache is not None:
+            self._manifest_cache.reset_counters()
+        for key, client in list(self._kuma_clients.items()):
+            if client is None or not client.logged_in:
+                del self._kuma_clients[key]
+                if client is not None:
+                    client.close()
+
+    def expand_removed_directories(self, changed_files: Dict[str, str]) -> Dict[str, str]:
+        """Replace removed "<dir>/" entries with the cached manifests that were under them"""
+        cache = self.open_manifest_cache()
+        expanded = {}
+        for rel_path, change in changed_files.items():
+            if not rel_path.endswith("/"):
+                expanded[rel_path] = change
+            elif cache:
+                expanded.update({key: "D" for key in cache.entries if key.startswith(rel_path)})
+        return expanded
+
+    def start_trigger_server(self, host: str, port: int, triggers: "queue.Queue",
+                             debouncer: "Debouncer", status: Dict) -> "socketserver.TCPServer":
+        """Serve the daemon's line-based trigger protocol on a local TCP socket
+        
+        "scan" followed by one changed path per line and an empty line queues a
+        rescan of those paths; "status" and "ping" report on the daemon.
+        """
+        import socketserver
+        import threading
+        
+        automator = self
+        
+        class TriggerHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                command = self.rfile.readline().decode().strip()
+                if command == "scan":
+                    lines = []
+                    for line in self.rfile:
+                        line = line.decode().strip()
+                        if not line:
+                            break
+                        lines.append(line)
+                    changed_files = automator.changed_files_from_lines(lines)
+                    triggers.put(changed_files)
+                    reply = f"queued {len(changed_files)}"
+                elif command == "status":
+                    reply = json.dumps(dict(status, pending=len(debouncer.pending)))
+                elif command == "ping":
+                    reply = "pong"
+                else:
+                    reply = f"error unknown command {command!r}"
+                self.wfile.write(f"{reply}\n".encode())
+        
+        class TriggerServer(socketserver.ThreadingTCPServer):
+            allow_reuse_address = True
+            daemon_threads = True
+        
+        server = TriggerServer((host, port), TriggerHandler)
+        threading.Thread(target=server.serve_forever, name="trigger-server", daemon=True).start()
+        return server
+
+    def batch_commit_message(self, applied: List[Dict]) -> str:
+        """Combined commit message for a batch of catalog changes"""
+        if len(applied) == 1:
+            return self.config["documentation"]["commit_message_template"].format(
+                service_name=applied[0]["name"]
+            )
+        lines = [f"docs: Update service catalog for {len(applied)} services", ""]
+        lines.extend(f"- {change['action']}: {change['name']}" for change in applied)
+        return "\n".join(lines)
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Coalescing, rate-limit-aware Discord webhook notifier
+
+Events are buffered for the duration of a run and flushed as a few
+multi-embed messages instead of one webhook call per event. Flushing honours
+Discord's per-message limits and the X-RateLimit-* / 429 retry_after
+responses of the webhook endpoint.
+"""
+
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+import requests
+
+# Discord webhook limits
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_CONTENT_CHARS = 2000
+MAX_EMBED_TITLE_CHARS = 256
+MAX_EMBED_DESCRIPTION_CHARS = 4096
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+COLORS = {
+    "add": 3066993,      # green
+    "update": 3447003,   # blue
+    "remove": 15158332,  # red
+    "info": 9807270,     # grey
+}
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+class DiscordNotifier:
+    def __init__(self, webhook_url: str, username: str = "Homelab Bot", avatar_url: str = None,
+                 timeout: float = 10, max_retries: int = 5, session: requests.Session = None):
+        self.webhook_url = webhook_url
+        self.username = username
+        self.avatar_url = avatar_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.session = session or requests.Session()
+
+        self.pending_embeds: List[Dict] = []
+        self.pending_content: List[str] = []
+        # Caller references for the buffered events, reported back when dropped
+        self._embed_refs: List = []
+        self._content_refs: List = []
+        self.dropped_refs: List = []
+        self.stats = {
+            "events": 0,
+            "messages_sent": 0,
+            "requests": 0,
+            "rate_limited": 0,
+            "retries": 0,
+            "dropped_messages": 0,
+            "dropped_events": 0,
+            "seconds": 0.0,
+        }
+        # Earliest time the next request may be sent, from X-RateLimit-* headers
+        self._not_before = 0.0
+
+    def add_event(self, title: str, description: str, kind: str = "info", url: str = None,
+                  ref=None, timestamp: str = None):
+        """Buffer one event; it is sent as an embed on the next flush()"""
+        embed = {
+            "title": _truncate(title, MAX_EMBED_TITLE_CHARS),
+            "description": _truncate(description, MAX_EMBED_DESCRIPTION_CHARS),
+            "color": COLORS.get(kind, COLORS["info"]),
+            "timestamp": timestamp or datetime.now(timezone.utc).isoformat(),
+        }
+        if url:
+            embed["url"] = url
+        self.pending_embeds.append(embed)
+        self._embed_refs.append(ref)
+        self.stats["events"] += 1
+
+    def add_message(self, content: str, ref=None):
+        """Buffer a plain-text message; consecutive messages share a post when they fit"""
+        self.pending_content.append(content)
+        self._content_refs.append(ref)
+        self.stats["events"] += 1
+
+    def build_payloads(self) -> List[Dict]:
+        """Pack the buffered events into as few webhook payloads as the limits allow"""
+        payloads = []
+
+        chunk, chunk_refs = "", []
+        for content, ref in zip(self.pending_content, self._content_refs):
+            for piece in self._split_content(content):
+                if chunk and len(chunk) + 2 + len(piece) > MAX_CONTENT_CHARS:
+                    payloads.append({"content": chunk, "refs": chunk_refs})
+                    chunk, chunk_refs = "", []
+                chunk = f"{chunk}\n\n{piece}" if chunk else piece
+            # An event is accounted to the message carrying its last piece
+            chunk_refs.append(ref)
+        if chunk:
+            payloads.append({"content": chunk, "refs": chunk_refs})
+
+        embeds: List[Dict] = []
+        embed_refs: List = []
+        embed_chars = 0
+        for embed, ref in zip(self.pending_embeds, self._embed_refs):
+            size = len(embed["title"]) + len(embed["description"])
+            if embeds and (len(embeds) == MAX_EMBEDS_PER_MESSAGE or
+                           embed_chars + size > MAX_EMBED_CHARS_PER_MESSAGE):
+                payloads.append({"embeds": embeds, "refs": embed_refs})
+                embeds, embed_refs, embed_chars = [], [], 0
+            embeds.append(embed)
+            embed_refs.append(ref)
+            embed_chars += size
+        if embeds:
+            payloads.append({"embeds": embeds, "refs": embed_refs})
+        return payloads
+
+    @staticmethod
+    def _split_content(content: str) -> List[str]:
+        return [content[i:i + MAX_CONTENT_CHARS] for i in range(0, len(content), MAX_CONTENT_CHARS)] or [""]
+
+    def flush(self) -> Dict:
+        """Send everything buffered so far and return the run statistics
+
+        References of events in messages that could not be delivered are
+        appended to dropped_refs.
+        """
+        started = time.monotonic()
+        for payload in self.build_payloads():
+            refs = payload.pop("refs")
+            payload["username"] = self.username
+            if self.avatar_url:
+                payload["avatar_url"] = self.avatar_url
+            if self._post(payload):
+                self.stats["messages_sent"] += 1
+            else:
+                self.stats["dropped_messages"] += 1
+                self.stats["dropped_events"] += len(refs)
+                self.dropped_refs.extend(ref for ref in refs if ref is not None)
+        self.pending_embeds.clear()
+        self.pending_content.clear()
+        self._embed_refs.clear()
+        self._content_refs.clear()
+        self.stats["seconds"] += time.monotonic() - started
+        return self.stats
+
+    def _post(self, payload: Dict) -> bool:
+        """POST one payload, waiting out rate limits and retrying transient failures"""
+        for attempt in range(self.max_retries + 1):
+            delay = self._not_before - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            if attempt:
+                self.stats["retries"] += 1
+            self.stats["requests"] += 1
+
+            try:
+                response = self.session.post(self.webhook_url, json=payload, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                print(f"Discord request failed: {e}")
+                self._not_before = time.monotonic() + self._backoff(attempt)
+                continue
+
+            self._track_rate_limit(response)
+            if response.status_code == 429:
+                self.stats["rate_limited"] += 1
+                self._not_before = time.monotonic() + self._retry_after(response)
+                continue
+            if response.status_code >= 500:
+                self._not_before = time.monotonic() + self._backoff(attempt)
+                continue
+            if response.status_code >= 400:
+                # Client errors (bad payload, deleted webhook) will not succeed on retry
+                print(f"Discord rejected notification: HTTP {response.status_code} {response.text[:200]}")
+                return False
+            return True
+        return False
+
+    def _track_rate_limit(self, response: requests.Response):
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset_after = response.headers.get("X-RateLimit-Reset-After")
+        if remaining is not None and reset_after is not None:
+            try:
+                if int(remaining) <= 0:
+                    self._not_before = max(self._not_before, time.monotonic() + float(reset_after))
+            except ValueError:
+                pass
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> float:
+        try:
+            body = response.json()
+            if isinstance(body, dict) and body.get("retry_after") is not None:
+                return float(body["retry_after"])
+        except (TypeError, ValueError):
+            pass
+        header = response.headers.get("Retry-After") or response.headers.get("X-RateLimit-Reset-After")
+        try:
+            return float(header)
+        except (TypeError, ValueError):
+            return 1.0
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        return min(30.0, 0.5 * (2 ** attempt))
+
+    def summary(self) -> str:
+        stats = self.stats
+        return (f"{stats['messages_sent']} messages for {stats['events']} events in "
+                f"{stats['seconds']:.1f}s ({stats['rate_limited']} rate-limited, "
+                f"{stats['retries']} retries, {stats['dropped_messages']} messages / "
+                f"{stats['dropped_events']} events dropped)")
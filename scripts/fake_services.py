@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for the external services used by the automation scripts
+
+FakeUptimeKuma speaks the subset of Uptime Kuma's socket.io API the automation
+uses (login, add, editMonitor, deleteMonitor, getMonitorList) over Engine.IO
+long-polling, so uptime_kuma_client.py can be exercised without a real server.
+FakeDiscordWebhook accepts webhook posts, keeps their payloads and can enforce
+Discord's per-webhook rate limit.
+
+Both servers can add latency and inject 429/5xx responses, either scripted
+with inject() or at random from a seeded generator so load tests are
+repeatable, and record every request they handle.
+
+Usage:
+    with FakeUptimeKuma(username="admin", password="secret") as kuma:
+        client = UptimeKumaClient(kuma.url, "admin", "secret")
+    with FakeDiscordWebhook(latency=0.05, rate_limit=(5, 2.0)) as discord:
+        discord.inject(503)
+        notifier = DiscordNotifier(discord.webhook_url)
+
+Run standalone to point the automation at them through its configuration:
+    python3 fake_services.py --latency 0.1 --error-rate 0.1 --write-config /tmp/fake-config.yaml
+    python3 deployment-automation.py --config /tmp/fake-config.yaml --action scan
+"""
+
+import argparse
+import collections
+import json
+import queue
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+PACKET_SEPARATOR = "\x1e"
+
+
+class _FakeServer:
+    """Runs a ThreadingHTTPServer on a background thread
+
+    Every handled request waits `latency` plus up to `jitter` seconds. Faults
+    queued with inject() are returned first; after that a request fails with
+    503 with probability `error_rate` and with 429 with probability
+    `rate_limit_rate`.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 jitter: float = 0.0, error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 retry_after: float = 0.1, seed: int = 0):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.httpd: Optional[ThreadingHTTPServer] = None
+        self.thread: Optional[threading.Thread] = None
+        self.requests: List[Dict] = []
+        self._faults: Deque[int] = collections.deque()
+        self._random = random.Random(seed)
+        self._fault_lock = threading.Lock()
+
+    def handler_class(self):
+        raise NotImplementedError
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        self.httpd = ThreadingHTTPServer((self.host, self.port), self.handler_class())
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def inject(self, *statuses: int):
+        """Answer the next requests with these HTTP statuses, in order"""
+        with self._fault_lock:
+            self._faults.extend(statuses)
+
+    def next_fault(self) -> Optional[int]:
+        with self._fault_lock:
+            if self._faults:
+                return self._faults.popleft()
+            roll = self._random.random()
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+        if roll < self.error_rate:
+            return 503
+        if roll < self.error_rate + self.rate_limit_rate:
+            return 429
+        return None
+
+    def record(self, method: str, path: str, status: int, body: Any = None):
+        with self._fault_lock:
+            self.requests.append({"time": time.time(), "method": method, "path": path,
+                                  "status": status, "body": body})
+
+    def status_counts(self) -> Dict[int, int]:
+        with self._fault_lock:
+            return dict(collections.Counter(request["status"] for request in self.requests))
+
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, status: int, body: str, content_type: str = "text/plain; charset=UTF-8"):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+
+class _KumaSession:
+    def __init__(self):
+        self.outbox: "queue.Queue[str]" = queue.Queue()
+        self.authenticated = False
+        self.closed = False
+
+
+class FakeUptimeKuma(_FakeServer):
+    def __init__(self, username: str = "admin", password: str = "admin",
+                 host: str = "127.0.0.1", port: int = 0, poll_timeout: float = 0.5, **faults):
+        super().__init__(host, port, **faults)
+        self.username = username
+        self.password = password
+        self.poll_timeout = poll_timeout
+        self.sessions: Dict[str, _KumaSession] = {}
+        self.monitors: Dict[int, Dict] = {}
+        self.next_monitor_id = 1
+        self.logins = 0
+        self.http_requests = 0
+        self.events: List[str] = []
+        self.lock = threading.Lock()
+
+    def handler_class(self):
+        fake = self
+
+        class Handler(_QuietHandler):
+            def do_GET(self):
+                fake.handle_get(self)
+
+            def do_POST(self):
+                fake.handle_post(self)
+
+        return Handler
+
+    # -- Engine.IO transport -------------------------------------------------
+
+    def handle_get(self, handler: _QuietHandler):
+        with self.lock:
+            self.http_requests += 1
+        query = parse_qs(urlparse(handler.path).query)
+        sid = query.get("sid", [None])[0]
+        if sid is None:
+            sid = uuid.uuid4().hex
+            with self.lock:
+                self.sessions[sid] = _KumaSession()
+            handshake = {"sid": sid, "upgrades": [], "pingInterval": 25000,
+                         "pingTimeout": 20000, "maxPayload": 1000000}
+            handler.reply(200, "0" + json.dumps(handshake))
+            return
+
+        session = self.sessions.get(sid)
+        if session is None or session.closed:
+            handler.reply(400, json.dumps({"code": 1, "message": "Session ID unknown"}))
+            return
+        packets = []
+        try:
+            packets.append(session.outbox.get(timeout=self.poll_timeout))
+            while True:
+                packets.append(session.outbox.get_nowait())
+        except queue.Empty:
+            pass
+        handler.reply(200, PACKET_SEPARATOR.join(packets) if packets else "6")
+
+    def handle_post(self, handler: _QuietHandler):
+        with self.lock:
+            self.http_requests += 1
+        query = parse_qs(urlparse(handler.path).query)
+        session = self.sessions.get(query.get("sid", [""])[0])
+        body = handler.read_body().decode("utf-8")
+        if session is None or session.closed:
+            handler.reply(400, json.dumps({"code": 1, "message": "Session ID unknown"}))
+            return
+        # Long-polling GETs stay fault-free; latency and faults apply to event sends
+        fault = self.next_fault()
+        packets = body.split(PACKET_SEPARATOR)
+        if fault:
+            self.record("POST", handler.path, fault, packets)
+            if fault == 429:
+                handler.send_response(429)
+                handler.send_header("Retry-After", str(self.retry_after))
+                handler.send_header("Content-Length", "0")
+                handler.end_headers()
+            else:
+                handler.reply(fault, "Service Unavailable")
+            return
+        for packet in packets:
+            self.handle_packet(session, packet)
+        self.record("POST", handler.path, 200, packets)
+        handler.reply(200, "ok")
+
+    def handle_packet(self, session: _KumaSession, packet: str):
+        if packet == "1":
+            session.closed = True
+        elif packet == "40":
+            session.outbox.put("40" + json.dumps({"sid": uuid.uuid4().hex}))
+        elif packet.startswith("42"):
+            body = packet[2:]
+            digits = len(body) - len(body.lstrip("0123456789"))
+            ack_id = body[:digits]
+            event, *args = json.loads(body[digits:])
+            with self.lock:
+                self.events.append(event)
+            result = self.handle_event(session, event, args)
+            if ack_id:
+                session.outbox.put("43" + ack_id + json.dumps([result]))
+
+    def push(self, session: _KumaSession, event: str, *args):
+        session.outbox.put("42" + json.dumps([event, *args]))
+
+    # -- Uptime Kuma API -----------------------------------------------------
+
+    def handle_event(self, session: _KumaSession, event: str, args: List[Any]) -> Dict:
+        if event == "login":
+            credentials = args[0] if args else {}
+            with self.lock:
+                self.logins += 1
+            if credentials.get("username") != self.username or credentials.get("password") != self.password:
+                return {"ok": False, "msg": "Incorrect username or password."}
+            session.authenticated = True
+            self.push_monitor_list(session)
+            return {"ok": True, "token": "fake-token"}
+
+        if not session.authenticated:
+            return {"ok": False, "msg": "You are not logged in."}
+
+        if event == "getMonitorList":
+            self.push_monitor_list(session)
+            return {"ok": True}
+        if event == "add":
+            with self.lock:
+                monitor_id = self.next_monitor_id
+                self.next_monitor_id += 1
+                self.monitors[monitor_id] = dict(args[0], id=monitor_id)
+            self.push_monitor_list(session)
+            return {"ok": True, "msg": "Added Successfully.", "monitorID": monitor_id}
+        if event == "editMonitor":
+            monitor = args[0]
+            with self.lock:
+                if monitor.get("id") not in self.monitors:
+                    return {"ok": False, "msg": "Monitor not found"}
+                self.monitors[monitor["id"]] = dict(monitor)
+            self.push_monitor_list(session)
+            return {"ok": True, "msg": "Saved.", "monitorID": monitor["id"]}
+        if event == "deleteMonitor":
+            with self.lock:
+                if self.monitors.pop(args[0], None) is None:
+                    return {"ok": False, "msg": "Monitor not found"}
+            self.push_monitor_list(session)
+            return {"ok": True, "msg": "Deleted Successfully."}
+        return {"ok": False, "msg": f"Unsupported event {event}"}
+
+    def push_monitor_list(self, session: _KumaSession):
+        with self.lock:
+            monitors = {str(monitor_id): monitor for monitor_id, monitor in self.monitors.items()}
+        self.push(session, "monitorList", monitors)
+
+
+class FakeDiscordWebhook(_FakeServer):
+    """Discord webhook stand-in
+
+    rate_limit=(requests, seconds) enforces a fixed-window limit per webhook,
+    like Discord's own (about 5 requests per 2 seconds), and reports it through
+    the X-RateLimit-* headers.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 rate_limit: Optional[Tuple[int, float]] = None, **faults):
+        super().__init__(host, port, **faults)
+        self.rate_limit = rate_limit
+        self.payloads: List[Dict] = []
+        self.lock = threading.Lock()
+        self._window_start = 0.0
+        self._window_count = 0
+
+    def take_rate_limit(self) -> Tuple[bool, Dict[str, str]]:
+        """Count a request against the window; returns (allowed, rate limit headers)"""
+        if not self.rate_limit:
+            return True, {}
+        limit, window = self.rate_limit
+        with self.lock:
+            now = time.monotonic()
+            if now - self._window_start >= window:
+                self._window_start, self._window_count = now, 0
+            reset_after = max(0.0, self._window_start + window - now)
+            allowed = self._window_count < limit
+            if allowed:
+                self._window_count += 1
+            remaining = limit - self._window_count
+        return allowed, {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+        }
+
+    @property
+    def webhook_url(self) -> str:
+        return f"{self.url}/api/webhooks/0/fake-token"
+
+    @property
+    def embeds(self) -> List[Dict]:
+        with self.lock:
+            return [embed for payload in self.payloads for embed in payload.get("embeds", [])]
+
+    def handler_class(self):
+        fake = self
+
+        class Handler(_QuietHandler):
+            def do_POST(self):
+                body = self.read_body()
+                fault = fake.next_fault()
+                allowed, headers = fake.take_rate_limit() if fault is None else (True, {})
+                if fault == 429 or not allowed:
+                    retry_after = float(headers.get("X-RateLimit-Reset-After") or fake.retry_after)
+                    self.respond(429, {"message": "You are being rate limited.",
+                                       "retry_after": retry_after, "global": False},
+                                 dict(headers, **{"Retry-After": f"{retry_after:.3f}"}))
+                elif fault:
+                    self.respond(fault, {"message": "Service Unavailable", "code": 0})
+                else:
+                    try:
+                        payload = json.loads(body or b"{}")
+                    except ValueError:
+                        self.respond(400, {"message": "Cannot send an empty message", "code": 50006})
+                        return
+                    with fake.lock:
+                        fake.payloads.append(payload)
+                    self.respond(204, None, headers)
+
+            def respond(self, status: int, body: Optional[Dict], headers: Dict[str, str] = None):
+                data = json.dumps(body).encode("utf-8") if body is not None else b""
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                if data:
+                    self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                fake.record("POST", self.path, status, body)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run fake Discord and Uptime Kuma servers")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--discord-port", type=int, default=8790, help="Port of the fake Discord webhook")
+    parser.add_argument("--kuma-port", type=int, default=8791, help="Port of the fake Uptime Kuma")
+    parser.add_argument("--username", default="admin", help="Uptime Kuma username")
+    parser.add_argument("--password", default="admin", help="Uptime Kuma password")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra latency, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--rate-limit", help="Discord webhook limit as REQUESTS/SECONDS, e.g. 5/2")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the fault injection")
+    parser.add_argument("--write-config", help="Write an automation config pointing at the fakes to this path")
+    args = parser.parse_args()
+
+    faults = {"latency": args.latency, "jitter": args.jitter, "error_rate": args.error_rate,
+              "rate_limit_rate": args.rate_limit_rate, "seed": args.seed}
+    rate_limit = None
+    if args.rate_limit:
+        requests_per_window, seconds = args.rate_limit.split("/")
+        rate_limit = (int(requests_per_window), float(seconds))
+
+    discord = FakeDiscordWebhook(args.host, args.discord_port, rate_limit=rate_limit, **faults)
+    kuma = FakeUptimeKuma(args.username, args.password, args.host, args.kuma_port, **faults)
+    with discord, kuma:
+        print(f"📢 Fake Discord webhook: {discord.webhook_url}")
+        print(f"⏱️ Fake Uptime Kuma: {kuma.url} (login {args.username}/{args.password})")
+        if args.write_config:
+            # JSON is valid YAML, so the automation loads this without a YAML writer
+            config = {
+                "discord": {"webhook_url": discord.webhook_url},
+                "uptime_kuma": {"url": kuma.url, "username": args.username, "password": args.password},
+                # Load tests should not commit or push the documentation
+                "documentation": {"auto_commit": False, "catalog_layout": "auto"},
+            }
+            with open(args.write_config, "w") as f:
+                json.dump(config, f, indent=2)
+            print(f"📝 Wrote {args.write_config}")
+        print("Press Ctrl-C to stop")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+        print(f"\n📊 Discord: {len(discord.requests)} requests {discord.status_counts()}, "
+              f"{len(discord.payloads)} messages delivered")
+        print(f"📊 Uptime Kuma: {len(kuma.requests)} event posts {kuma.status_counts()}, "
+              f"{len(kuma.monitors)} monitors")
+
+
+if __name__ == "__main__":
+    main()
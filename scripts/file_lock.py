@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Advisory locks and atomic file replacement for concurrent automation runs
+
+The post-commit hook, the daemon and the GitHub workflow may run
+deployment-automation.py at the same time. Each read-modify-write of a shared
+file happens under an exclusive flock on a separate lock file (the file itself
+is replaced on every write, so it cannot carry the lock), and new content is
+written to a temporary file that is renamed over the old one, so readers see
+either the previous or the next version and never a partial one.
+"""
+
+import fcntl
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+
+@contextmanager
+def locked(lock_path: Path, timeout: float = 60.0) -> Iterator[None]:
+    """Hold an exclusive lock on lock_path, waiting at most `timeout` seconds for it"""
+    lock_path = Path(lock_path)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, 'a') as f:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Timed out after {timeout}s waiting for {lock_path}")
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def write_atomically(path: Path, content: str):
+    """Replace path with content through a synced temporary file and a rename"""
+    path = Path(path)
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(temporary, 'w') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        if path.exists():
+            os.chmod(temporary, path.stat().st_mode & 0o7777)
+        os.replace(temporary, path)
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
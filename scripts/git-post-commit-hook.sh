@@ -20,8 +20,9 @@ echo -e "${GREEN}🔍 Checking for new or modified deployments...${NC}"
 # Check if the commit contains changes to deployment files
 CHANGED_FILES=$(git diff-tree --no-commit-id --name-only -r HEAD)
 
-# Look for ingress routes, deployments, or service files
-DEPLOYMENT_CHANGES=$(echo "$CHANGED_FILES" | grep -E "(ingressroute|deployment|service)\.ya?ml$" || true)
+# Look for YAML files; which of them are ingress manifests is decided by
+# detection.ingress_patterns in deployment-automation.py
+DEPLOYMENT_CHANGES=$(echo "$CHANGED_FILES" | grep -E "\.ya?ml$" || true)
 
 if [ -z "$DEPLOYMENT_CHANGES" ]; then
     echo -e "${YELLOW}No deployment changes detected in this commit.${NC}"
@@ -31,6 +32,18 @@ fi
 echo -e "${GREEN}📦 Deployment changes detected:${NC}"
 echo "$DEPLOYMENT_CHANGES"
 
+# Hand the changed files to a running automation daemon, if there is one
+DAEMON_PORT="${HOMELAB_AUTOMATION_PORT:-8765}"
+if { exec 3<>"/dev/tcp/127.0.0.1/$DAEMON_PORT"; } 2>/dev/null; then
+    printf 'scan\n%s\n\n' "$CHANGED_FILES" >&3
+    read -r -t 5 DAEMON_REPLY <&3 || DAEMON_REPLY=""
+    exec 3<&-
+    if [[ "$DAEMON_REPLY" == queued* ]]; then
+        echo -e "${GREEN}✅ Changes handed to the automation daemon (${DAEMON_REPLY}).${NC}"
+        exit 0
+    fi
+fi
+
 # Check if automation script exists
 if [ ! -f "$AUTOMATION_SCRIPT" ]; then
     echo -e "${YELLOW}⚠️  Automation script not found at $AUTOMATION_SCRIPT${NC}"
@@ -44,18 +57,14 @@ if ! command -v python3 &> /dev/null; then
     exit 1
 fi
 
-# Check if required Python packages are available
-python3 -c "import yaml, requests" 2>/dev/null || {
-    echo -e "${YELLOW}⚠️  Required Python packages (pyyaml, requests) not found.${NC}"
-    echo -e "${YELLOW}   Install with: pip3 install pyyaml requests${NC}"
-    exit 0
-}
+# Missing Python packages are reported by the automation script itself, and
+# only when the run actually needs them
 
-# Run the automation script in scan mode
+# Run the automation script in scan mode, limited to the files in this commit
 echo -e "${GREEN}🤖 Running deployment automation...${NC}"
 cd "$DOCS_DIR"
 
-if python3 "$AUTOMATION_SCRIPT" --action scan; then
+if echo "$CHANGED_FILES" | python3 "$AUTOMATION_SCRIPT" --action scan --files-from -; then
     echo -e "${GREEN}✅ Deployment automation completed successfully!${NC}"
 else
     echo -e "${YELLOW}⚠️  Deployment automation completed with warnings.${NC}"
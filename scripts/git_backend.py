@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Git backends used to commit catalog changes
+
+Both backends stage and commit exactly the given files and nothing else in
+the working tree. SubprocessGit runs the git command line. InProcessGit uses
+GitPython (from requirements.txt): blobs are written straight from the file
+contents, the changed trees are rebuilt from HEAD in memory and the commit is
+created without forking git or refreshing the index against the whole working
+tree. Its object reads go through one long-lived `git cat-file` process that is
+reused for every commit of the run. Commit hooks do not run in-process.
+"""
+
+import io
+import os
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional
+
+TREE_MODE = 0o040000
+FILE_MODE = 0o100644
+
+
+class GitBackendError(Exception):
+    pass
+
+
+class SubprocessGit:
+    name = "subprocess"
+
+    def __init__(self, repo_dir: Path):
+        self.repo_dir = Path(repo_dir)
+
+    def commit_files(self, files: Dict[str, Optional[bytes]], message: str) -> Optional[str]:
+        """Commit the files (repository-relative path -> content as on disk, None if
+        deleted); returns the new revision, or None if nothing changed"""
+        existing = [path for path, content in files.items() if content is not None]
+        deleted = [path for path, content in files.items() if content is None]
+        if not files:
+            return None
+        if existing:
+            subprocess.run(["git", "add", "--", *existing], cwd=self.repo_dir, check=True)
+        if deleted:
+            subprocess.run(["git", "rm", "--cached", "--quiet", "--ignore-unmatch", "--", *deleted],
+                           cwd=self.repo_dir, check=True)
+        # Only paths with staged changes can be named in `git commit --only`
+        staged = subprocess.run(["git", "diff", "--cached", "--name-only", "-z", "--", *files],
+                                cwd=self.repo_dir, check=True, capture_output=True,
+                                text=True).stdout.split("\0")
+        paths = [path for path in staged if path]
+        if not paths:
+            return None
+        subprocess.run(["git", "commit", "-m", message, "--only", "--", *paths],
+                       cwd=self.repo_dir, check=True)
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=self.repo_dir, check=True,
+                              capture_output=True, text=True).stdout.strip()
+
+    def close(self):
+        pass
+
+
+class InProcessGit:
+    name = "gitpython"
+
+    def __init__(self, repo_dir: Path):
+        import git
+        from gitdb.db import LooseObjectDB
+        self._git = git
+        try:
+            self.repo = git.Repo(repo_dir)
+        except git.GitError as e:
+            raise GitBackendError(f"{repo_dir} is not a git repository: {e}")
+        # Repo.odb forks `git hash-object` per write; loose objects are written directly
+        self._loose = LooseObjectDB(os.path.join(self.repo.common_dir, "objects"))
+
+    def _store(self, kind: bytes, data: bytes) -> bytes:
+        from gitdb.base import IStream
+        return self._loose.store(IStream(kind, len(data), io.BytesIO(data))).binsha
+
+    def _tree_entries(self, binsha: Optional[bytes]) -> Dict[str, List]:
+        from git.objects.fun import tree_entries_from_data
+        if binsha is None:
+            return {}
+        data = self.repo.odb.stream(binsha).read()
+        return {name: [sha, mode] for sha, mode, name in tree_entries_from_data(data)}
+
+    def _build_tree(self, binsha: Optional[bytes], updates: Dict[str, Optional[bytes]]) -> Optional[bytes]:
+        """Write a copy of tree `binsha` with blobs replaced (None: removed) at the given
+        relative paths; None if the tree ends up empty"""
+        from git.objects.fun import tree_to_stream
+        entries = self._tree_entries(binsha)
+        nested: Dict[str, Dict[str, bytes]] = {}
+        for path, blob in updates.items():
+            head, separator, rest = path.partition("/")
+            if separator:
+                nested.setdefault(head, {})[rest] = blob
+            elif blob is None:
+                entries.pop(head, None)
+            else:
+                mode = entries[head][1] if head in entries and entries[head][1] != TREE_MODE else FILE_MODE
+                entries[head] = [blob, mode]
+        for name, subtree_updates in nested.items():
+            current = entries.get(name)
+            subtree = current[0] if current and current[1] == TREE_MODE else None
+            subtree = self._build_tree(subtree, subtree_updates)
+            if subtree is None:
+                entries.pop(name, None)
+            else:
+                entries[name] = [subtree, TREE_MODE]
+        if not entries:
+            return None
+
+        # Git orders tree entries by name, comparing directories as if they ended in "/"
+        ordered = sorted(entries.items(), key=lambda item: item[0] + "/" if item[1][1] == TREE_MODE else item[0])
+        stream = io.BytesIO()
+        tree_to_stream([(sha, mode, name) for name, (sha, mode) in ordered], stream.write)
+        return self._store(b"tree", stream.getvalue())
+
+    def commit_files(self, files: Dict[str, Optional[bytes]], message: str) -> Optional[str]:
+        """Commit the files (repository-relative path -> content, None if deleted);
+        returns the new revision, or None if nothing changed"""
+        from gitdb.exc import ODBError
+        try:
+            return self._commit_files(files, message)
+        except (self._git.GitError, ODBError, ValueError) as e:
+            raise GitBackendError(str(e) or type(e).__name__)
+
+    def _commit_files(self, files: Dict[str, Optional[bytes]], message: str) -> Optional[str]:
+        git = self._git
+        head = self.repo.head.commit if self.repo.head.is_valid() else None
+        blobs = {path: None if content is None else self._store(b"blob", content)
+                 for path, content in files.items()}
+
+        current = {}
+        modes = {path: FILE_MODE for path in blobs}
+        if head is not None:
+            for path in blobs:
+                try:
+                    entry = head.tree / path
+                except KeyError:
+                    continue
+                current[path] = entry.binsha
+                modes[path] = entry.mode
+        if all(current.get(path) == blob for path, blob in blobs.items()):
+            return None
+
+        tree = self._build_tree(head.tree.binsha if head is not None else None, blobs)
+        if tree is None:
+            tree = self._store(b"tree", b"")
+        commit = git.Commit.create_from_tree(self.repo, git.Tree(self.repo, tree), message,
+                                             parent_commits=[head] if head is not None else [],
+                                             head=True)
+
+        # Record the change in the index too, so the files do not show up as changed
+        index = self.repo.index
+        for path, blob in blobs.items():
+            if blob is None:
+                index.entries.pop((path, 0), None)
+        index.add([git.BaseIndexEntry((modes[path], blob, 0, path))
+                   for path, blob in blobs.items() if blob is not None], write=False)
+        index.write()
+        return commit.hexsha
+
+    def close(self):
+        self.repo.close()
+
+
+def open_backend(repo_dir: Path, kind: str = "auto"):
+    """GitPython when kind is "gitpython", or "auto" and it is installed; else the git command line"""
+    if kind in ("auto", "gitpython"):
+        try:
+            return InProcessGit(repo_dir)
+        except ImportError:
+            if kind == "gitpython":
+                raise
+    return SubprocessGit(repo_dir)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Concurrent HTTP health probes for catalogued service URLs
+
+A small asyncio HTTP/1.1 client on top of asyncio streams, so probing needs no
+extra package. Probes run concurrently, bounded overall and per host, and
+each one records the status code, time to first byte, total time and body
+size of the final response after following redirects. Requests to one host
+can also be spaced out by a minimum interval, and callers may send HEAD or
+conditional requests and read the ETag/Last-Modified validators back.
+"""
+
+import asyncio
+import ssl
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+USER_AGENT = "homelab-docs-probe/1.0"
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+
+class ProbeError(Exception):
+    pass
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str]]:
+    status_line = await reader.readline()
+    if not status_line:
+        raise ProbeError("connection closed before a response was received")
+    parts = status_line.decode("latin-1").split(None, 2)
+    if len(parts) < 2 or not parts[0].startswith("HTTP/") or not parts[1].isdigit():
+        raise ProbeError(f"malformed status line {status_line[:60]!r}")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return int(parts[1]), headers
+
+
+async def _drain(reader: asyncio.StreamReader, size: int, limit: int) -> int:
+    """Read and discard up to `size` bytes (-1: until EOF); returns the bytes read"""
+    received = 0
+    while size < 0 or received < size:
+        chunk = await reader.read(65536 if size < 0 else min(65536, size - received))
+        if not chunk:
+            break
+        received += len(chunk)
+        if received >= limit:
+            break
+    return received
+
+
+async def _read_body(reader: asyncio.StreamReader, headers: Dict[str, str], limit: int) -> int:
+    """Consume the response body and return its size, stopping after `limit` bytes"""
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        received = 0
+        while received < limit:
+            size_line = await reader.readline()
+            size = int(size_line.split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                break
+            received += await _drain(reader, size, limit - received)
+            await reader.readline()
+        return received
+    if "content-length" in headers:
+        return await _drain(reader, int(headers["content-length"]), limit)
+    return await _drain(reader, -1, limit)
+
+
+class Prober:
+    def __init__(self, concurrency: int = 50, per_host: int = 4, timeout: float = 10.0,
+                 connect_timeout: float = 5.0, max_redirects: int = 5, verify_tls: bool = True,
+                 max_body_bytes: int = 10 * 1024 * 1024, host_interval: float = 0.0):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        # Minimum seconds between the starts of two requests to the same host
+        self.host_interval = host_interval
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_redirects = max_redirects
+        self.max_body_bytes = max_body_bytes
+        self.ssl_context = ssl.create_default_context()
+        if not verify_tls:
+            self.ssl_context.check_hostname = False
+            self.ssl_context.verify_mode = ssl.CERT_NONE
+        self._hosts: Dict[Tuple[str, int], asyncio.Semaphore] = {}
+        self._next_start: Dict[Tuple[str, int], float] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def _pace(self, host: Tuple[str, int]):
+        """Wait for this host's next start slot when host_interval is set"""
+        if not self.host_interval:
+            return
+        now = asyncio.get_running_loop().time()
+        start = max(now, self._next_start.get(host, now))
+        self._next_start[host] = start + self.host_interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def _request(self, url: str, method: str = "GET", headers: Dict[str, str] = None) -> Dict:
+        """One request without following redirects"""
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ProbeError(f"unsupported URL {url!r}")
+        tls = parts.scheme == "https"
+        port = parts.port or (443 if tls else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path += f"?{parts.query}"
+        host_header = parts.hostname if parts.port is None else f"{parts.hostname}:{parts.port}"
+
+        extra = "".join(f"{name}: {value}\r\n" for name, value in (headers or {}).items())
+        request = (f"{method} {path} HTTP/1.1\r\nHost: {host_header}\r\nUser-Agent: {USER_AGENT}\r\n"
+                   f"Accept: */*\r\nAccept-Encoding: identity\r\n{extra}Connection: close\r\n\r\n")
+
+        # Take the host slot first, so requests queued for a busy host do not
+        # hold global slots other hosts could use; timeouts start once both are held
+        host = (parts.hostname, port)
+        semaphore = self._hosts.setdefault(host, asyncio.Semaphore(self.per_host))
+        async with semaphore:
+            await self._pace(host)
+            async with self._slots:
+                return await asyncio.wait_for(
+                    self._exchange(parts.hostname, port, tls, request.encode("latin-1"),
+                                   read_body=method != "HEAD"), self.timeout)
+
+    async def _exchange(self, host: str, port: int, tls: bool, request: bytes, read_body: bool = True) -> Dict:
+        started = time.perf_counter()
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port, ssl=self.ssl_context if tls else None),
+                self.connect_timeout)
+        except asyncio.TimeoutError:
+            raise ProbeError(f"connect timed out after {self.connect_timeout}s")
+        try:
+            connected = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status, headers = await _read_headers(reader)
+            first_byte = time.perf_counter()
+            # HEAD responses and 304s announce a body they do not have
+            has_body = read_body and status != 304
+            size = await _read_body(reader, headers, self.max_body_bytes) if has_body else 0
+            return {
+                "status": status,
+                "location": headers.get("location"),
+                "etag": headers.get("etag"),
+                "last_modified": headers.get("last-modified"),
+                "connect_ms": (connected - started) * 1000,
+                "ttfb_ms": (first_byte - started) * 1000,
+                "bytes": size,
+            }
+        finally:
+            writer.close()
+
+    async def probe(self, name: str, url: str, method: str = "GET", headers: Dict[str, str] = None) -> Dict:
+        """Probe one URL; never raises, failures are reported in the result
+
+        total_ms includes time spent waiting for a connection slot. `headers`
+        are sent with every request, e.g. If-None-Match for a revalidation.
+        """
+        result = {"name": name, "url": url, "final_url": url, "status": None, "ok": False,
+                  "redirects": 0, "connect_ms": None, "ttfb_ms": None, "total_ms": None, "bytes": 0,
+                  "etag": None, "last_modified": None, "error": None}
+        started = time.perf_counter()
+        try:
+            await self._follow(url, result, method, headers)
+        except asyncio.TimeoutError:
+            result["error"] = f"timed out after {self.timeout}s"
+        except (OSError, ProbeError, ValueError) as e:
+            result["error"] = str(e) or type(e).__name__
+        result["total_ms"] = (time.perf_counter() - started) * 1000
+        for timing in ("connect_ms", "ttfb_ms", "total_ms"):
+            if result[timing] is not None:
+                result[timing] = round(result[timing], 1)
+        status = result["status"]
+        result["ok"] = result["error"] is None and status is not None and 200 <= status < 300
+        return result
+
+    async def _follow(self, url: str, result: Dict, method: str = "GET", headers: Dict[str, str] = None):
+        current = url
+        for _ in range(self.max_redirects + 1):
+            response = await self._request(current, method, headers)
+            result.update(final_url=current, status=response["status"], bytes=response["bytes"],
+                          etag=response["etag"], last_modified=response["last_modified"])
+            if result["ttfb_ms"] is None:
+                result["connect_ms"] = response["connect_ms"]
+                result["ttfb_ms"] = response["ttfb_ms"]
+            if response["status"] not in REDIRECT_STATUSES or not response["location"]:
+                return
+            current = urljoin(current, response["location"])
+            result["redirects"] += 1
+        raise ProbeError(f"more than {self.max_redirects} redirects")
+
+    async def probe_all(self, services: Dict[str, str]) -> List[Dict]:
+        self.reset()
+        return list(await asyncio.gather(*(self.probe(name, url) for name, url in services.items())))
+
+    def reset(self):
+        """Fresh connection limits; call inside the event loop before a batch of probes"""
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._hosts = {}
+        self._next_start = {}
+
+    def run(self, services: Dict[str, str]) -> List[Dict]:
+        """Probe {name: url} concurrently and return one result per service, in input order"""
+        return asyncio.run(self.probe_all(services))
+
+
+def format_report(results: List[Dict]) -> str:
+    """Render probe results as an aligned text table"""
+    width = max([len("Service")] + [len(result["name"]) for result in results])
+    lines = [f"   {'Service':<{width}}  Status  TTFB ms  Total ms      Bytes  Detail"]
+    for result in sorted(results, key=lambda result: (result["ok"], result["name"])):
+        icon = "✅" if result["ok"] else "❌"
+        status = result["status"] if result["status"] is not None else "-"
+        ttfb = f"{result['ttfb_ms']:.0f}" if result["ttfb_ms"] is not None else "-"
+        detail = result["error"] or (f"→ {result['final_url']}" if result["redirects"] else "")
+        lines.append(f"{icon} {result['name']:<{width}}  {status:>6}  {ttfb:>7}  {result['total_ms']:>8.0f}  "
+                     f"{result['bytes']:>9}  {detail}")
+    return "\n".join(lines)
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Link checker for the docs tree
+
+extract_links() reads every docs/**/*.md once, line by line, skipping fenced
+code blocks and inline code, and collects inline links, reference
+definitions, autolinks, bare URLs (magiclink turns them into links) and HTML
+href/src attributes. Every link is kept once, with all the places it occurs.
+
+Internal links are resolved offline: the target file must exist, and an
+anchor must be one of the target page's heading ids as the toc extension
+generates them (slugified heading text with _1, _2... for repeats, or an
+explicit {#id}). External links are checked concurrently with the
+http_probe.Prober, bounded overall and per host and paced per host: a HEAD
+first, then a GET when the server rejects HEAD.
+
+Results are cached in .cache/link-check.json. A link that worked within the
+TTL is not requested again. A stale one is revalidated with the ETag or
+Last-Modified of its last response, so an unchanged page answers 304 without
+a body. Broken links are checked again on every run.
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import unquote
+
+from file_lock import write_atomically
+
+FENCE_RE = re.compile(r'^\s*(`{3,}|~{3,})')
+INLINE_CODE_RE = re.compile(r'(`+).*?\1')
+INLINE_LINK_RE = re.compile(r'\]\(\s*<?([^)\s>]+)>?(?:\s+"[^"]*")?\s*\)')
+REFERENCE_RE = re.compile(r'^\s{0,3}\[[^\]]+\]:\s*<?(\S+?)>?(?:\s|$)')
+AUTOLINK_RE = re.compile(r'<(https?://[^>\s]+)>')
+HTML_LINK_RE = re.compile(r'\b(?:href|src)=["\']([^"\']+)["\']')
+BARE_URL_RE = re.compile(r'https?://[^\s<>()\[\]"\'`]+')
+HEADING_RE = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+HEADING_ID_RE = re.compile(r'\s*\{:?[^}]*#([\w-]+)[^}]*\}\s*$')
+HTML_ID_RE = re.compile(r'\b(?:id|name)=["\']([^"\']+)["\']')
+
+# Schemes that are neither checked nor resolved
+IGNORED_SCHEMES = ("mailto:", "tel:", "ftp:", "data:", "javascript:")
+
+# Statuses after which a HEAD is retried as a GET: servers that do not
+# implement HEAD, or answer it differently from GET
+HEAD_FALLBACK_STATUSES = {400, 403, 404, 405, 406, 409, 501}
+
+
+def slugify(text: str) -> str:
+    """Heading id as Python-Markdown's toc extension generates it by default"""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    text = re.sub(r'[^\w\s-]', '', text).strip().lower()
+    return re.sub(r'[-\s]+', '-', text)
+
+
+def heading_text(markdown: str) -> str:
+    """Visible text of a heading's inline markdown"""
+    text = re.sub(r'!\[[^\]]*\]\([^)]*\)', '', markdown)
+    text = re.sub(r'\[([^\]]*)\]\([^)]*\)', r'\1', text)
+    text = re.sub(r'<[^>]+>', '', text)
+    text = re.sub(r':[a-z0-9_+-]+:', '', text)
+    return text.replace("`", "").replace("*", "")
+
+
+def _lines_outside_code(path: Path) -> Iterator[Tuple[int, str]]:
+    """(line number, line) of every line outside fenced code blocks"""
+    fence = None
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for number, line in enumerate(f, 1):
+            match = FENCE_RE.match(line)
+            if fence is None and match:
+                fence = match.group(1)
+                continue
+            if fence is not None:
+                if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence):
+                    fence = None
+                continue
+            yield number, line
+
+
+def page_anchors(path: Path) -> Set[str]:
+    """Every id a page's links may point at: its headings and HTML id/name attributes"""
+    anchors = set()
+    for _, line in _lines_outside_code(path):
+        anchors.update(HTML_ID_RE.findall(INLINE_CODE_RE.sub("", line)))
+        # Code spans count in heading ids: the toc extension slugifies their text
+        match = HEADING_RE.match(line)
+        if not match:
+            continue
+        text = match.group(2)
+        explicit = HEADING_ID_RE.search(text)
+        if explicit:
+            anchors.add(explicit.group(1))
+            continue
+        slug = slugify(heading_text(text))
+        # Repeated headings get _1, _2... like the toc extension's unique()
+        candidate, suffix = slug, 1
+        while candidate in anchors:
+            candidate = f"{slug}_{suffix}"
+            suffix += 1
+        anchors.add(candidate)
+    return anchors
+
+
+def line_links(line: str) -> Set[str]:
+    """Link targets on one line, outside its inline code"""
+    line = INLINE_CODE_RE.sub("", line)
+    links = set(INLINE_LINK_RE.findall(line))
+    links.update(AUTOLINK_RE.findall(line))
+    links.update(HTML_LINK_RE.findall(line))
+    reference = REFERENCE_RE.match(line)
+    if reference:
+        links.add(reference.group(1))
+    # Bare URLs, without sentence punctuation after them
+    links.update(url.rstrip(".,;:!?*_") for url in BARE_URL_RE.findall(line))
+    return links
+
+
+def extract_links(docs_dir: Path) -> Tuple[Dict[str, List[str]], Dict[Tuple[str, str], List[str]]]:
+    """Every link in docs_dir/**/*.md outside code, read in one pass
+
+    Returns {external URL: [places]} and {(page, internal target): [places]},
+    a place being "page:line" relative to docs_dir.
+    """
+    docs_dir = Path(docs_dir)
+    external: Dict[str, List[str]] = {}
+    internal: Dict[Tuple[str, str], List[str]] = {}
+    for path in sorted(docs_dir.rglob("*.md")):
+        page = path.relative_to(docs_dir).as_posix()
+        for number, line in _lines_outside_code(path):
+            if "](" not in line and "://" not in line and "=" not in line and "]:" not in line:
+                continue
+            for link in line_links(line):
+                place = f"{page}:{number}"
+                if link.startswith(("http://", "https://")):
+                    external.setdefault(link, []).append(place)
+                elif not link.startswith(IGNORED_SCHEMES) and not link.startswith("//"):
+                    internal.setdefault((page, link), []).append(place)
+    return external, internal
+
+
+def resolve_internal(docs_dir: Path, page: str, target: str,
+                     anchors: Dict[str, Set[str]]) -> Optional[str]:
+    """Why an internal link is broken, or None if it resolves
+
+    `anchors` caches page -> anchors across calls.
+    """
+    path, _, anchor = target.partition("#")
+    path = unquote(path.split("?")[0])
+    if path.startswith("/"):
+        # Site-absolute links depend on where the site is served; not checked
+        return None
+    if path:
+        resolved = os.path.normpath(os.path.join(os.path.dirname(page), path)).replace(os.sep, "/")
+        if resolved.startswith("../"):
+            return f"{path} is outside the docs directory"
+        if not (docs_dir / resolved).exists():
+            return f"{path} does not exist"
+    else:
+        resolved = page
+    if not anchor or not resolved.endswith(".md"):
+        return None
+    if resolved not in anchors:
+        anchors[resolved] = page_anchors(docs_dir / resolved)
+    if anchor not in anchors[resolved]:
+        return f"#{anchor} is not a heading in {resolved}"
+    return None
+
+
+class LinkCache:
+    """Last result of every external link, with its validators"""
+
+    def __init__(self, path: Path, ttl: float):
+        self.path = Path(path)
+        self.ttl = ttl
+        try:
+            self.entries: Dict[str, Dict] = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def fresh(self, url: str, now: float) -> bool:
+        entry = self.entries.get(url)
+        return bool(entry and entry.get("ok") and now - entry.get("checked", 0) < self.ttl)
+
+    def validators(self, url: str) -> Dict[str, str]:
+        """Conditional request headers from the last successful response"""
+        entry = self.entries.get(url) or {}
+        if not entry.get("ok"):
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def record(self, url: str, result: Dict, now: float):
+        previous = self.entries.get(url) or {}
+        revalidated = result["status"] == 304
+        self.entries[url] = {
+            "checked": now,
+            "ok": result["ok"],
+            "status": result["status"],
+            # A 304 may leave the validators out; keep the ones it confirmed
+            "etag": result.get("etag") or (previous.get("etag") if revalidated else None),
+            "last_modified": result.get("last_modified") or (previous.get("last_modified") if revalidated else None),
+            "error": result.get("error"),
+        }
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomically(self.path, json.dumps(self.entries, indent=1, sort_keys=True) + "\n")
+
+
+class LinkChecker:
+    def __init__(self, prober, cache: LinkCache):
+        self.prober = prober
+        self.cache = cache
+
+    async def check(self, url: str) -> Dict:
+        """HEAD the URL (conditionally, if it has validators), then GET if HEAD is rejected"""
+        validators = self.cache.validators(url)
+        method = "HEAD"
+        result = await self.prober.probe(url, url, method, validators)
+        if result["status"] in HEAD_FALLBACK_STATUSES:
+            method = "GET"
+            result = await self.prober.probe(url, url, method, validators)
+        status = result["status"]
+        result["method"] = method
+        result["revalidated"] = status == 304
+        result["ok"] = result["error"] is None and status is not None and (200 <= status < 300 or status == 304)
+        # Says nothing about the link itself; reported, but neither cached nor counted as broken
+        result["rate_limited"] = status == 429
+        return result
+
+    async def check_all(self, urls: List[str]) -> List[Dict]:
+        self.prober.reset()
+        return list(await asyncio.gather(*(self.check(url) for url in urls)))
+
+    def run(self, urls: List[str], now: float = None) -> Tuple[List[Dict], int]:
+        """Check the URLs the cache does not vouch for; returns their results and the number skipped"""
+        now = now if now is not None else time.time()
+        stale = [url for url in urls if not self.cache.fresh(url, now)]
+        results = asyncio.run(self.check_all(stale)) if stale else []
+        for result in results:
+            if not result["rate_limited"]:
+                self.cache.record(result["url"], result, now)
+        return results, len(urls) - len(stale)
+
+
+def format_report(problems: List[Dict]) -> str:
+    """Render broken and unverified links with the places they occur"""
+    lines = []
+    for problem in sorted(problems, key=lambda problem: (problem.get("rate_limited", False), problem["link"])):
+        icon = "⚠️" if problem.get("rate_limited") else "❌"
+        status = problem["status"] if problem["status"] is not None else "-"
+        detail = problem["error"] or f"HTTP {status}"
+        lines.append(f"{icon} {status:>4}  {problem['link']}  {detail}")
+        lines.extend(f"         {place}" for place in problem["places"])
+    return "\n".join(lines)
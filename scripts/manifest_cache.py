@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Persistent parse cache for Kubernetes manifests
+
+Stores the services extracted from each manifest, keyed by path, so a warm
+scan only re-parses files whose mtime/size changed *and* whose content hash
+no longer matches the cached entry.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+CACHE_SCHEMA_VERSION = 1
+
+
+class ManifestCache:
+    def __init__(self, cache_path: Path, fingerprint: str = ""):
+        self.cache_path = Path(cache_path)
+        self.fingerprint = f"{CACHE_SCHEMA_VERSION}:{fingerprint}"
+        self.entries: Dict[str, Dict] = {}
+        self.seen: set = set()
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        """Load cache entries from disk, discarding them if the fingerprint changed"""
+        if not self.cache_path.exists():
+            return
+        try:
+            with open(self.cache_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable manifest cache {self.cache_path}: {e}")
+            return
+        if data.get("fingerprint") != self.fingerprint:
+            self.dirty = True
+            return
+        self.entries = data.get("entries", {})
+
+    def fresh(self, key: str, stat: os.stat_result) -> Optional[List[Dict]]:
+        """Return cached services if the manifest's mtime and size are unchanged"""
+        self.seen.add(key)
+        entry = self.entries.get(key)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            self.hits += 1
+            return entry["services"]
+        return None
+
+    def cached_digest(self, key: str) -> Optional[str]:
+        """Content hash recorded for a manifest, used to skip re-parsing touched files"""
+        entry = self.entries.get(key)
+        return entry["sha256"] if entry else None
+
+    def record(self, key: str, mtime_ns: int, size: int, digest: str,
+               services: Optional[List[Dict]]) -> List[Dict]:
+        """Store the result for a manifest that failed the stat check
+
+        services is None when the content hash matched the cached entry, in which
+        case only the stat key is refreshed and the cached services are returned.
+        """
+        self.seen.add(key)
+        if services is None:
+            self.hits += 1
+            services = self.entries[key]["services"]
+        else:
+            self.misses += 1
+        self.entries[key] = {
+            "mtime_ns": mtime_ns,
+            "size": size,
+            "sha256": digest,
+            "services": services,
+        }
+        self.dirty = True
+        return services
+
+    def lookup(self, key: str) -> Optional[List[Dict]]:
+        """Return the last known services for a manifest without touching the file"""
+        entry = self.entries.get(key)
+        return entry["services"] if entry else None
+
+    def forget(self, key: str):
+        """Drop a manifest from the cache, e.g. after it was deleted"""
+        if self.entries.pop(key, None) is not None:
+            self.dirty = True
+
+    def prune(self):
+        """Drop entries for manifests that were not seen during a full scan"""
+        stale = [key for key in self.entries if key not in self.seen]
+        for key in stale:
+            del self.entries[key]
+        if stale:
+            self.dirty = True
+
+    def save(self):
+        """Atomically write the cache back to disk if anything changed"""
+        if not self.dirty:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({"fingerprint": self.fingerprint, "entries": self.entries}, f)
+        os.replace(tmp_path, self.cache_path)
+        self.dirty = False
+
+    def reset_counters(self):
+        """Start counting hits and misses afresh, e.g. for the next daemon batch"""
+        self.hits = 0
+        self.misses = 0
+
+    def summary(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses ({len(self.entries)} manifests cached)"
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Which files in k8s-cluster-config are ingress manifests
+
+DetectionRules compiles detection.ingress_patterns (globs relative to the
+repository root, where ** matches any number of directories) into a single
+regular expression, and works out which directories can be skipped without
+opening anything in them: .git, detection.excluded_dirs and the directories
+of excluded namespaces. It has no third-party dependencies, so the
+post-commit hook's fast path can use it before yaml is imported.
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_INGRESS_PATTERNS = ["**/ingressroute.yaml", "**/ingress.yaml", "**/httproute.yaml"]
+
+# Where a namespace's manifests live; a directory matching one of these for an
+# excluded namespace is pruned
+DEFAULT_NAMESPACE_DIRS = ["{namespace}", "apps/{namespace}"]
+
+ALWAYS_EXCLUDED_DIRS = ["**/.git"]
+
+
+def glob_to_regex(pattern: str) -> str:
+    """Translate a path glob to a regular expression (without anchors)
+
+    * and ? do not cross directory separators; ** matches any number of
+    directories, including none.
+    """
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(parts)
+
+
+def _compile(patterns: Iterable[str], suffix: str = "") -> Optional["re.Pattern"]:
+    patterns = [pattern.strip("/") for pattern in patterns if pattern]
+    if not patterns:
+        return None
+    return re.compile("(?:" + "|".join(glob_to_regex(pattern) for pattern in patterns) + ")" + suffix)
+
+
+class DetectionRules:
+    def __init__(self, patterns: List[str] = None, excluded_dirs: List[str] = None,
+                 monitored_namespaces: List[str] = None, excluded_namespaces: List[str] = None,
+                 namespace_dirs: List[str] = None):
+        self.patterns = list(patterns or DEFAULT_INGRESS_PATTERNS)
+        self.excluded_dirs = list(excluded_dirs or [])
+        # None or empty: every namespace is monitored
+        self.monitored_namespaces = set(monitored_namespaces) if monitored_namespaces else None
+        self.excluded_namespaces = set(excluded_namespaces or [])
+        self.namespace_dirs = list(namespace_dirs or DEFAULT_NAMESPACE_DIRS)
+
+        pruned = ALWAYS_EXCLUDED_DIRS + self.excluded_dirs + [
+            template.replace("{namespace}", namespace)
+            for namespace in sorted(self.excluded_namespaces)
+            for template in self.namespace_dirs
+        ]
+        self._pattern_re = _compile(self.patterns)
+        # A directory is pruned when it, or any of its ancestors, matches
+        self._pruned_re = _compile(pruned, "(?:/|$)")
+
+    @classmethod
+    def from_config(cls, detection: Dict) -> "DetectionRules":
+        return cls(
+            patterns=detection.get("ingress_patterns"),
+            excluded_dirs=detection.get("excluded_dirs"),
+            monitored_namespaces=detection.get("monitored_namespaces"),
+            excluded_namespaces=detection.get("excluded_namespaces"),
+            namespace_dirs=detection.get("namespace_dirs"),
+        )
+
+    def excludes_dir(self, rel_dir: str) -> bool:
+        """Whether a directory (relative to the root, "/"-separated) is pruned"""
+        return bool(self._pruned_re and self._pruned_re.match(rel_dir))
+
+    def matches(self, rel_path: str) -> bool:
+        """Whether a file (relative to the root) is an ingress manifest that should be scanned"""
+        rel_path = rel_path.replace(os.sep, "/")
+        if not self._pattern_re or not self._pattern_re.fullmatch(rel_path):
+            return False
+        parent = rel_path.rpartition("/")[0]
+        return not (parent and self.excludes_dir(parent))
+
+    def namespace_allowed(self, namespace: Optional[str]) -> bool:
+        """Namespaces not set in the manifest (e.g. supplied by kustomize) are allowed"""
+        if not namespace:
+            return True
+        if namespace in self.excluded_namespaces:
+            return False
+        return self.monitored_namespaces is None or namespace in self.monitored_namespaces
+
+    def walk(self, root: Path) -> List[Tuple[str, Path]]:
+        """Find every matching manifest under root in one pass, as sorted (relative path, path) pairs"""
+        root = Path(root)
+        found = []
+        for current, dirnames, filenames in os.walk(root):
+            rel_dir = os.path.relpath(current, root).replace(os.sep, "/")
+            prefix = "" if rel_dir == "." else rel_dir + "/"
+            # Prune in place so excluded trees are never listed, let alone opened
+            dirnames[:] = [name for name in dirnames if not self.excludes_dir(prefix + name)]
+            for name in filenames:
+                rel_path = prefix + name
+                if self._pattern_re and self._pattern_re.fullmatch(rel_path):
+                    found.append((rel_path, Path(current) / name))
+        found.sort()
+        return found
+
+    def to_dict(self) -> Dict:
+        return {
+            "ingress_patterns": self.patterns,
+            "excluded_dirs": self.excluded_dirs,
+            "monitored_namespaces": sorted(self.monitored_namespaces) if self.monitored_namespaces else None,
+            "excluded_namespaces": sorted(self.excluded_namespaces),
+            "namespace_dirs": self.namespace_dirs,
+        }
+
+    def save_snapshot(self, path: Path, config_path: Path):
+        """Record these rules for the configuration file they were loaded from"""
+        snapshot = {"config": _config_identity(config_path), "detection": self.to_dict()}
+        path = Path(path)
+        try:
+            if path.exists() and json.loads(path.read_text()) == snapshot:
+                return
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            temporary.write_text(json.dumps(snapshot))
+            os.replace(temporary, path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not save detection rules to {path}: {e}")
+
+    @classmethod
+    def load_snapshot(cls, path: Path, config_path: Path) -> Optional["DetectionRules"]:
+        """Rules saved for this configuration file, or None if it changed since"""
+        try:
+            snapshot = json.loads(Path(path).read_text())
+        except (OSError, ValueError):
+            return None
+        if snapshot.get("config") != _config_identity(config_path):
+            return None
+        return cls.from_config(snapshot.get("detection", {}))
+
+
+def _config_identity(config_path: Path) -> List:
+    config_path = Path(config_path).resolve()
+    try:
+        stat = config_path.stat()
+    except OSError:
+        return [str(config_path), None, None]
+    return [str(config_path), stat.st_mtime_ns, stat.st_size]
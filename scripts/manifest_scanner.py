@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Manifest parsing and service extraction for deployment-automation.py
+
+Kept free of DeploymentAutomator state so manifests can be parsed in worker
+processes. Uses the libyaml C loader when PyYAML was built with it.
+
+Before anything is handed to YAML, multi-document streams are cut on "---"
+lines and each document's top-level kind: line is checked on the raw bytes,
+so the Deployments, ConfigMaps and CRDs that make up most rendered manifests
+are never parsed. Large files are memory-mapped instead of read.
+"""
+
+import hashlib
+import mmap
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+# Bump when extract_service_info changes so cached parse results are discarded
+EXTRACTOR_VERSION = 2
+
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Traefik rules: Host(`a`), Host(`a`, `b`) (v2) and Host(`a`) || Host(`b`)
+HOST_CALL_RE = re.compile(r'\bHost\(([^)]*)\)')
+BACKTICK_RE = re.compile(r'`([^`]+)`')
+
+# A line starting a document: "---" alone or followed by content
+DOCUMENT_START_RE = re.compile(rb'^---(?=[ \t\r\n]|$)', re.M)
+# The kind of a block-style document; flow-style documents have no such line
+KIND_LINE_RE = re.compile(rb'^kind:[ \t]*["\']?([A-Za-z0-9]+)', re.M)
+
+# Files at least this large are memory-mapped rather than read into memory
+MMAP_MIN_SIZE = 1024 * 1024
+
+
+def split_documents(data: bytes) -> List[Tuple[int, int]]:
+    """(start, end) offsets of each document of a YAML stream, cut on "---" lines
+
+    A "---" at the start of a line always begins a document, since block
+    scalar content is indented. Works on bytes and mmap objects alike.
+    """
+    starts = [match.start() for match in DOCUMENT_START_RE.finditer(data)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    return list(zip(starts, starts[1:] + [len(data)]))
+
+
+def ingress_documents(data: bytes, counts: Dict = None) -> List[bytes]:
+    """The documents of a stream that may be ingress resources, judged by their kind: line
+
+    Documents without a top-level kind: line (flow style, anchors) are kept
+    so they are still parsed.
+    """
+    documents = []
+    spans = split_documents(data)
+    for start, end in spans:
+        kind = KIND_LINE_RE.search(data, start, end)
+        if kind is None or kind.group(1).decode() in HOST_EXTRACTORS:
+            documents.append(data[start:end])
+    if counts is not None:
+        counts["documents"] = counts.get("documents", 0) + len(spans)
+        counts["documents_parsed"] = counts.get("documents_parsed", 0) + len(documents)
+    return documents
+
+
+def parse_manifest(file_path: Path, data: bytes, counts: Dict = None) -> List[Dict]:
+    """Parse a manifest and extract service information from its ingress resources
+
+    Only documents that may be ingress resources are parsed. When counts is
+    given, the documents seen and parsed are added to it.
+    """
+    if not INGRESS_KIND_RE.search(data):
+        # No ingress kind is mentioned anywhere, so there is nothing to split
+        return []
+    try:
+        documents = [doc for chunk in ingress_documents(data, counts)
+                     for doc in yaml.load_all(chunk, Loader=SafeLoader)]
+    except yaml.YAMLError:
+        # A stream that cannot be cut apart (e.g. with %TAG directives) is parsed whole
+        documents = list(yaml.load_all(bytes(data), Loader=SafeLoader))
+
+    services = []
+    for doc in documents:
+        if isinstance(doc, dict) and doc.get('kind') in HOST_EXTRACTORS:
+            service_info = extract_service_info(doc, file_path)
+            if service_info:
+                services.append(service_info)
+    return services
+
+
+def _ingressroute_hosts(spec: Dict) -> List[Tuple[str, str]]:
+    """Hosts of every route of a Traefik IngressRoute"""
+    hosts = []
+    for route in spec.get('routes') or []:
+        for call in HOST_CALL_RE.findall(str((route or {}).get('match', ''))):
+            hosts.extend(("https", host) for host in BACKTICK_RE.findall(call))
+    return hosts
+
+
+def _ingress_hosts(spec: Dict) -> List[Tuple[str, str]]:
+    """Hosts of every rule of a networking.k8s.io Ingress; https when covered by spec.tls"""
+    tls_hosts = set()
+    tls_all = False
+    for tls in spec.get('tls') or []:
+        if (tls or {}).get('hosts'):
+            tls_hosts.update(tls['hosts'])
+        else:
+            tls_all = True
+    return [
+        ("https" if tls_all or rule['host'] in tls_hosts else "http", rule['host'])
+        for rule in spec.get('rules') or []
+        if (rule or {}).get('host')
+    ]
+
+
+def _httproute_hosts(spec: Dict) -> List[Tuple[str, str]]:
+    """Hostnames of a Gateway API HTTPRoute"""
+    return [("https", host) for host in spec.get('hostnames') or [] if host]
+
+
+HOST_EXTRACTORS = {
+    "IngressRoute": _ingressroute_hosts,
+    "Ingress": _ingress_hosts,
+    "HTTPRoute": _httproute_hosts,
+}
+
+INGRESS_KIND_RE = re.compile(b"|".join(re.escape(kind.encode()) for kind in HOST_EXTRACTORS))
+
+
+def extract_service_info(ingress_doc: Dict, file_path: Path) -> Optional[Dict]:
+    """Extract service information from an IngressRoute, Ingress or HTTPRoute
+
+    The first concrete host is the service URL; every host is listed in "urls".
+    """
+    try:
+        kind = ingress_doc.get('kind')
+        metadata = ingress_doc.get('metadata') or {}
+        extractor = HOST_EXTRACTORS.get(kind)
+        if extractor is None:
+            return None
+
+        urls = []
+        for scheme, host in extractor(ingress_doc.get('spec') or {}):
+            url = f"{scheme}://{host.strip()}"
+            # Wildcard hosts cannot be linked or monitored
+            if "*" not in host and url not in urls:
+                urls.append(url)
+
+        if not urls:
+            return None
+
+        # Determine app directory for additional context
+        app_dir = file_path.parent
+        service_name = app_dir.name if app_dir.name != "staging" else app_dir.parent.name
+
+        return {
+            "name": service_name,
+            "namespace": metadata.get('namespace', ''),
+            "url": urls[0],
+            "urls": urls,
+            "kind": kind,
+            "file_path": str(file_path),
+            "ingress_name": metadata.get('name', '')
+        }
+    except Exception as e:
+        print(f"Error extracting service info: {e}")
+        return None
+
+
+def _hash_and_parse(path: Path, data: bytes, cached_digest: Optional[str],
+                    counts: Dict) -> Tuple[str, Optional[List[Dict]]]:
+    digest = hashlib.sha256(data).hexdigest()
+    if digest == cached_digest:
+        return digest, None
+    return digest, parse_manifest(path, data, counts)
+
+
+def _parse_worker(task: Tuple[str, str, Optional[str]]) -> Tuple:
+    """Read, hash and (if the hash changed) parse one manifest
+
+    Returns (key, mtime_ns, size, sha256, services, error, counts). services is
+    None when the content still matches the cached digest and no parse was needed.
+    """
+    key, path, cached_digest = task
+    counts = {}
+    try:
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_size >= MMAP_MIN_SIZE:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    digest, services = _hash_and_parse(Path(path), data, cached_digest, counts)
+            else:
+                digest, services = _hash_and_parse(Path(path), f.read(), cached_digest, counts)
+        return key, stat.st_mtime_ns, stat.st_size, digest, services, None, counts
+    except Exception as e:
+        return key, 0, 0, None, [], str(e), counts
+
+
+def scan_manifests(manifests: List[Tuple[str, Path]], cache=None, jobs: int = 1,
+                   stats: Dict = None) -> List[Dict]:
+    """Parse manifests, fanning cache misses out over a process pool
+
+    manifests is a list of (cache key, path) pairs. Results are merged in key
+    order so the output does not depend on scheduling or filesystem order.
+    When a stats dict is given, the files and bytes read and parsed are added
+    to it.
+    """
+    results: Dict[str, List[Dict]] = {}
+    pending = []
+
+    for key, path in manifests:
+        services = None
+        if cache:
+            try:
+                services = cache.fresh(key, path.stat())
+            except OSError:
+                services = None
+        if services is not None:
+            results[key] = services
+        else:
+            pending.append((key, str(path), cache.cached_digest(key) if cache else None))
+
+    if jobs > 1 and len(pending) > 1:
+        workers = min(jobs, len(pending))
+        chunksize = max(1, len(pending) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(_parse_worker, pending, chunksize=chunksize))
+    else:
+        outcomes = [_parse_worker(task) for task in pending]
+
+    if stats is not None:
+        counts = {
+            "cache_hits": len(manifests) - len(pending),
+            "files_read": len(outcomes),
+            "bytes_read": sum(outcome[2] for outcome in outcomes),
+            "files_parsed": sum(1 for outcome in outcomes if outcome[4] is not None and not outcome[5]),
+            "bytes_parsed": sum(outcome[2] for outcome in outcomes if outcome[4] is not None and not outcome[5]),
+            "errors": sum(1 for outcome in outcomes if outcome[5]),
+        }
+        for outcome in outcomes:
+            for counter, value in outcome[6].items():
+                counts[counter] = counts.get(counter, 0) + value
+        for counter, value in counts.items():
+            stats[counter] = stats.get(counter, 0) + value
+
+    for key, mtime_ns, size, digest, services, error, _ in outcomes:
+        if error:
+            print(f"Error processing {key}: {error}")
+            continue
+        if cache:
+            services = cache.record(key, mtime_ns, size, digest, services)
+        results[key] = services
+
+    changes = []
+    for key in sorted(results):
+        changes.extend(results[key])
+    return changes
+
+
+def default_jobs() -> int:
+    """Worker count used for --jobs 0"""
+    return os.cpu_count() or 1
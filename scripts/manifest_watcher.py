@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+File watchers for the k8s-cluster-config tree
+
+InotifyWatcher uses Linux inotify through ctypes, so no extra package is
+needed; PollingWatcher compares stat snapshots and works everywhere. Both
+watch the manifests matched by a DetectionRules and never descend into the
+directories it prunes. Changes are reported as {path relative to the root:
+"M" | "D"}; a removed or moved-away directory is reported once as "<dir>/"
+with status "D".
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from manifest_patterns import DetectionRules
+
+# inotify event masks, from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    def __init__(self, root: Path, rules: DetectionRules):
+        self.root = Path(root)
+        self.rules = rules
+        self._dirs: Dict[int, Path] = {}
+
+        libc_name = ctypes.util.find_library("c")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watch_tree(self.root)
+
+    def _watch_tree(self, directory: Path, report: Dict[str, str] = None):
+        """Watch a directory and its subdirectories, reporting manifests found in them"""
+        for current, dirnames, filenames in os.walk(directory):
+            dirnames[:] = [name for name in dirnames
+                           if not self.rules.excludes_dir(self._relative(Path(current) / name))]
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(current), WATCH_MASK)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                if current == str(directory) and directory == self.root:
+                    raise OSError(errno, f"inotify_add_watch failed for {current}")
+                continue
+            self._dirs[wd] = Path(current)
+            if report is not None:
+                for name in filenames:
+                    rel_path = self._relative(Path(current) / name)
+                    if self.rules.matches(rel_path):
+                        report[rel_path] = "M"
+
+    def _relative(self, path: Path) -> str:
+        return path.relative_to(self.root).as_posix()
+
+    def poll(self, timeout: float) -> Dict[str, str]:
+        """Wait up to `timeout` seconds and return the changes seen"""
+        changes: Dict[str, str] = {}
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return changes
+        try:
+            data = os.read(self._fd, 1 << 16)
+        except BlockingIOError:
+            return changes
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost; report the whole tree as changed
+                self._watch_tree(self.root, changes)
+                continue
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / name
+            rel_path = self._relative(path)
+
+            if mask & IN_ISDIR:
+                if self.rules.excludes_dir(rel_path):
+                    continue
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._watch_tree(path, changes)
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    changes[rel_path + "/"] = "D"
+            elif self.rules.matches(rel_path):
+                deleted = mask & (IN_DELETE | IN_MOVED_FROM)
+                changes[rel_path] = "D" if deleted else "M"
+        return changes
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher:
+    def __init__(self, root: Path, rules: DetectionRules, interval: float = 2.0):
+        self.root = Path(root)
+        self.rules = rules
+        self.interval = interval
+        self._snapshot = self._scan()
+        self._next_scan = time.monotonic() + interval
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for rel_path, path in self.rules.walk(self.root):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            snapshot[rel_path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self, timeout: float) -> Dict[str, str]:
+        """Wait up to `timeout` seconds and return the changes seen"""
+        delay = self._next_scan - time.monotonic()
+        if delay > timeout:
+            time.sleep(timeout)
+            return {}
+        if delay > 0:
+            time.sleep(delay)
+        self._next_scan = time.monotonic() + self.interval
+
+        snapshot = self._scan()
+        changes = {path: "M" for path, state in snapshot.items() if self._snapshot.get(path) != state}
+        changes.update({path: "D" for path in self._snapshot if path not in snapshot})
+        self._snapshot = snapshot
+        return changes
+
+    def close(self):
+        pass
+
+
+def create_watcher(root: Path, rules: DetectionRules, kind: str = "auto", interval: float = 2.0):
+    """Return an inotify watcher when available (kind "auto" or "inotify"), else a polling one"""
+    if kind in ("auto", "inotify"):
+        try:
+            return InotifyWatcher(root, rules)
+        except (OSError, AttributeError) as e:
+            if kind == "inotify":
+                raise
+            print(f"⚠️ inotify unavailable ({e}), polling every {interval}s instead")
+    return PollingWatcher(root, rules, interval)
+
+
+class Debouncer:
+    """Collect changes until the tree has been quiet for `delay` seconds
+
+    A continuous stream of events is still flushed after `max_delay` seconds.
+    """
+
+    def __init__(self, delay: float = 2.0, max_delay: float = 30.0):
+        self.delay = delay
+        self.max_delay = max_delay
+        self.pending: Dict[str, str] = {}
+        self._first = 0.0
+        self._last = 0.0
+
+    def add(self, changes: Dict[str, str]):
+        if not changes:
+            return
+        now = time.monotonic()
+        if not self.pending:
+            self._first = now
+        self._last = now
+        self.pending.update(changes)
+
+    def timeout(self) -> Optional[float]:
+        """Seconds until the pending changes are due, or None when nothing is pending"""
+        if not self.pending:
+            return None
+        due = min(self._last + self.delay, self._first + self.max_delay)
+        return max(0.0, due - time.monotonic())
+
+    def take(self) -> Dict[str, str]:
+        """Return the pending changes if they are due"""
+        timeout = self.timeout()
+        if timeout is None or timeout > 0:
+            return {}
+        pending, self.pending = self.pending, {}
+        return pending
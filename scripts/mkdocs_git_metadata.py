@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+MkDocs hook: created/updated dates and authors of every page from one git log pass
+
+The git-revision-date-localized and git-authors plugins run git for every
+page, so builds slow down as the docs tree and its history grow. This hook
+reads the history of docs/ once with `git log --name-status`, following
+renames, and hands each page the metadata Material's source-file partial
+displays: git_revision_date_localized, git_creation_date_localized and
+git_page_authors.
+
+The result is cached in .cache/git-metadata.json, keyed by HEAD. A build at the
+cached HEAD runs no git log at all; after new commits only those are read and
+merged into the cache, so every commit is read once however deep the history
+gets. Without a usable cache (first build, rewritten history, shallow clone)
+the whole history is read once. Pages without commits get the build date.
+
+Enabled in mkdocs.yml with:
+
+    hooks:
+      - scripts/mkdocs_git_metadata.py
+
+Run directly to warm the cache and print how long the pass took.
+"""
+
+import json
+import logging
+import os
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+CACHE_PATH = ".cache/git-metadata.json"
+CACHE_VERSION = 1
+
+COMMIT_MARKER = "\x00"
+FIELD_SEPARATOR = "\x1f"
+# Git expands %x00 and %x1f to the marker and separator characters
+LOG_FORMAT = "%x00%H%x1f%at%x1f%an%x1f%ae"
+
+log = logging.getLogger("mkdocs.hooks.git_metadata")
+
+# {page path relative to docs_dir: {"created", "updated", "authors": {email: [name, commits]}}}
+_metadata: Dict[str, Dict] = {}
+
+
+def _git(cwd: Path, *args: str) -> str:
+    return subprocess.run(["git", "-c", "core.quotePath=false", *args], cwd=cwd, check=True,
+                          capture_output=True, text=True).stdout
+
+
+def read_history(docs_dir: Path, since: Optional[str] = None) -> Tuple[Dict[str, Dict], Dict[str, str]]:
+    """Dates and authors of the pages under docs_dir from one `git log` pass
+
+    Reads the commits after `since`, or all of them. Returns the metadata
+    under each page's newest name, and the renames seen as
+    {older name: newest name}.
+    """
+    revisions = f"{since}..HEAD" if since else "HEAD"
+    output = _git(docs_dir, "log", "-M", "--name-status", "--relative", f"--format={LOG_FORMAT}",
+                  revisions, "--", ".")
+    pages: Dict[str, Dict] = {}
+    renamed: Dict[str, str] = {}
+    timestamp, name, email = 0, "", ""
+    # Newest commit first, so a rename is seen before the history of the older name
+    for line in output.splitlines():
+        if line.startswith(COMMIT_MARKER):
+            _, timestamp, name, email = line[1:].split(FIELD_SEPARATOR)
+            timestamp = int(timestamp)
+            continue
+        if not line:
+            continue
+        status, *paths = line.split("\t")
+        path = renamed.get(paths[-1], paths[-1])
+        if status.startswith("R") and len(paths) == 2:
+            renamed[paths[0]] = path
+        if not path.endswith(".md"):
+            continue
+        page = pages.setdefault(path, {"created": timestamp, "updated": timestamp, "authors": {}})
+        page["created"] = min(page["created"], timestamp)
+        page["updated"] = max(page["updated"], timestamp)
+        author = page["authors"].setdefault(email, [name, 0])
+        author[1] += 1
+    return pages, renamed
+
+
+def merge_history(older: Dict[str, Dict], newer: Dict[str, Dict], renamed: Dict[str, str]) -> Dict[str, Dict]:
+    """Fold cached metadata into that of the commits read since, following their renames"""
+    merged = newer
+    for path, page in older.items():
+        target = renamed.get(path, path)
+        current = merged.get(target)
+        if current is None:
+            merged[target] = page
+            continue
+        current["created"] = min(current["created"], page["created"])
+        current["updated"] = max(current["updated"], page["updated"])
+        for email, (name, commits) in page["authors"].items():
+            # Keep the name from the newest commit
+            current["authors"].setdefault(email, [name, 0])[1] += commits
+    return merged
+
+
+def _read_cache(cache_path: Path) -> Optional[Dict]:
+    try:
+        cache = json.loads(cache_path.read_text())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cache, dict) or cache.get("version") != CACHE_VERSION:
+        return None
+    return cache
+
+
+def _write_cache(cache_path: Path, cache: Dict):
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = cache_path.with_name(f".{cache_path.name}.{os.getpid()}.tmp")
+    temporary.write_text(json.dumps(cache))
+    os.replace(temporary, cache_path)
+
+
+def load_metadata(docs_dir: Path, cache_path: Path) -> Dict[str, Dict]:
+    """Metadata of every page at HEAD, from the cache and the commits it does not cover yet"""
+    docs_dir = Path(docs_dir).resolve()
+    head = _git(docs_dir, "rev-parse", "HEAD").strip()
+    cache = _read_cache(cache_path)
+    if cache is not None and cache.get("docs_dir") != str(docs_dir):
+        cache = None
+    if cache is not None and cache.get("head") == head:
+        return cache["pages"]
+
+    since = None
+    if cache is not None:
+        # Only build on the cache if its HEAD is part of the current history
+        check = subprocess.run(["git", "merge-base", "--is-ancestor", cache["head"], head], cwd=docs_dir,
+                               capture_output=True)
+        since = cache["head"] if check.returncode == 0 else None
+    pages, renamed = read_history(docs_dir, since)
+    if since is not None:
+        pages = merge_history(cache["pages"], pages, renamed)
+    # Pages deleted since are of no use to later builds
+    pages = {path: page for path, page in pages.items() if (docs_dir / path).exists()}
+
+    try:
+        _write_cache(cache_path, {"version": CACHE_VERSION, "head": head, "docs_dir": str(docs_dir),
+                                  "pages": pages})
+    except OSError as e:
+        log.warning(f"Could not write the git metadata cache {cache_path}: {e}")
+    return pages
+
+
+def format_date(timestamp: int) -> str:
+    date = datetime.fromtimestamp(timestamp, timezone.utc)
+    return f"{date:%B} {date.day}, {date.year}"
+
+
+def page_authors(page: Dict) -> List[Dict]:
+    """Authors of a page, most commits first"""
+    authors = [{"name": name, "email": email, "commits": commits}
+               for email, (name, commits) in page["authors"].items()]
+    return sorted(authors, key=lambda author: (-author["commits"], author["name"]))
+
+
+def on_config(config):
+    global _metadata
+    cache_path = Path(config["config_file_path"]).parent / CACHE_PATH
+    started = time.perf_counter()
+    try:
+        _metadata = load_metadata(Path(config["docs_dir"]), cache_path)
+    except (OSError, subprocess.CalledProcessError) as e:
+        log.warning(f"No git metadata for the pages: {e}")
+        _metadata = {}
+    log.info(f"Git metadata for {len(_metadata)} pages in {time.perf_counter() - started:.2f}s")
+    return config
+
+
+def on_page_markdown(markdown, page, config, files):
+    src_uri = page.file.src_path.replace(os.sep, "/")
+    metadata = _metadata.get(src_uri)
+    now = int(time.time())
+    # Dates set in a page's front matter take precedence
+    page.meta.setdefault("git_revision_date_localized", format_date(metadata["updated"] if metadata else now))
+    page.meta.setdefault("git_creation_date_localized", format_date(metadata["created"] if metadata else now))
+    page.meta.setdefault("git_authors", page_authors(metadata) if metadata else [])
+    return markdown
+
+
+def on_page_context(context, page, config, nav):
+    authors = page.meta.get("git_authors")
+    if authors:
+        context["git_page_authors"] = ", ".join(author["name"] for author in authors)
+    return context
+
+
+if __name__ == "__main__":
+    base_dir = Path(__file__).parent.parent
+    started = time.perf_counter()
+    pages = load_metadata(base_dir / "docs", base_dir / CACHE_PATH)
+    print(f"📅 Git metadata for {len(pages)} pages in {time.perf_counter() - started:.3f}s")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Declarative Uptime Kuma monitor reconciliation
+
+Compares the monitors the automation wants (built from the service catalog
+and the latest manifest scan) with the monitors Uptime Kuma actually has,
+and computes the minimal set of creates, updates and deletes to converge.
+Only monitors created by the automation are ever modified or deleted.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from uptime_kuma_client import UptimeKumaClient, UptimeKumaError
+
+# Fields that are compared and corrected on existing monitors
+RECONCILED_FIELDS = ("name", "url", "interval")
+
+# Monitors whose description starts with this were created by the automation
+MANAGED_DESCRIPTION_PREFIX = "Automated monitor for "
+
+
+def is_managed(monitor: Dict) -> bool:
+    return (monitor.get("description") or "").startswith(MANAGED_DESCRIPTION_PREFIX)
+
+
+def plan_reconciliation(desired: Dict[str, Dict], actual: Dict[int, Dict]) -> Dict[str, List]:
+    """Compute the changes that make `actual` match `desired`
+
+    desired maps service name -> monitor definition, actual maps monitor id ->
+    monitor as reported by Uptime Kuma. Existing monitors are matched by name
+    first and URL second, each at most once.
+
+    Returns {"create": [monitor], "update": [(id, name, changes)],
+    "delete": [(id, name)], "unchanged": [name]}.
+    """
+    by_name: Dict[str, int] = {}
+    by_url: Dict[str, int] = {}
+    for monitor_id, monitor in sorted(actual.items()):
+        by_name.setdefault(monitor.get("name"), monitor_id)
+        if monitor.get("url"):
+            by_url.setdefault(monitor["url"], monitor_id)
+
+    plan: Dict[str, List] = {"create": [], "update": [], "delete": [], "unchanged": []}
+    matches: Dict[str, int] = {}
+    claimed = set()
+
+    # Name matches win over URL matches, so resolve all of them first
+    for name in sorted(desired):
+        monitor_id = by_name.get(name)
+        if monitor_id is not None:
+            matches[name] = monitor_id
+            claimed.add(monitor_id)
+    for name, spec in sorted(desired.items()):
+        if name not in matches:
+            monitor_id = _unclaimed(by_url.get(spec.get("url")), claimed)
+            if monitor_id is not None:
+                matches[name] = monitor_id
+                claimed.add(monitor_id)
+
+    for name, spec in sorted(desired.items()):
+        monitor_id = matches.get(name)
+        if monitor_id is None:
+            plan["create"].append(spec)
+            continue
+        current = actual[monitor_id]
+        if not is_managed(current):
+            # Hand-made monitors satisfy the desired state but are never modified
+            plan["unchanged"].append(name)
+            continue
+        changes = {field: spec[field] for field in RECONCILED_FIELDS
+                   if field in spec and current.get(field) != spec[field]}
+        if changes:
+            plan["update"].append((monitor_id, name, changes))
+        else:
+            plan["unchanged"].append(name)
+
+    for monitor_id, monitor in sorted(actual.items()):
+        if monitor_id not in claimed and is_managed(monitor):
+            plan["delete"].append((monitor_id, monitor.get("name")))
+
+    return plan
+
+
+def _unclaimed(monitor_id: Optional[int], claimed: set) -> Optional[int]:
+    return monitor_id if monitor_id is not None and monitor_id not in claimed else None
+
+
+def apply_plan(client: UptimeKumaClient, plan: Dict[str, List], workers: int = 4) -> List[Tuple[str, str, bool, str]]:
+    """Apply a reconciliation plan with at most `workers` requests in flight
+
+    Returns (operation, monitor name, ok, message) for every change.
+    """
+    tasks = []
+    for spec in plan["create"]:
+        tasks.append(("create", spec["name"], lambda spec=spec: client.add_monitor(spec)))
+    for monitor_id, name, changes in plan["update"]:
+        tasks.append(("update", name,
+                      lambda monitor_id=monitor_id, changes=changes: client.edit_monitor(monitor_id, changes)))
+    for monitor_id, name in plan["delete"]:
+        tasks.append(("delete", name, lambda monitor_id=monitor_id: client.delete_monitor(monitor_id)))
+
+    def run(task):
+        operation, name, func = task
+        try:
+            func()
+            return operation, name, True, ""
+        except UptimeKumaError as e:
+            return operation, name, False, str(e)
+
+    if not tasks:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return list(pool.map(run, tasks))
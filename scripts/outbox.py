@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Durable SQLite outbox for external side effects
+
+Discord notifications, Uptime Kuma monitor creation and git pushes are
+recorded as jobs before they are attempted. A job that fails stays in the
+outbox with exponential backoff and is replayed by a later drain, so a flaky
+external service delays a side effect instead of losing it.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, next_attempt_at);
+"""
+
+PENDING = "pending"
+DONE = "done"
+DEAD = "dead"
+
+# A claimed job is invisible to other drains for this long, so a crashed
+# drain does not strand it forever
+CLAIM_LEASE_SECONDS = 300
+
+
+class PermanentFailure(Exception):
+    """Raised by a handler when retrying its jobs cannot succeed, e.g. with missing configuration"""
+
+
+class Job:
+    __slots__ = ("id", "kind", "key", "payload", "attempts")
+
+    def __init__(self, id: int, kind: str, key: str, payload: Dict, attempts: int):
+        self.id = id
+        self.kind = kind
+        self.key = key
+        self.payload = payload
+        self.attempts = attempts
+
+
+# A handler receives the due jobs of one kind and returns {job id: error};
+# jobs missing from the result, or mapped to None, succeeded
+Handler = Callable[[List[Job]], Dict[int, Optional[str]]]
+
+
+class Outbox:
+    def __init__(self, path: Path, max_attempts: int = 10, backoff_base: float = 30.0,
+                 backoff_max: float = 3600.0):
+        self.path = Path(path)
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Side effects may run in worker threads; all access goes through one lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def enqueue(self, kind: str, key: str, payload: Dict) -> bool:
+        """Record a job; returns False if a job with the same idempotency key exists"""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO jobs (kind, idempotency_key, payload, next_attempt_at, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, key, json.dumps(payload, sort_keys=True), now, now, now))
+            return cursor.rowcount == 1
+
+    def claim_due(self, limit: int, kinds: Iterable[str] = None, due_by: float = None) -> List[Job]:
+        """Lease up to `limit` pending jobs that were due at `due_by` (default now), oldest first"""
+        now = time.time()
+        query = "SELECT id, kind, idempotency_key, payload, attempts FROM jobs WHERE status = ? AND next_attempt_at <= ?"
+        params: List = [PENDING, now if due_by is None else min(now, due_by)]
+        if kinds is not None:
+            kinds = list(kinds)
+            query += f" AND kind IN ({', '.join('?' * len(kinds))})"
+            params.extend(kinds)
+        query += " ORDER BY id LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(query, params).fetchall()
+                self._conn.executemany(
+                    "UPDATE jobs SET next_attempt_at = ? WHERE id = ?",
+                    [(now + CLAIM_LEASE_SECONDS, row[0]) for row in rows])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [Job(row[0], row[1], row[2], json.loads(row[3]), row[4]) for row in rows]
+
+    def complete(self, job_ids: Iterable[int]):
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE jobs SET status = ?, last_error = NULL, updated_at = ? WHERE id = ?",
+                [(DONE, now, job_id) for job_id in job_ids])
+
+    def fail(self, job: Job, error: str, permanent: bool = False) -> bool:
+        """Record a failed attempt; returns False once the job has given up"""
+        attempts = job.attempts + 1
+        now = time.time()
+        status = DEAD if permanent or attempts >= self.max_attempts else PENDING
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?, "
+                "updated_at = ? WHERE id = ?",
+                (status, attempts, now + self.backoff(attempts), error, now, job.id))
+        return status == PENDING
+
+    def backoff(self, attempts: int) -> float:
+        return min(self.backoff_max, self.backoff_base * (2 ** (attempts - 1)))
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {PENDING: 0, DONE: 0, DEAD: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def drain(self, handlers: Dict[str, Handler], batch_size: int = 50,
+              kinds: Iterable[str] = None) -> Dict[str, int]:
+        """Replay due jobs in batches until none are left
+
+        Jobs are handed to the handler for their kind one batch at a time, and
+        each job is attempted at most once per drain. Returns {"delivered",
+        "retrying", "dead"} counts for this drain.
+        """
+        stats = {"delivered": 0, "retrying": 0, "dead": 0}
+        kinds = list(kinds) if kinds is not None else None
+        started = time.time()
+        while True:
+            jobs = self.claim_due(batch_size, kinds, due_by=started)
+            if not jobs:
+                return stats
+
+            by_kind: Dict[str, List[Job]] = {}
+            for job in jobs:
+                by_kind.setdefault(job.kind, []).append(job)
+
+            for kind, batch in by_kind.items():
+                handler = handlers.get(kind)
+                permanent = False
+                if handler is None:
+                    errors = {job.id: f"no handler for job kind {kind!r}" for job in batch}
+                else:
+                    try:
+                        errors = handler(batch)
+                    except PermanentFailure as e:
+                        errors = {job.id: str(e) for job in batch}
+                        permanent = True
+                    except Exception as e:
+                        errors = {job.id: str(e) for job in batch}
+
+                self.complete(job.id for job in batch if not errors.get(job.id))
+                for job in batch:
+                    error = errors.get(job.id)
+                    if not error:
+                        stats["delivered"] += 1
+                    elif self.fail(job, error, permanent):
+                        stats["retrying"] += 1
+                    else:
+                        stats["dead"] += 1
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Phase timing and metrics export for deployment-automation.py
+
+Spans time the phases of a run (manifest scanning, catalog rewriting, git,
+Discord, Uptime Kuma) and carry counters such as files scanned or bytes
+parsed. Requests made through an instrumented requests.Session are timed as
+well. Results are written as JSON and in the Prometheus text format for
+node-exporter's textfile collector; both describe the last run only.
+"""
+
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from file_lock import write_atomically
+
+METRIC_PREFIX = "homelab_automation"
+
+
+class Span:
+    __slots__ = ("name", "parent", "started_at", "seconds", "status", "counters", "_start")
+
+    def __init__(self, name: str, parent: Optional[str]):
+        self.name = name
+        self.parent = parent
+        self.started_at = time.time()
+        self.seconds = 0.0
+        self.status = "ok"
+        self.counters: Dict[str, float] = {}
+        self._start = time.perf_counter()
+
+    def add(self, counter: str, value: float = 1):
+        self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "parent": self.parent,
+            "started_at": self.started_at,
+            "seconds": round(self.seconds, 6),
+            "status": self.status,
+            "counters": self.counters,
+        }
+
+
+class Metrics:
+    def __init__(self):
+        self.started_at = time.time()
+        self.spans: List[Span] = []
+        # {(service, method, status code): [count, total seconds, max seconds]}
+        self.http: Dict[Tuple[str, str, int], List[float]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> List[Span]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name: str, **counters) -> Iterator[Span]:
+        """Time a block; nested spans record the enclosing span of the same thread as parent"""
+        stack = self._stack()
+        span = Span(name, stack[-1].name if stack else None)
+        span.counters.update(counters)
+        stack.append(span)
+        try:
+            yield span
+        except BaseException:
+            span.status = "error"
+            raise
+        finally:
+            span.seconds = time.perf_counter() - span._start
+            stack.pop()
+            with self._lock:
+                self.spans.append(span)
+
+    def add(self, counter: str, value: float = 1):
+        """Add to a counter of the innermost open span of this thread, if any"""
+        stack = self._stack()
+        if stack:
+            stack[-1].add(counter, value)
+
+    def instrument_session(self, session, service: str):
+        """Time every response received through a requests.Session"""
+        def record(response, *args, **kwargs):
+            self.observe_http(service, response.request.method, response.status_code,
+                              response.elapsed.total_seconds())
+        session.hooks["response"].append(record)
+
+    def observe_http(self, service: str, method: str, status: int, seconds: float):
+        with self._lock:
+            stats = self.http.setdefault((service, method, status), [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+        self.add("http_requests")
+        self.add("http_seconds", seconds)
+
+    def reset(self):
+        with self._lock:
+            self.started_at = time.time()
+            self.spans = []
+            self.http = {}
+
+    def phases(self) -> Dict[str, Dict]:
+        """Spans aggregated by name: runs, errors, total seconds and summed counters"""
+        with self._lock:
+            spans = list(self.spans)
+        phases: Dict[str, Dict] = {}
+        for span in spans:
+            phase = phases.setdefault(span.name, {"runs": 0, "failures": 0, "seconds": 0.0, "counters": {}})
+            phase["runs"] += 1
+            phase["failures"] += span.status != "ok"
+            phase["seconds"] += span.seconds
+            for counter, value in span.counters.items():
+                phase["counters"][counter] = phase["counters"].get(counter, 0) + value
+        return phases
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            spans = [span.to_dict() for span in self.spans]
+            http = [
+                {"service": service, "method": method, "status": status, "count": count,
+                 "seconds": round(total, 6), "max_seconds": round(slowest, 6)}
+                for (service, method, status), (count, total, slowest) in sorted(self.http.items())
+            ]
+        return {
+            "started_at": self.started_at,
+            "finished_at": time.time(),
+            "phases": self.phases(),
+            "spans": spans,
+            "http": http,
+        }
+
+    def render_prometheus(self) -> str:
+        """Metrics in the Prometheus text exposition format"""
+        lines = []
+
+        def family(name: str, kind: str, help_text: str, samples: List[Tuple[Dict[str, str], float]]):
+            metric = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape(str(label))}"' for key, label in labels.items())
+                sample = f"{metric}{{{label_text}}}" if label_text else metric
+                lines.append(f"{sample} {_format(value)}")
+
+        data = self.to_dict()
+        phases = data["phases"]
+        family("last_run_timestamp_seconds", "gauge", "Unix time the last run finished",
+               [({}, data["finished_at"])])
+        family("last_run_duration_seconds", "gauge", "Wall-clock duration of the last run",
+               [({}, data["finished_at"] - data["started_at"])])
+        family("phase_duration_seconds", "gauge", "Time spent in each phase during the last run",
+               [({"phase": name}, phase["seconds"]) for name, phase in sorted(phases.items())])
+        family("phase_runs", "gauge", "Times each phase ran during the last run",
+               [({"phase": name}, phase["runs"]) for name, phase in sorted(phases.items())])
+        family("phase_failures", "gauge", "Phase runs that failed or raised during the last run",
+               [({"phase": name}, phase["failures"]) for name, phase in sorted(phases.items())])
+        family("phase_counter", "gauge", "Per-phase counters (files, bytes, services, requests) of the last run",
+               [({"phase": name, "counter": counter}, value)
+                for name, phase in sorted(phases.items())
+                for counter, value in sorted(phase["counters"].items())])
+
+        http_labels = [({"service": entry["service"], "method": entry["method"], "code": entry["status"]}, entry)
+                       for entry in data["http"]]
+        metric = f"{METRIC_PREFIX}_http_request_duration_seconds"
+        lines.append(f"# HELP {metric} HTTP request latency to external services during the last run")
+        lines.append(f"# TYPE {metric} summary")
+        for labels, entry in http_labels:
+            label_text = ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items())
+            lines.append(f"{metric}_sum{{{label_text}}} {_format(entry['seconds'])}")
+            lines.append(f"{metric}_count{{{label_text}}} {entry['count']}")
+        family("http_request_max_seconds", "gauge", "Slowest HTTP request to each external service during the last run",
+               [(labels, entry["max_seconds"]) for labels, entry in http_labels])
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomically(path, json.dumps(self.to_dict(), indent=2) + "\n")
+
+    def write_prometheus(self, path: Path):
+        """Write a textfile-collector file; it is replaced atomically so a scrape never sees half of it"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # The collector only reads *.prom, so it skips the temporary file
+        write_atomically(path, self.render_prometheus())
+
+
+def timed(name: str = None) -> Callable:
+    """Decorate a DeploymentAutomator method to run it in a span of self.metrics
+
+    A method returning False marks its span as failed.
+    """
+    def decorator(func: Callable) -> Callable:
+        phase = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.span(phase) as span:
+                result = func(self, *args, **kwargs)
+                if result is False:
+                    span.status = "failed"
+                return result
+        return wrapper
+    return decorator
+
+
+def _format(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(round(float(value), 6))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+In-memory model of the service catalog (docs/applications/services.md)
+
+The catalog is parsed once into a header, an ordered name -> section index and
+a footer. Sections that are not edited keep their original text, so rendering
+an unmodified catalog reproduces the file byte for byte. A catalog remembers
+the text it was parsed from, so edits made by another writer in the meantime
+can be merged in with rebase().
+"""
+
+import hashlib
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+SECTION_PREFIX = "### "
+FOOTER_LINE = "---"
+
+SERVICE_URL_RE = re.compile(r'\[Service URL\]\(([^)\s]+)\)')
+FIELD_RE = re.compile(r'^- \*\*(Use Case|Why Selected|Maintainer)\*\*:[ \t]*(.*?)[ \t]*$', re.MULTILINE)
+
+# Entry field labels -> the service_info keys render_section() takes them from
+FIELD_KEYS = {"Use Case": "description", "Why Selected": "why_selected", "Maintainer": "maintainer"}
+
+
+def render_section(service_name: str, service_info: Dict) -> str:
+    """Render the markdown for one service entry"""
+    return f"""### {service_name}
+- **Use Case**: {service_info.get('description', 'Service description not provided')}
+- **Why Selected**: {service_info.get('why_selected', 'Selection reason not provided')}
+- **Maintainer**: {service_info.get('maintainer', 'Maintainer not specified')}
+- **Links**: [Service URL]({service_info.get('url', '#')})
+"""
+
+
+def section_fields(text: str) -> Dict[str, str]:
+    """The service_info fields of an entry's markdown (missing fields are empty)"""
+    fields = {key: "" for key in FIELD_KEYS.values()}
+    for label, value in FIELD_RE.findall(text):
+        fields[FIELD_KEYS[label]] = value
+    match = SERVICE_URL_RE.search(text)
+    fields["url"] = match.group(1) if match else ""
+    return fields
+
+
+def section_hash(text: str) -> str:
+    """Canonical content hash of a catalog entry; blank lines and trailing whitespace do not count"""
+    lines = [line.rstrip() for line in text.splitlines() if line.strip()]
+    return hashlib.sha256("\n".join(lines).encode()).hexdigest()[:16]
+
+
+class CatalogSection:
+    __slots__ = ("name", "text")
+
+    def __init__(self, name: str, text: str):
+        self.name = name
+        self.text = text
+
+
+class ServiceCatalog:
+    def __init__(self, header: str = "", sections: List[CatalogSection] = None, footer: str = ""):
+        self.header = header
+        self.footer = footer
+        self.sections: Dict[int, CatalogSection] = {}
+        self.index: Dict[str, int] = {}
+        self.duplicates: List[str] = []
+        self.dirty = False
+        # Services added, changed or removed since they were last indexed
+        self.changed: Set[str] = set()
+        # Text the catalog was parsed from, the base of a three-way merge
+        self.source: Optional[str] = None
+        self._next_id = 0
+        for section in sections or []:
+            self._append(section)
+
+    @classmethod
+    def parse(cls, content: str) -> "ServiceCatalog":
+        """Split catalog markdown into header, service sections and footer"""
+        lines = content.splitlines(keepends=True)
+
+        footer = ""
+        if lines and lines[-1].rstrip("\r\n") == FOOTER_LINE:
+            footer = lines.pop()
+
+        header_lines: List[str] = []
+        sections: List[CatalogSection] = []
+        current: Optional[List[str]] = None
+        current_name = ""
+        for line in lines:
+            if line.startswith(SECTION_PREFIX):
+                if current is not None:
+                    sections.append(CatalogSection(current_name, "".join(current)))
+                current = [line]
+                current_name = line[len(SECTION_PREFIX):].strip()
+            elif current is None:
+                header_lines.append(line)
+            else:
+                current.append(line)
+        if current is not None:
+            sections.append(CatalogSection(current_name, "".join(current)))
+
+        catalog = cls("".join(header_lines), sections, footer)
+        catalog.source = content
+        return catalog
+
+    @classmethod
+    def load(cls, path: Path) -> "ServiceCatalog":
+        with open(path, 'r') as f:
+            return cls.parse(f.read())
+
+    def _append(self, section: CatalogSection):
+        section_id = self._next_id
+        self._next_id += 1
+        self.sections[section_id] = section
+        if section.name in self.index:
+            # Keep duplicates in place but only address the first occurrence
+            self.duplicates.append(section.name)
+        else:
+            self.index[section.name] = section_id
+
+    def __contains__(self, service_name: str) -> bool:
+        return service_name in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __iter__(self) -> Iterator[CatalogSection]:
+        return iter(self.sections.values())
+
+    def names(self) -> List[str]:
+        return list(self.index)
+
+    def get(self, service_name: str) -> Optional[CatalogSection]:
+        section_id = self.index.get(service_name)
+        return self.sections[section_id] if section_id is not None else None
+
+    def entry_hash(self, service_name: str) -> Optional[str]:
+        section = self.get(service_name)
+        return section_hash(section.text) if section is not None else None
+
+    def service_url(self, service_name: str) -> Optional[str]:
+        """URL from an entry's [Service URL](...) link, if it has one"""
+        section = self.get(service_name)
+        if section is None:
+            return None
+        match = SERVICE_URL_RE.search(section.text)
+        return match.group(1) if match else None
+
+    def service_urls(self) -> Dict[str, str]:
+        """Map service name -> URL for every entry that links a service URL"""
+        urls = {}
+        for name in self.index:
+            url = self.service_url(name)
+            if url and url != "#":
+                urls[name] = url
+        return urls
+
+    def add(self, service_name: str, service_info: Dict) -> bool:
+        """Append a new service entry; returns False if it already exists"""
+        if service_name in self.index:
+            return False
+        self._append(CatalogSection(service_name, "\n" + render_section(service_name, service_info) + "\n"))
+        self.changed.add(service_name)
+        self.dirty = True
+        return True
+
+    def update(self, service_name: str, service_info: Dict) -> bool:
+        """Re-render an existing service entry in place; returns False if it is missing
+
+        An entry whose content is unchanged keeps its text and does not mark
+        the catalog dirty.
+        """
+        section = self.get(service_name)
+        if section is None:
+            return False
+        text = render_section(service_name, service_info) + "\n"
+        if section_hash(text) != section_hash(section.text):
+            section.text = text
+            self.changed.add(service_name)
+            self.dirty = True
+        return True
+
+    def remove(self, service_name: str) -> bool:
+        """Drop a service entry; returns False if it is missing"""
+        section_id = self.index.pop(service_name, None)
+        if section_id is None:
+            return False
+        del self.sections[section_id]
+        self.changed.add(service_name)
+        self.dirty = True
+        return True
+
+    def render(self) -> str:
+        """Serialize the catalog back to markdown"""
+        return self.header + "".join(section.text for section in self.sections.values()) + self.footer
+
+    def rebase(self, current: str) -> List[str]:
+        """Merge this catalog's edits into `current`, the file as another writer left it
+
+        A three-way merge per section against the text this catalog was parsed
+        from: a section only one side changed takes that side's version, and
+        sections added by either side are kept. Sections both sides changed
+        differently keep this catalog's version and are returned by name.
+        """
+        base = ServiceCatalog.parse(self.source or "")
+        theirs = ServiceCatalog.parse(current)
+        conflicts = []
+
+        def merge(name: str, original: Optional[str], ours: Optional[str],
+                  their: Optional[str]) -> Optional[str]:
+            merged, conflict = _merge_text(original, ours, their)
+            if conflict:
+                conflicts.append(name)
+            return merged
+
+        def base_text(name: str) -> Optional[str]:
+            section = base.get(name)
+            return section.text if section else None
+
+        header = merge("(header)", base.header, self.header, theirs.header) or ""
+        footer = merge("(footer)", base.footer, self.footer, theirs.footer) or ""
+        sections = []
+        for section in theirs:
+            if theirs.get(section.name) is not section:
+                # Only the first of duplicate entries is managed; keep the rest as they are
+                sections.append(section)
+                continue
+            ours = self.get(section.name)
+            text = merge(section.name, base_text(section.name), ours.text if ours else None, section.text)
+            if text is not None:
+                sections.append(CatalogSection(section.name, text))
+        for name, section_id in self.index.items():
+            if name not in theirs:
+                text = merge(name, base_text(name), self.sections[section_id].text, None)
+                if text is not None:
+                    sections.append(CatalogSection(name, text))
+
+        self.header = header
+        self.footer = footer
+        self.sections = {}
+        self.index = {}
+        self.duplicates = []
+        self._next_id = 0
+        for section in sections:
+            self._append(section)
+        self.source = current
+        self.dirty = True
+        return conflicts
+
+
+def _merge_text(base: Optional[str], ours: Optional[str],
+                theirs: Optional[str]) -> Tuple[Optional[str], bool]:
+    """Three-way merge of one piece of text (None: absent); returns (result, conflicted)"""
+    if ours == base or ours == theirs:
+        return theirs, False
+    if theirs == base:
+        return ours, False
+    return ours, True
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Generators for synthetic k8s-cluster-config trees and service catalogs
+
+Used by the benchmark suite to measure how scanning and catalog edits scale
+without touching the real repositories. Output is deterministic for a given
+set of parameters.
+"""
+
+from pathlib import Path
+from typing import Dict, List
+
+from service_catalog import render_section
+
+LAYOUTS = ("production", "staging", "mixed")
+
+CATALOG_HEADER = """# 📦 Service Catalog
+
+This document provides an overview of the services deployed in your Kubernetes homelab, with details about their use cases, selection reasons, and maintainer links.
+
+## 🗂️ Catalog of Services
+"""
+
+CATALOG_FOOTER = "\n---\n"
+
+
+def app_name(index: int) -> str:
+    return f"app-{index:05d}"
+
+
+def app_url(name: str, staging: bool) -> str:
+    return f"https://{name}.staging.hallonen.se" if staging else f"https://{name}.hallonen.se"
+
+
+def _filler_document(index: int) -> str:
+    """A Deployment of typical size, so parsing cost resembles real manifests"""
+    containers = "".join(
+        f"""        - name: c{container}
+          image: registry.hallonen.se/app:{index}.{container}
+          ports:
+            - containerPort: {8000 + container}
+          env:
+            - name: SETTING_{container}
+              value: '{index}'
+"""
+        for container in range(3)
+    )
+    return f"""apiVersion: apps/v1
+kind: Deployment
+metadata:
+  name: worker-{index}
+  labels:
+    app.kubernetes.io/part-of: synthetic
+spec:
+  replicas: 1
+  template:
+    spec:
+      containers:
+{containers}"""
+
+
+def _ingress_route(name: str, namespace: str, url: str) -> str:
+    host = url.split("://", 1)[1]
+    return f"""apiVersion: traefik.containo.us/v1alpha1
+kind: IngressRoute
+metadata:
+  name: {name}
+  namespace: {namespace}
+spec:
+  entryPoints:
+    - websecure
+  routes:
+    - match: Host(`{host}`)
+      kind: Rule
+      services:
+        - name: {name}
+          port: 80
+"""
+
+
+def generate_cluster_config(root: Path, apps: int, docs_per_file: int = 10,
+                            layout: str = "mixed") -> List[Dict]:
+    """Write `apps` ingress manifests of `docs_per_file` YAML documents under root/apps
+
+    "production" puts manifests at apps/<name>/ingressroute.yaml, "staging" at
+    apps/<name>/staging/ingressroute.yaml and "mixed" alternates between the
+    two. Returns the services the scanner is expected to find.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout {layout!r}, expected one of {', '.join(LAYOUTS)}")
+    root = Path(root)
+    expected = []
+    for index in range(apps):
+        name = app_name(index)
+        staging = layout == "staging" or (layout == "mixed" and index % 2 == 1)
+        directory = root / "apps" / name / ("staging" if staging else "")
+        directory.mkdir(parents=True, exist_ok=True)
+        url = app_url(name, staging)
+
+        documents = [_filler_document(doc) for doc in range(max(0, docs_per_file - 1))]
+        # Put the IngressRoute in the middle, like a kustomize-built bundle
+        documents.insert(len(documents) // 2, _ingress_route(name, name, url))
+        (directory / "ingressroute.yaml").write_text("---\n".join(documents))
+        expected.append({"name": name, "namespace": name, "url": url})
+    return expected
+
+
+def generate_catalog(path: Path, services: int) -> List[str]:
+    """Write a services.md with `services` entries; returns their names"""
+    names = [app_name(index) for index in range(services)]
+    sections = []
+    for index, name in enumerate(names):
+        sections.append("\n" + render_section(name, {
+            "url": app_url(name, staging=index % 2 == 1),
+            "description": f"Synthetic service number {index}",
+            "why_selected": "Generated for benchmarking",
+            "maintainer": "Homelab Team",
+        }))
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(CATALOG_HEADER + "".join(sections) + CATALOG_FOOTER)
+    return names
@@ -1,12 +1,22 @@
 #!/usr/bin/env python3
 """
 Test script for homelab automation environment
+
+By default the Discord and Uptime Kuma integrations are exercised against the
+local fakes in fake_services.py, with injected latency, rate limits and server
+errors, so the run is offline and repeatable. Pass --live to check the real
+environment instead; that posts a message to the production webhook.
 """
 
+import argparse
 import os
+import sys
+import time
 import requests
-import json
 from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
 
 def test_environment_variables():
     """Test that all required environment variables are set"""
@@ -80,15 +90,154 @@ def test_uptime_kuma_credentials():
         print("❌ Uptime Kuma credentials not configured")
         return False
 
+def test_uptime_kuma_login():
+    """Test that the Uptime Kuma credentials are accepted"""
+    from uptime_kuma_client import UptimeKumaClient, UptimeKumaError
+    
+    url = os.getenv('UPTIME_KUMA_URL', 'https://uptime.staging.hallonen.se')
+    username = os.getenv('UPTIME_KUMA_USERNAME')
+    password = os.getenv('UPTIME_KUMA_PASSWORD')
+    if not (username and password):
+        print("❌ Uptime Kuma credentials not configured")
+        return False
+    
+    print(f"⏱️ Logging in to {url}...")
+    try:
+        with UptimeKumaClient(url, username, password) as client:
+            client.login()
+            print(f"✅ Logged in, {len(client.monitors())} monitors visible")
+        return True
+    except (UptimeKumaError, requests.exceptions.RequestException) as e:
+        print(f"❌ Uptime Kuma login failed: {e}")
+        return False
+
+def test_fake_discord_delivery():
+    """Test batched Discord delivery through rate limits and server errors"""
+    from discord_notifier import DiscordNotifier
+    from fake_services import FakeDiscordWebhook
+    
+    print("📢 Sending 40 events to a fake webhook (5 requests / 0.5s, 50ms latency)...")
+    with FakeDiscordWebhook(latency=0.05, rate_limit=(5, 0.5), retry_after=0.1) as discord:
+        discord.inject(429, 503, 502)
+        notifier = DiscordNotifier(discord.webhook_url, max_retries=5)
+        for index in range(40):
+            notifier.add_event(f"Service {index} deployed", f"Synthetic event {index}", "new_service")
+        # Over the per-message limit of 10 embeds, so this needs several requests
+        for index in range(5):
+            notifier.add_message(f"Bulk message {index}")
+        notifier.flush()
+        
+        print(f"   {notifier.summary()}")
+        print(f"   Fake webhook saw {len(discord.requests)} requests: {discord.status_counts()}")
+        delivered = len(discord.embeds)
+        if delivered != 40 or notifier.stats["dropped_messages"]:
+            print(f"❌ Expected 40 embeds delivered, got {delivered}")
+            return False
+        if not notifier.stats["rate_limited"] or not notifier.stats["retries"]:
+            print("❌ Injected faults were not retried")
+            return False
+    print("✅ All events delivered despite 429/5xx responses")
+    return True
+
+def test_fake_discord_outage():
+    """Test that a persistent outage is reported instead of hanging"""
+    from discord_notifier import DiscordNotifier
+    from fake_services import FakeDiscordWebhook
+    
+    print("📢 Sending to a fake webhook that always fails...")
+    with FakeDiscordWebhook(error_rate=1.0) as discord:
+        notifier = DiscordNotifier(discord.webhook_url, max_retries=2)
+        notifier.add_event("Outage", "Never delivered", "error", ref="outage")
+        notifier.flush()
+        if notifier.dropped_refs != ["outage"] or len(discord.requests) != 3:
+            print(f"❌ Expected 3 attempts and a dropped event, got {len(discord.requests)} "
+                  f"attempts and {notifier.dropped_refs}")
+            return False
+    print("✅ Outage reported as a dropped event after 3 attempts")
+    return True
+
+def test_fake_uptime_kuma():
+    """Test monitor management against a slow, flaky Uptime Kuma"""
+    from fake_services import FakeUptimeKuma
+    from uptime_kuma_client import UptimeKumaClient, UptimeKumaError
+    
+    print("⏱️ Managing 50 monitors on a fake Uptime Kuma (20ms latency, injected 503/429)...")
+    with FakeUptimeKuma("admin", "secret", latency=0.02, retry_after=0.05) as kuma:
+        try:
+            with UptimeKumaClient(kuma.url, "admin", "secret", timeout=10) as client:
+                client.login()
+                kuma.inject(503, 429)
+                started = time.monotonic()
+                monitors = [{"type": "http", "name": f"Service {index}",
+                             "url": f"https://service-{index}.hallonen.se"} for index in range(50)]
+                results = client.add_monitors(monitors)
+                elapsed = time.monotonic() - started
+                
+                failed = [result for result in results if not result.get("ok")]
+                if failed or len(kuma.monitors) != 50:
+                    print(f"❌ {len(failed)} monitors failed, {len(kuma.monitors)} created")
+                    return False
+                print(f"   Created 50 monitors in {elapsed:.2f}s with {client.retries} retries")
+                
+                found = client.find_monitor(url="https://service-7.hallonen.se")
+                if not found:
+                    print("❌ Created monitor not found")
+                    return False
+                client.delete_monitor(found["id"])
+                if found["id"] in kuma.monitors:
+                    print("❌ Monitor was not deleted")
+                    return False
+        except UptimeKumaError as e:
+            print(f"❌ Uptime Kuma client failed: {e}")
+            return False
+        
+        print(f"   Fake Uptime Kuma saw {len(kuma.requests)} event posts: {kuma.status_counts()}")
+        if client.retries < 2:
+            print("❌ Injected faults were not retried")
+            return False
+    print("✅ Monitors created, found and deleted despite 429/5xx responses")
+    return True
+
+def test_fake_uptime_kuma_login():
+    """Test that wrong credentials are rejected"""
+    from fake_services import FakeUptimeKuma
+    from uptime_kuma_client import UptimeKumaClient, UptimeKumaError
+    
+    print("⏱️ Logging in to a fake Uptime Kuma with a wrong password...")
+    with FakeUptimeKuma("admin", "secret") as kuma:
+        try:
+            with UptimeKumaClient(kuma.url, "admin", "wrong", timeout=5) as client:
+                client.login()
+        except UptimeKumaError as e:
+            print(f"✅ Rejected: {e}")
+            return True
+    print("❌ Wrong password was accepted")
+    return False
+
 def main():
+    parser = argparse.ArgumentParser(description="Test the homelab automation environment")
+    parser.add_argument("--live", action="store_true",
+                       help="Check the real environment variables, Discord webhook and Uptime Kuma")
+    args = parser.parse_args()
+    
     print("🤖 Homelab Automation Test Suite")
     print("=" * 50)
     
-    tests = [
-        ("Environment Variables", test_environment_variables),
-        ("Discord Webhook", test_discord_webhook),
-        ("Uptime Kuma Credentials", test_uptime_kuma_credentials)
-    ]
+    if args.live:
+        tests = [
+            ("Environment Variables", test_environment_variables),
+            ("Discord Webhook", test_discord_webhook),
+            ("Uptime Kuma Credentials", test_uptime_kuma_credentials),
+            ("Uptime Kuma Login", test_uptime_kuma_login)
+        ]
+    else:
+        print("🧪 Offline mode: using fake Discord and Uptime Kuma servers (pass --live for the real ones)")
+        tests = [
+            ("Discord Delivery Under Faults", test_fake_discord_delivery),
+            ("Discord Outage", test_fake_discord_outage),
+            ("Uptime Kuma Monitors Under Faults", test_fake_uptime_kuma),
+            ("Uptime Kuma Login", test_fake_uptime_kuma_login)
+        ]
     
     results = []
     
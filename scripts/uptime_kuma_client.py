@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""
+Uptime Kuma client
+
+Uptime Kuma has no REST API for managing monitors; its UI talks socket.io.
+This client speaks the socket.io protocol (Engine.IO v4, long-polling
+transport) over a single requests.Session, so it needs nothing beyond the
+packages the automation already uses. It authenticates once, keeps the
+monitor list the server pushes after login up to date, and pipelines bulk
+add/edit/delete requests into as few HTTP round trips as possible.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+# Engine.IO packet types
+EIO_OPEN = "0"
+EIO_CLOSE = "1"
+EIO_PING = "2"
+EIO_PONG = "3"
+EIO_MESSAGE = "4"
+EIO_NOOP = "6"
+
+# Socket.IO packet types (carried inside Engine.IO messages)
+SIO_CONNECT = "0"
+SIO_DISCONNECT = "1"
+SIO_EVENT = "2"
+SIO_ACK = "3"
+SIO_CONNECT_ERROR = "4"
+
+# Engine.IO v4 separates packets in a polling payload with a record separator
+PACKET_SEPARATOR = "\x1e"
+
+# Keep each POST well below the server's default maxHttpBufferSize (1 MB)
+MAX_PAYLOAD_BYTES = 512 * 1024
+
+HTTP_MONITOR_DEFAULTS = {
+    "type": "http",
+    "interval": 60,
+    "retryInterval": 60,
+    "resendInterval": 0,
+    "maxretries": 3,
+    "timeout": 30,
+    "upsideDown": False,
+    "notificationIDList": {},
+    "method": "GET",
+    "maxredirects": 10,
+    "accepted_statuscodes": ["200-299"],
+    "ignoreTls": False,
+    "expiryNotification": False,
+    "httpBodyEncoding": "json",
+    "body": None,
+    "headers": None,
+    "authMethod": None,
+}
+
+
+class UptimeKumaError(Exception):
+    """Raised when Uptime Kuma rejects a request or the connection fails"""
+
+
+def build_http_monitor(name: str, url: str, **overrides) -> Dict:
+    """Build an HTTP(s) monitor definition with Uptime Kuma's field names"""
+    monitor = dict(HTTP_MONITOR_DEFAULTS)
+    monitor.update({"name": name, "url": url})
+    monitor.update(overrides)
+    return monitor
+
+
+# Responses from Uptime Kuma or a proxy in front of it that are worth retrying
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+# A proxy may answer 502/503/504 after Uptime Kuma already handled the
+# request, so payloads with these events are only retried on 429: sending
+# them twice would create a duplicate monitor or fail a finished delete.
+# add_monitors() re-sends only the adds the server does not list.
+NON_IDEMPOTENT_EVENTS = {"add", "deleteMonitor"}
+
+
+class UptimeKumaClient:
+    def __init__(self, url: str, username: str, password: str, timeout: float = 30,
+                 session: requests.Session = None, max_retries: int = 3):
+        self.base_url = url.rstrip("/")
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.session = session or requests.Session()
+        self.retries = 0
+
+        self.sid: Optional[str] = None
+        self.connected = False
+        self.logged_in = False
+        self.ping_interval = 25.0
+        self.ping_timeout = 20.0
+
+        self._monitors: Dict[int, Dict] = {}
+        self._monitor_list_ready = threading.Event()
+        self._namespace_ready = threading.Event()
+        self._namespace_error: Optional[str] = None
+        self._pending: Dict[int, Future] = {}
+        self._next_ack_id = 0
+        self._state_lock = threading.Lock()
+        # Engine.IO polling allows only one POST in flight per session
+        self._send_lock = threading.Lock()
+        self._reader: Optional[threading.Thread] = None
+        self._closing = False
+
+    # -- Connection handling -------------------------------------------------
+
+    def _endpoint(self) -> str:
+        return f"{self.base_url}/socket.io/"
+
+    def _params(self) -> Dict[str, str]:
+        params = {"EIO": "4", "transport": "polling", "t": str(time.time_ns())}
+        if self.sid:
+            params["sid"] = self.sid
+        return params
+
+    def connect(self):
+        """Open the Engine.IO session and join the default socket.io namespace"""
+        if self.connected:
+            return
+        try:
+            response = self.session.get(self._endpoint(), params=self._params(), timeout=self.timeout)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            raise UptimeKumaError(f"Could not reach Uptime Kuma at {self.base_url}: {e}")
+
+        packets = response.text.split(PACKET_SEPARATOR)
+        if not packets or not packets[0].startswith(EIO_OPEN):
+            raise UptimeKumaError(f"Unexpected Engine.IO handshake: {response.text[:100]!r}")
+        handshake = json.loads(packets[0][1:])
+        self.sid = handshake["sid"]
+        self.ping_interval = handshake.get("pingInterval", 25000) / 1000
+        self.ping_timeout = handshake.get("pingTimeout", 20000) / 1000
+
+        self._closing = False
+        self._namespace_ready.clear()
+        self._namespace_error = None
+        self._monitor_list_ready.clear()
+        self._reader = threading.Thread(target=self._read_loop, name="uptime-kuma-reader", daemon=True)
+        self._reader.start()
+
+        self._send([EIO_MESSAGE + SIO_CONNECT])
+        if not self._namespace_ready.wait(self.timeout):
+            raise UptimeKumaError("Timed out joining the Uptime Kuma socket.io namespace")
+        if self._namespace_error:
+            raise UptimeKumaError(f"Uptime Kuma refused the connection: {self._namespace_error}")
+        self.connected = True
+
+    def login(self):
+        """Authenticate once; the server then pushes the full monitor list"""
+        self.connect()
+        if self.logged_in:
+            return
+        response = self.call("login", {"username": self.username, "password": self.password, "token": ""})
+        if not response.get("ok"):
+            raise UptimeKumaError(f"Uptime Kuma login failed: {response.get('msg', 'unknown error')}")
+        self.logged_in = True
+        if not self._monitor_list_ready.wait(self.timeout):
+            raise UptimeKumaError("Timed out waiting for the Uptime Kuma monitor list")
+
+    def close(self):
+        """Leave the namespace and close the Engine.IO session"""
+        if not self.sid:
+            return
+        self._closing = True
+        try:
+            self._send([EIO_MESSAGE + SIO_DISCONNECT, EIO_CLOSE])
+        except UptimeKumaError:
+            pass
+        self._fail_pending(UptimeKumaError("Connection closed"))
+        self.sid = None
+        self.connected = False
+        self.logged_in = False
+        self.session.close()
+
+    def __enter__(self) -> "UptimeKumaClient":
+        self.login()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _send(self, packets: List[str], idempotent: bool = True):
+        """POST one or more Engine.IO packets, splitting oversized payloads"""
+        batches: List[List[str]] = [[]]
+        size = 0
+        for packet in packets:
+            packet_size = len(packet.encode("utf-8")) + 1
+            if batches[-1] and size + packet_size > MAX_PAYLOAD_BYTES:
+                batches.append([])
+                size = 0
+            batches[-1].append(packet)
+            size += packet_size
+
+        with self._send_lock:
+            for batch in batches:
+                self._post(PACKET_SEPARATOR.join(batch).encode("utf-8"), idempotent)
+
+    def _post(self, data: bytes, idempotent: bool = True):
+        """POST a payload, retrying rate-limited and unavailable responses with backoff
+        
+        Non-idempotent payloads are only retried when rate limited.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(
+                    self._endpoint(), params=self._params(), data=data,
+                    headers={"Content-Type": "text/plain;charset=UTF-8"},
+                    timeout=self.timeout
+                )
+                status = response.status_code
+                retryable = status == 429 or (idempotent and status in RETRYABLE_STATUSES)
+                if retryable and attempt < self.max_retries:
+                    self.retries += 1
+                    time.sleep(self._retry_delay(response, attempt))
+                    continue
+                response.raise_for_status()
+                return
+            except requests.exceptions.RequestException as e:
+                raise UptimeKumaError(f"Uptime Kuma request failed: {e}")
+
+    @staticmethod
+    def _retry_delay(response: requests.Response, attempt: int) -> float:
+        try:
+            return min(30.0, float(response.headers["Retry-After"]))
+        except (KeyError, ValueError):
+            return min(10.0, 0.25 * (2 ** attempt))
+
+    def _read_loop(self):
+        """Long-poll for server packets and dispatch them until the session closes"""
+        poll_timeout = self.ping_interval + self.ping_timeout + 5
+        while not self._closing:
+            try:
+                response = self.session.get(self._endpoint(), params=self._params(), timeout=poll_timeout)
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                if not self._closing:
+                    self._fail_pending(UptimeKumaError(f"Lost connection to Uptime Kuma: {e}"))
+                    self.connected = False
+                    self.logged_in = False
+                return
+            for packet in response.text.split(PACKET_SEPARATOR):
+                if packet:
+                    self._handle_packet(packet)
+
+    def _handle_packet(self, packet: str):
+        packet_type, body = packet[0], packet[1:]
+        if packet_type == EIO_PING:
+            threading.Thread(target=self._pong, daemon=True).start()
+        elif packet_type == EIO_CLOSE:
+            self._closing = True
+            self._fail_pending(UptimeKumaError("Uptime Kuma closed the connection"))
+        elif packet_type == EIO_MESSAGE and body:
+            self._handle_message(body[0], body[1:])
+
+    def _pong(self):
+        try:
+            self._send([EIO_PONG])
+        except UptimeKumaError:
+            pass
+
+    def _handle_message(self, message_type: str, body: str):
+        if message_type == SIO_CONNECT:
+            self._namespace_ready.set()
+        elif message_type == SIO_CONNECT_ERROR:
+            self._namespace_error = body or "connect error"
+            self._namespace_ready.set()
+        elif message_type == SIO_ACK:
+            ack_id, data = self._split_ack_id(body)
+            with self._state_lock:
+                future = self._pending.pop(ack_id, None)
+            if future is not None:
+                args = json.loads(data) if data else []
+                future.set_result(args[0] if args else None)
+        elif message_type == SIO_EVENT:
+            _, data = self._split_ack_id(body)
+            event, *args = json.loads(data)
+            self._handle_event(event, args)
+
+    @staticmethod
+    def _split_ack_id(body: str) -> Tuple[Optional[int], str]:
+        digits = 0
+        while digits < len(body) and body[digits].isdigit():
+            digits += 1
+        ack_id = int(body[:digits]) if digits else None
+        return ack_id, body[digits:]
+
+    def _handle_event(self, event: str, args: List[Any]):
+        if event == "monitorList" and args:
+            with self._state_lock:
+                self._monitors = {int(monitor_id): monitor for monitor_id, monitor in args[0].items()}
+            self._monitor_list_ready.set()
+        elif event == "updateMonitorIntoList" and args:
+            with self._state_lock:
+                for monitor_id, monitor in args[0].items():
+                    self._monitors[int(monitor_id)] = monitor
+        elif event == "deleteMonitorFromList" and args:
+            with self._state_lock:
+                self._monitors.pop(int(args[0]), None)
+
+    def _fail_pending(self, error: Exception):
+        with self._state_lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    # -- Request/acknowledgement ---------------------------------------------
+
+    def emit(self, calls: List[Tuple[str, Tuple]]) -> List[Future]:
+        """Send several events in one payload and return a future per acknowledgement"""
+        packets = []
+        futures = []
+        ack_ids = []
+        with self._state_lock:
+            for event, args in calls:
+                ack_id = self._next_ack_id
+                self._next_ack_id += 1
+                future: Future = Future()
+                self._pending[ack_id] = future
+                futures.append(future)
+                ack_ids.append(ack_id)
+                packets.append(EIO_MESSAGE + SIO_EVENT + str(ack_id) + json.dumps([event, *args]))
+        try:
+            self._send(packets, idempotent=not any(event in NON_IDEMPOTENT_EVENTS for event, _ in calls))
+        except UptimeKumaError:
+            # Nothing will acknowledge events that never reached the server
+            with self._state_lock:
+                for ack_id in ack_ids:
+                    self._pending.pop(ack_id, None)
+            raise
+        return futures
+
+    def wait(self, future: Future, timeout: float = None) -> Any:
+        try:
+            return future.result(timeout=timeout or self.timeout)
+        except FutureTimeoutError:
+            raise UptimeKumaError("Timed out waiting for Uptime Kuma to respond")
+
+    def call(self, event: str, *args, timeout: float = None) -> Any:
+        """Emit one event and wait for its acknowledgement"""
+        return self.wait(self.emit([(event, args)])[0], timeout)
+
+    # -- Monitors ------------------------------------------------------------
+
+    def monitors(self) -> Dict[int, Dict]:
+        """Monitors known from the last list the server pushed (id -> monitor)"""
+        with self._state_lock:
+            return dict(self._monitors)
+
+    def find_monitor(self, name: str = None, url: str = None) -> Optional[Dict]:
+        """Find a cached monitor by exact name or URL"""
+        for monitor in self.monitors().values():
+            if (name and monitor.get("name") == name) or (url and monitor.get("url") == url):
+                return monitor
+        return None
+
+    def refresh_monitors(self):
+        """Fetch the monitor list again; the server pushes it before acknowledging"""
+        self._checked(self.call("getMonitorList"), "list monitors")
+
+    def add_monitor(self, monitor: Dict) -> int:
+        return self._checked(self.add_monitors([monitor])[0], "add monitor")["monitorID"]
+
+    def edit_monitor(self, monitor_id: int, changes: Dict) -> Dict:
+        monitor = {**self.monitors().get(monitor_id, {}), **changes, "id": monitor_id}
+        self._checked(self.call("editMonitor", monitor), "edit monitor", monitor)
+        return monitor
+
+    def delete_monitor(self, monitor_id: int):
+        self._checked(self.call("deleteMonitor", monitor_id), "delete monitor")
+        with self._state_lock:
+            self._monitors.pop(monitor_id, None)
+
+    def add_monitors(self, monitors: List[Dict]) -> List[Dict]:
+        """Create many monitors over the existing connection
+
+        Returns one {"ok", "monitorID"/"msg"} result per monitor, in order.
+        """
+        try:
+            results = self._collect(self.emit([("add", (monitor,)) for monitor in monitors]))
+        except UptimeKumaError:
+            results = self._add_unlisted(monitors)
+        for monitor, result in zip(monitors, results):
+            if result.get("ok"):
+                self._remember(result["monitorID"], monitor)
+        return results
+
+    def _add_unlisted(self, monitors: List[Dict]) -> List[Dict]:
+        """Re-send the adds of a failed payload that the server did not apply"""
+        self.refresh_monitors()
+        known = {(monitor.get("name"), monitor.get("url")): monitor_id
+                 for monitor_id, monitor in self.monitors().items()}
+        missing = [monitor for monitor in monitors if (monitor["name"], monitor.get("url")) not in known]
+        self.retries += 1
+        results = iter(self._collect(self.emit([("add", (monitor,)) for monitor in missing])))
+        return [{"ok": True, "monitorID": known[(monitor["name"], monitor.get("url"))]}
+                if (monitor["name"], monitor.get("url")) in known else next(results)
+                for monitor in monitors]
+
+    def edit_monitors(self, changes: Dict[int, Dict]) -> List[Dict]:
+        """Apply {monitor_id: changed fields} to many monitors at once"""
+        known = self.monitors()
+        monitors = [{**known.get(monitor_id, {}), **fields, "id": monitor_id}
+                    for monitor_id, fields in changes.items()]
+        results = self._collect(self.emit([("editMonitor", (monitor,)) for monitor in monitors]))
+        for monitor, result in zip(monitors, results):
+            if result.get("ok"):
+                self._remember(monitor["id"], monitor)
+        return results
+
+    def delete_monitors(self, monitor_ids: List[int]) -> List[Dict]:
+        results = self._collect(self.emit([("deleteMonitor", (monitor_id,)) for monitor_id in monitor_ids]))
+        with self._state_lock:
+            for monitor_id, result in zip(monitor_ids, results):
+                if result.get("ok"):
+                    self._monitors.pop(monitor_id, None)
+        return results
+
+    def _collect(self, futures: List[Future]) -> List[Dict]:
+        results = []
+        for future in futures:
+            try:
+                results.append(self.wait(future) or {"ok": False, "msg": "empty response"})
+            except UptimeKumaError as e:
+                results.append({"ok": False, "msg": str(e)})
+        return results
+
+    def _remember(self, monitor_id: int, monitor: Dict):
+        with self._state_lock:
+            self._monitors[monitor_id] = {**self._monitors.get(monitor_id, {}), **monitor, "id": monitor_id}
+
+    def _checked(self, response: Optional[Dict], action: str, monitor: Dict = None) -> Dict:
+        if not response or not response.get("ok"):
+            message = response.get("msg") if response else "no response"
+            raise UptimeKumaError(f"Failed to {action}: {message}")
+        if monitor is not None and response.get("monitorID") is not None:
+            self._remember(response["monitorID"], monitor)
+        return response